@@ -0,0 +1,112 @@
+"""
+Asset Index for Vivento Platform
+Content-hash and perceptual-hash index of uploaded images: uploading the
+same bytes again reuses the stored asset, and a user re-uploading a picture
+they already stored (re-encoded, resized) is told which asset it resembles
+"""
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 64-bit perceptual hash split into 4 bands of 16 bits: two hashes within
+# 3 bits of each other always agree on at least one whole band, so an
+# indexed equality match on the bands finds every candidate
+PHASH_BANDS = 4
+MAX_PHASH_DISTANCE = PHASH_BANDS - 1
+# Largest per-channel difference of the mean colour (0-255) for a near match
+MAX_COLOR_DISTANCE = 8
+
+
+def sha256_digest(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()
+
+
+def phash_bands(phash: str) -> List[str]:
+    size = len(phash) // PHASH_BANDS
+    return [f"{index}:{phash[index * size:(index + 1) * size]}" for index in range(PHASH_BANDS)]
+
+
+def hamming_distance(first: str, second: str) -> int:
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
+
+
+def is_near_duplicate(fingerprint: Dict[str, Any], candidate: Dict[str, Any]) -> bool:
+    """Same picture as far as a viewer is concerned: perceptual hashes and mean colours agree"""
+    if hamming_distance(fingerprint["phash"], candidate["phash"]) > MAX_PHASH_DISTANCE:
+        return False
+    return all(abs(a - b) <= MAX_COLOR_DISTANCE for a, b in zip(fingerprint["mean_color"], candidate["mean_color"]))
+
+
+class AssetIndex:
+    """
+    Lookup table of stored uploads, one document per asset in `kind`'s
+    namespace (e.g. "background", "image"):
+
+        {kind, hashes: [sha256], owner, phash, phash_bands, mean_color,
+         width, height, asset: {public_id, url, ...}, uses, last_used_at}
+
+    Only `find` (identical bytes) may stand in for an upload. `find_similar`
+    is advisory: it is scoped to the uploader and the caller still stores
+    the new file, it only reports the match back. Exact lookups are cheap;
+    callers only compute the fingerprint (decoding the image) after `find`
+    missed.
+    """
+
+    def __init__(self, collection: Callable[[], Any]):
+        self._collection = collection
+
+    @property
+    def collection(self):
+        return self._collection()
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("kind", 1), ("hashes", 1)])
+        await self.collection.create_index([("kind", 1), ("owner", 1), ("phash_bands", 1)])
+
+    async def find(self, kind: str, digest: str) -> Optional[Dict[str, Any]]:
+        """Stored asset for exactly these bytes"""
+        entry = await self.collection.find_one({"kind": kind, "hashes": digest}, {"_id": 0, "asset": 1})
+        if entry is None:
+            return None
+        await self.collection.update_one(
+            {"kind": kind, "hashes": digest},
+            {"$inc": {"uses": 1}, "$set": {"last_used_at": datetime.now(timezone.utc)}}
+        )
+        return entry["asset"]
+
+    async def find_similar(self, kind: str, owner: str, fingerprint: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Asset `owner` stored earlier that looks the same as the fingerprinted upload"""
+        candidates = await self.collection.find(
+            {"kind": kind, "owner": owner, "phash_bands": {"$in": phash_bands(fingerprint["phash"])}},
+            {"_id": 0}
+        ).to_list(50)
+        entry = next((candidate for candidate in candidates if is_near_duplicate(fingerprint, candidate)), None)
+        if entry is None:
+            return None
+        logger.info(f"{kind} upload by {owner} resembles {entry['asset'].get('public_id')}")
+        return entry["asset"]
+
+    async def add(self, kind: str, digest: str, fingerprint: Optional[Dict[str, Any]], asset: Dict[str, Any],
+                  owner: Optional[str] = None) -> None:
+        now = datetime.now(timezone.utc)
+        entry = {
+            "kind": kind,
+            "hashes": [digest],
+            "owner": owner,
+            "asset": asset,
+            "uses": 1,
+            "created_at": now,
+            "last_used_at": now,
+        }
+        if fingerprint is not None:
+            entry.update(
+                phash=fingerprint["phash"],
+                phash_bands=phash_bands(fingerprint["phash"]),
+                mean_color=fingerprint["mean_color"],
+                width=fingerprint["width"],
+                height=fingerprint["height"],
+            )
+        await self.collection.insert_one(entry)
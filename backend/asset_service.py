@@ -0,0 +1,232 @@
+"""
+Asset Service for Vivento Platform
+Content-hashed local asset storage and a StaticFiles variant with
+CDN-friendly caching, precompressed gzip/brotli variants and range requests
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+for _media_type, _ext in (("font/woff2", ".woff2"), ("font/woff", ".woff"), ("font/ttf", ".ttf"),
+                          ("font/otf", ".otf"), ("image/svg+xml", ".svg"), ("image/webp", ".webp"),
+                          ("image/avif", ".avif")):
+    mimetypes.add_type(_media_type, _ext)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=86400"
+# mkstemp creates 0600 files; nginx serves /uploads directly and must read them
+ASSET_FILE_MODE = 0o644
+
+# Already-compressed formats (woff2, images) gain nothing from gzip/brotli
+COMPRESSIBLE_EXTENSIONS = {".ttf", ".otf", ".svg", ".css", ".js", ".json", ".txt", ".html", ".xml"}
+COMPRESSED_VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+
+# <prefix_><16+ hex chars>[_<subset>].<ext>
+HASHED_NAME_RE = re.compile(r"^(?:[a-z]+_)?([0-9a-f]{16,64})(?:_[a-z0-9-]+)?\.[a-z0-9]+$")
+
+
+def content_hash(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()[:16]
+
+
+def hashed_filename(contents: bytes, ext: str, prefix: str = "") -> str:
+    return f"{prefix}{content_hash(contents)}{ext.lower()}"
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, ASSET_FILE_MODE)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_precompressed(path: Path, data: Optional[bytes] = None) -> None:
+    """Write .gz/.br siblings for compressible files when they are actually smaller"""
+    if path.suffix.lower() not in COMPRESSIBLE_EXTENSIONS:
+        return
+    if data is None:
+        data = path.read_bytes()
+
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+        variants[".br"] = brotli.compress(data, quality=11)
+    except ImportError:
+        pass
+
+    for suffix, compressed in variants.items():
+        variant_path = path.with_name(path.name + suffix)
+        if len(compressed) < len(data) and not variant_path.exists():
+            _atomic_write(variant_path, compressed)
+
+
+def store_asset(directory: Path, filename: str, data: bytes) -> Path:
+    """
+    Write an asset under its (content-hashed) name plus precompressed variants.
+    Existing files are left alone: same name means same content.
+    """
+    path = directory / filename
+    if not path.exists():
+        _atomic_write(path, data)
+        write_precompressed(path, data)
+    return path
+
+
+def precompress_directory(directory: Path) -> int:
+    """Backfill compressed variants for existing files, returns files processed"""
+    processed = 0
+    for path in directory.rglob("*"):
+        if path.is_file() and path.suffix.lower() in COMPRESSIBLE_EXTENSIONS:
+            try:
+                write_precompressed(path)
+                processed += 1
+            except Exception as e:
+                logger.warning(f"Could not precompress {path}: {e}")
+    return processed
+
+
+def parse_byte_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single 'bytes=' range into inclusive (start, end).
+    Returns None for multi-range or malformed headers (serve the full file),
+    raises ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if not start_text:
+            # Suffix range: last N bytes
+            length = int(end_text)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(0, file_size - length), file_size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else file_size - 1
+    except ValueError:
+        if start_text.isdigit() or end_text.isdigit():
+            raise
+        return None
+    if start >= file_size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, file_size - 1)
+
+
+class PartialFileResponse(Response):
+    """206 response streaming an inclusive byte range of a file"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, start: int, end: int, file_size: int, headers: dict, media_type: Optional[str]):
+        self.path = path
+        self.start = start
+        self.end = end
+        headers = {
+            **headers,
+            "content-range": f"bytes {start}-{end}/{file_size}",
+            "content-length": str(end - start + 1),
+        }
+        super().__init__(status_code=206, headers=headers, media_type=media_type)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class AssetStaticFiles(StaticFiles):
+    """
+    StaticFiles with:
+    - immutable Cache-Control for content-hashed names, a day for the rest
+    - ETags derived from name/content hash, so every node and CDN edge agrees
+    - precompressed .br/.gz siblings negotiated via Accept-Encoding
+    - single byte-range requests (206/416)
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+        hashed = HASHED_NAME_RE.match(name)
+        if hashed:
+            etag_base = hashed.group(1)
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            etag_base = hashlib.md5(f"{name}:{stat_result.st_size}".encode()).hexdigest()
+            cache_control = DEFAULT_CACHE_CONTROL
+
+        headers = {"cache-control": cache_control, "accept-ranges": "bytes"}
+        compressible = Path(name).suffix.lower() in COMPRESSIBLE_EXTENSIONS
+        if compressible:
+            headers["vary"] = "Accept-Encoding"
+
+        encoding, variant_path = self._negotiate_variant(full_path, request_headers) if compressible else (None, None)
+        # Each representation needs its own validator
+        headers["etag"] = f'"{etag_base}-{encoding}"' if encoding else f'"{etag_base}"'
+
+        if self.is_not_modified(Headers(headers=headers), request_headers):
+            return NotModifiedResponse(Headers(headers=headers))
+
+        if encoding:
+            headers["content-encoding"] = encoding
+            return FileResponse(variant_path, status_code=status_code, headers=headers, media_type=media_type)
+
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and (if_range is None or if_range == headers["etag"]):
+            try:
+                byte_range = parse_byte_range(range_header, stat_result.st_size)
+            except ValueError:
+                return Response(status_code=416, headers={"content-range": f"bytes */{stat_result.st_size}"})
+            if byte_range is not None:
+                start, end = byte_range
+                return PartialFileResponse(str(full_path), start, end, stat_result.st_size, headers, media_type)
+
+        return FileResponse(full_path, status_code=status_code, headers=headers, media_type=media_type, stat_result=stat_result)
+
+    @staticmethod
+    def _negotiate_variant(full_path, request_headers: Headers) -> Tuple[Optional[str], Optional[str]]:
+        accepted = {
+            token.split(";")[0].strip().lower()
+            for token in request_headers.get("accept-encoding", "").split(",")
+        }
+        for encoding, suffix in COMPRESSED_VARIANTS:
+            if encoding in accepted:
+                variant_path = f"{full_path}{suffix}"
+                if os.path.isfile(variant_path):
+                    return encoding, variant_path
+        return None, None
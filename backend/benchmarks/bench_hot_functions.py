@@ -0,0 +1,182 @@
+"""
+Hot Function Micro-benchmark for Vivento Platform
+Per-call time and memory of the pure functions on every request path: JWT
+issue/decode, Epoint signatures and callback decoding, Template/Event/Guest
+construction and transactional email rendering. Runs offline (no MongoDB,
+no network).
+
+Timing: loop counts are calibrated so one sample takes --sample-time, then
+--repeat samples are taken; median and interquartile range per call are
+reported (min is kept for reference). Memory: tracemalloc peak of a single
+call and bytes still held after 1000 calls. Application logging goes to a
+NullHandler, so log record creation is measured but terminal output is not.
+
+Usage: python backend/benchmarks/bench_hot_functions.py [--json] [--filter epoint] [--compare previous.json]
+"""
+import argparse
+import base64
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "vivento_benchmark")
+os.environ.setdefault("EPOINT_PRIVATE_KEY", "benchmark-private-key")
+
+import jwt
+
+import server
+from email_service import get_password_reset_email_template, get_payment_invoice_email_template, get_welcome_email_template
+from epoint_service import EpointService
+from benchmarks import payloads
+
+logging.root.handlers = [logging.NullHandler()]
+
+MEMORY_CALLS = 1000
+
+
+def cases() -> Dict[str, Callable[[], Any]]:
+    """Benchmark name -> zero-argument callable doing one unit of work"""
+    token = server.create_access_token({"sub": "0b7f3c1e-8f1a-4a5e-9c43-7a1f2d9e6b10"})
+    epoint = EpointService()
+    callback = {"order_id": "BAL-0b7f3c1e-1A2B3C4D", "status": "success", "transaction": "TX000012345678", "amount": "20.00"}
+    data = base64.b64encode(json.dumps(callback).encode()).decode()
+    signature = epoint.generate_signature(data)
+    template = payloads.templates(1)[0]
+    large_template = payloads.templates(1, element_count=60)[0]
+    event = payloads.event()
+    guest = payloads.guests(1)[0]
+
+    return {
+        "jwt.create_access_token": lambda: server.create_access_token({"sub": "0b7f3c1e-8f1a-4a5e-9c43-7a1f2d9e6b10"}),
+        "jwt.decode": lambda: jwt.decode(token, server.SECRET_KEY, algorithms=[server.ALGORITHM]),
+        "epoint.generate_signature": lambda: epoint.generate_signature(data),
+        "epoint.verify_callback_signature": lambda: epoint.verify_callback_signature(data, signature),
+        "epoint.decode_callback_data": lambda: epoint.decode_callback_data(data),
+        "model.Template (12 elements)": lambda: server.Template(**template),
+        "model.Template (60 elements)": lambda: server.Template(**large_template),
+        "model.Event (40 elements)": lambda: server.Event(**event),
+        "model.Guest": lambda: server.Guest(**guest),
+        "email.welcome": lambda: get_welcome_email_template("Aysel Məmmədova"),
+        "email.password_reset": lambda: get_password_reset_email_template("Aysel Məmmədova", "c2VjcmV0LXJlc2V0LXRva2Vu"),
+        "email.payment_invoice": lambda: get_payment_invoice_email_template("Aysel Məmmədova", 20.0, 35.5, "TX000012345678"),
+    }
+
+
+def measure_time(func: Callable[[], Any], repeat: int, sample_time: float) -> Dict[str, float]:
+    """Per-call seconds over `repeat` calibrated samples"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    # Scale the loop count so one sample lasts about sample_time
+    number = max(1, int(number * sample_time / max(elapsed, 1e-9)))
+    samples = sorted(total / number for total in timer.repeat(repeat=repeat, number=number))
+    quartiles = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    return {
+        "loops": number,
+        "samples": len(samples),
+        "median_us": statistics.median(samples) * 1e6,
+        "min_us": samples[0] * 1e6,
+        "iqr_us": (quartiles[2] - quartiles[0]) * 1e6,
+        "ops_per_s": 1 / statistics.median(samples),
+    }
+
+
+def measure_memory(func: Callable[[], Any]) -> Dict[str, float]:
+    """Peak bytes allocated by one call, and bytes retained per call over many calls"""
+    func()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+
+        gc.collect()
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(MEMORY_CALLS):
+            func()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak - baseline, "retained_bytes_per_call": max(0.0, (after - before) / MEMORY_CALLS)}
+
+
+def environment() -> Dict[str, str]:
+    import pydantic
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "pydantic": pydantic.VERSION,
+        "pyjwt": jwt.__version__,
+    }
+
+
+def run(name_filter: str = "", repeat: int = 15, sample_time: float = 0.05) -> List[Dict[str, Any]]:
+    results = []
+    for name, func in cases().items():
+        if name_filter and name_filter not in name:
+            continue
+        results.append({"name": name, **measure_time(func, repeat, sample_time), **measure_memory(func)})
+    return results
+
+
+def compare(results: List[Dict[str, Any]], previous: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Median change per benchmark; a change counts only when the medians differ
+    by more than the combined interquartile ranges (run-to-run noise).
+    """
+    reference = {row["name"]: row for row in previous}
+    changes = []
+    for row in results:
+        old = reference.get(row["name"])
+        if old is None:
+            continue
+        delta = row["median_us"] - old["median_us"]
+        changes.append({
+            "name": row["name"],
+            "old_median_us": old["median_us"],
+            "new_median_us": row["median_us"],
+            "change": delta / old["median_us"],
+            "significant": abs(delta) > row["iqr_us"] + old["iqr_us"],
+        })
+    return changes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print results (with environment) as JSON")
+    parser.add_argument("--filter", default="", help="only benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=15, help="timing samples per benchmark")
+    parser.add_argument("--sample-time", type=float, default=0.05, help="target seconds per sample")
+    parser.add_argument("--compare", type=argparse.FileType("r"), help="JSON output of an earlier run")
+    args = parser.parse_args()
+
+    results = run(args.filter, args.repeat, args.sample_time)
+    changes = compare(results, json.load(args.compare)["results"]) if args.compare else []
+    if args.json:
+        output = {"environment": environment(), "results": results}
+        if args.compare:
+            output["changes"] = changes
+        print(json.dumps(output, indent=2))
+    else:
+        for row in results:
+            print(f"{row['name']:<34} {row['median_us']:9.2f} µs ± {row['iqr_us']:7.2f} (IQR)  "
+                  f"{row['ops_per_s']:12,.0f} ops/s  peak {row['peak_bytes']:8,.0f} B  "
+                  f"retained {row['retained_bytes_per_call']:6,.1f} B/call")
+        for change in changes:
+            marker = "*" if change["significant"] else " "
+            print(f"{marker} {change['name']:<34} {change['old_median_us']:9.2f} -> {change['new_median_us']:9.2f} µs "
+                  f"({change['change']:+.1%})")
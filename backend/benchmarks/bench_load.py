@@ -0,0 +1,304 @@
+"""
+Load Benchmark for Vivento Platform
+Runs the FastAPI app in-process (startup hooks included) against a local
+MongoDB and replays traffic scenarios: invite-link bursts, RSVP spikes, bulk
+guest entry, template browsing and payment callbacks. Reports p50/p95/p99
+latency and throughput per endpoint and compares them with a stored baseline.
+
+The benchmark seeds its own database (LOAD_TEST_DB_NAME, default
+vivento_loadtest, never DB_NAME from .env) and drops it afterwards. Emails are
+disabled. Baselines are machine specific: record one with --save-baseline on
+the machine that runs the comparison.
+
+Usage: python backend/benchmarks/bench_load.py [--json] [--scenario rsvp_spike] [--scale 1.0]
+           [--concurrency 50] [--baseline PATH] [--save-baseline] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+# Always a dedicated database: the benchmark drops it when done
+os.environ["DB_NAME"] = os.environ.get("LOAD_TEST_DB_NAME", "vivento_loadtest")
+os.environ["RESEND_API_KEY"] = ""
+
+import httpx
+
+import server
+from benchmarks import payloads
+from epoint_service import epoint_service
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "load.json"
+RSVP_ANSWERS = ["gəlirəm", "gəlmirəm"]
+
+# (label, request) pairs; label is the endpoint template results are grouped by
+Operation = Tuple[str, Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]]
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def reset_database() -> None:
+    for name in await server.db.list_collection_names():
+        await server.db.drop_collection(name)
+
+
+async def seed(scale: float, rng: random.Random) -> Dict[str, Any]:
+    """Users with an event each, guests, templates and pending payments"""
+    user_count = max(2, int(50 * scale))
+    guests_per_event = max(10, int(200 * scale))
+
+    templates = payloads.templates(max(10, int(200 * scale)), seed=rng.randint(0, 10**6))
+    await server.db.templates.insert_many(templates)
+
+    users, events, guest_tokens = [], [], []
+    for index in range(user_count):
+        user = server.User(email=f"load{index}@example.invalid", name=f"Yük testi {index}", balance=1000.0)
+        await server.db.users.insert_one(user.model_dump())
+        event = payloads.event(seed=index, element_count=20)
+        event["user_id"] = user.id
+        await server.db.events.insert_one(dict(event))
+        guests = payloads.guests(guests_per_event, event_id=event["id"], seed=index)
+        await server.db.guests.insert_many([dict(guest) for guest in guests])
+        users.append({"id": user.id, "headers": {"Authorization": "Bearer " + server.create_access_token({"sub": user.id})}})
+        events.append(event["id"])
+        guest_tokens.append([guest["unique_token"] for guest in guests])
+
+    orders = []
+    for index in range(max(10, int(500 * scale))):
+        order_id = f"BAL-LOAD-{index:06d}"
+        payment = server.Payment(user_id=rng.choice(users)["id"], amount=float(rng.choice([5, 10, 20, 50])), payment_method="epoint")
+        await server.db.payments.insert_one({**payment.model_dump(), "order_id": order_id})
+        orders.append(order_id)
+
+    return {
+        "users": users,
+        "events": events,
+        "guest_tokens": guest_tokens,
+        "templates": [template["id"] for template in templates],
+        "parent_categories": sorted({template["parent_category"] for template in templates}),
+        "orders": orders,
+    }
+
+
+def invite_burst(fixture, scale: float, rng: random.Random) -> List[Operation]:
+    """A shared invitation link opened by every guest of a few events at once"""
+    tokens = [token for event_tokens in fixture["guest_tokens"][:5] for token in event_tokens]
+    operations = []
+    for _ in range(max(50, int(2000 * scale))):
+        token = rng.choice(tokens)
+        operations.append(("GET /api/invite/{token}", lambda c, token=token: c.get(f"/api/invite/{token}")))
+    return operations
+
+
+def rsvp_spike(fixture, scale: float, rng: random.Random) -> List[Operation]:
+    """Guests answering right after the invitations go out"""
+    tokens = [token for event_tokens in fixture["guest_tokens"] for token in event_tokens]
+    rng.shuffle(tokens)
+    operations = []
+    for token in tokens[:max(50, int(1000 * scale))]:
+        body = {"status": rng.choice(RSVP_ANSWERS)}
+        operations.append(("POST /api/invite/{token}/rsvp", lambda c, token=token, body=body: c.post(f"/api/invite/{token}/rsvp", json=body)))
+    return operations
+
+
+def bulk_guest_entry(fixture, scale: float, rng: random.Random) -> List[Operation]:
+    """Hosts typing in their guest lists (the first 30 are free, the rest are charged)"""
+    operations = []
+    for user, event_id in list(zip(fixture["users"], fixture["events"]))[:10]:
+        for index in range(max(10, int(50 * scale))):
+            body = {"name": f"Yeni qonaq {index}", "phone": f"+99455{rng.randint(1000000, 9999999)}"}
+            operations.append((
+                "POST /api/events/{event_id}/guests",
+                lambda c, event_id=event_id, body=body, headers=user["headers"]: c.post(f"/api/events/{event_id}/guests", json=body, headers=headers),
+            ))
+            if index % 25 == 24:
+                operations.append((
+                    "GET /api/events/{event_id}/guests",
+                    lambda c, event_id=event_id, headers=user["headers"]: c.get(f"/api/events/{event_id}/guests", headers=headers),
+                ))
+    return operations
+
+
+def template_browsing(fixture, scale: float, rng: random.Random) -> List[Operation]:
+    """Visitors paging through the catalog"""
+    pages = [
+        ("GET /api/templates", lambda c: c.get("/api/templates")),
+        ("GET /api/templates/popular", lambda c: c.get("/api/templates/popular")),
+    ]
+    for sort in ("newest", "popular"):
+        for offset in (0, 24, 48):
+            pages.append(("GET /api/templates/browse", lambda c, sort=sort, offset=offset: c.get(
+                "/api/templates/browse", params={"sort": sort, "offset": offset})))
+    for parent in fixture["parent_categories"]:
+        pages.append(("GET /api/templates/category/{parent_category}", lambda c, parent=parent: c.get(f"/api/templates/category/{parent}")))
+        pages.append(("GET /api/templates/browse", lambda c, parent=parent: c.get(
+            "/api/templates/browse", params={"parent_category": parent})))
+    return [rng.choice(pages) for _ in range(max(50, int(1000 * scale)))]
+
+
+def payment_callbacks(fixture, scale: float, rng: random.Random) -> List[Operation]:
+    """Epoint confirming a wave of balance top-ups"""
+    operations = []
+    for index, order_id in enumerate(fixture["orders"]):
+        payload = {"order_id": order_id, "status": "success" if index % 5 else "failed", "transaction": f"TX{index:08d}"}
+        data = base64.b64encode(json.dumps(payload).encode()).decode()
+        body = {"data": data, "signature": epoint_service.generate_signature(data)}
+        operations.append(("POST /api/payments/callback", lambda c, body=body: c.post("/api/payments/callback", json=body)))
+    return operations
+
+
+SCENARIOS = {
+    "invite_burst": invite_burst,
+    "rsvp_spike": rsvp_spike,
+    "bulk_guest_entry": bulk_guest_entry,
+    "template_browsing": template_browsing,
+    "payment_callbacks": payment_callbacks,
+}
+
+
+async def replay(client: httpx.AsyncClient, operations: List[Operation], concurrency: int):
+    """Run operations with at most `concurrency` in flight; returns samples and wall time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[Tuple[str, int, float]] = []
+
+    async def one(label, request):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                status = (await request(client)).status_code
+            except Exception:
+                status = 0
+            samples.append((label, status, time.perf_counter() - started))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(label, request) for label, request in operations))
+    return samples, time.perf_counter() - started
+
+
+def summarize(scenario: str, samples, elapsed: float, concurrency: int) -> List[Dict[str, Any]]:
+    by_endpoint = defaultdict(list)
+    errors = defaultdict(int)
+    for label, status, latency in samples:
+        by_endpoint[label].append(latency)
+        if not 200 <= status < 400:
+            errors[label] += 1
+    rows = []
+    for label, latencies in sorted(by_endpoint.items()):
+        latencies.sort()
+        rows.append({
+            "scenario": scenario,
+            "endpoint": label,
+            "requests": len(latencies),
+            "errors": errors[label],
+            "concurrency": concurrency,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "rps": len(latencies) / elapsed,
+        })
+    return rows
+
+
+async def run_async(scenarios: List[str], scale: float = 1.0, concurrency: int = 50, seed_value: int = 1,
+                    drop_existing: bool = False):
+    if await server.db.list_collection_names() and not drop_existing:
+        raise SystemExit(f"Database {server.db.name} is not empty; pass --drop-existing to reuse it")
+    await reset_database()
+
+    rng = random.Random(seed_value)
+    results = []
+    try:
+        async with server.app.router.lifespan_context(server.app):
+            fixture = await seed(scale, rng)
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                for name in scenarios:
+                    operations = SCENARIOS[name](fixture, scale, rng)
+                    # Warm caches and code paths so the first requests don't skew p99;
+                    # warm-up operations are not replayed (callbacks and RSVPs are stateful)
+                    warmup, measured = operations[:concurrency], operations[concurrency:]
+                    await replay(client, warmup, concurrency)
+                    samples, elapsed = await replay(client, measured, concurrency)
+                    results.extend(summarize(name, samples, elapsed, concurrency))
+            await reset_database()
+    finally:
+        server.client.close()
+    return results
+
+
+def run(scenarios: List[str] = None, scale: float = 1.0, concurrency: int = 50, seed_value: int = 1,
+        drop_existing: bool = False):
+    return asyncio.run(run_async(scenarios or list(SCENARIOS), scale, concurrency, seed_value, drop_existing))
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Endpoints whose p95 grew or throughput dropped by more than `tolerance`"""
+    reference = {(row["scenario"], row["endpoint"]): row for row in baseline}
+    regressions = []
+    for row in results:
+        previous = reference.get((row["scenario"], row["endpoint"]))
+        if previous is None:
+            continue
+        if row["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{row['scenario']} {row['endpoint']}: p95 {previous['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms")
+        if row["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{row['scenario']} {row['endpoint']}: {previous['rps']:.0f} -> {row['rps']:.0f} req/s")
+        if row["errors"] > previous["errors"]:
+            regressions.append(f"{row['scenario']} {row['endpoint']}: errors {previous['errors']} -> {row['errors']}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="scenario to run (repeatable, default all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for dataset size and request counts")
+    parser.add_argument("--concurrency", type=int, default=50, help="requests in flight")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for data and traffic")
+    parser.add_argument("--drop-existing", action="store_true", help="reuse a non-empty load test database")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--verbose", action="store_true", help="keep application logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        # Request logging would dominate the measurement
+        logging.disable(logging.ERROR)
+
+    results = run(args.scenario, args.scale, args.concurrency, args.seed, args.drop_existing)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for row in results:
+            print(f"{row['scenario']:<18} {row['endpoint']:<46} {row['requests']:6d} req  "
+                  f"p50 {row['p50_ms']:7.1f}  p95 {row['p95_ms']:7.1f}  p99 {row['p99_ms']:7.1f} ms  "
+                  f"{row['rps']:8.1f} req/s  {row['errors']} errors")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+    elif args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
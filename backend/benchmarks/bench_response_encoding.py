@@ -0,0 +1,86 @@
+"""
+Response Encoding Benchmark for Vivento Platform
+Serialization time (json vs orjson) and wire size (identity/gzip/brotli)
+for the heaviest API payloads.
+
+Usage: python backend/benchmarks/bench_response_encoding.py [--json]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from compression import compress_body, SUPPORTED_ENCODINGS
+from benchmarks import payloads
+
+from fastapi import responses
+
+# ORJSONResponse needs orjson at render time
+ORJSONResponse = responses.ORJSONResponse if importlib.util.find_spec("orjson") else None
+
+
+def heavy_payloads():
+    """Response bodies of the endpoints that return the most data"""
+    return {
+        "GET /api/templates (60)": payloads.templates(60),
+        "GET /api/events/{id}": payloads.event(element_count=40),
+        "GET /api/events/{id}/guests (500)": payloads.guests(500),
+    }
+
+
+def best_time(func, number: int, repeat: int = 5) -> float:
+    """Best per-call time in milliseconds"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def run(number: int = 50):
+    results = []
+    for name, payload in heavy_payloads().items():
+        encoded = jsonable_encoder(payload)
+        body = JSONResponse(encoded).body
+        row = {
+            "endpoint": name,
+            "jsonable_encoder_ms": best_time(lambda: jsonable_encoder(payload), number),
+            "json_render_ms": best_time(lambda: JSONResponse(encoded).body, number),
+            "orjson_render_ms": best_time(lambda: ORJSONResponse(encoded).body, number) if ORJSONResponse else None,
+            "identity_bytes": len(body),
+        }
+        for encoding in SUPPORTED_ENCODINGS:
+            row[f"{encoding}_bytes"] = len(compress_body(body, encoding))
+            row[f"{encoding}_ms"] = best_time(lambda: compress_body(body, encoding), number)
+        results.append(row)
+    return results
+
+
+def print_table(results):
+    for row in results:
+        print(row["endpoint"])
+        print(f"  jsonable_encoder   {row['jsonable_encoder_ms']:8.3f} ms")
+        print(f"  json render        {row['json_render_ms']:8.3f} ms")
+        if row["orjson_render_ms"] is not None:
+            speedup = row["json_render_ms"] / row["orjson_render_ms"]
+            print(f"  orjson render      {row['orjson_render_ms']:8.3f} ms  ({speedup:.1f}x)")
+        print(f"  identity           {row['identity_bytes']:8d} B")
+        for encoding in SUPPORTED_ENCODINGS:
+            ratio = row[f"{encoding}_bytes"] / row["identity_bytes"]
+            print(f"  {encoding:<18} {row[f'{encoding}_bytes']:8d} B  ({ratio:.0%}, {row[f'{encoding}_ms']:.3f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--number", type=int, default=50, help="calls per timing sample")
+    args = parser.parse_args()
+
+    results = run(args.number)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
@@ -0,0 +1,91 @@
+"""
+Startup Benchmark for Vivento Platform
+Cold `import server` time in fresh interpreters with lazy feature routers
+(the default) and with LAZY_ROUTERS=false, plus what loading every router
+later costs in lazy mode, and which optional client libraries an import
+pulls in. No MongoDB needed: the client connects lazily.
+
+httpx is listed even though no Vivento module imports it at startup:
+pymongo loads dnspython, which imports httpx when it is installed.
+
+Usage: python backend/benchmarks/bench_startup.py [--json] [--runs 7]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Runs in the child; prints one JSON line
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import server
+imported = time.perf_counter() - started
+loaded_at_import = len(server.feature_routers.loaded)
+libraries = sorted(name for name in ("httpx", "resend", "cloudinary", "passlib", "PIL", "fontTools") if name in sys.modules)
+started = time.perf_counter()
+server.feature_routers.load_all()
+print(json.dumps({
+    "import_s": imported,
+    "load_remaining_s": time.perf_counter() - started,
+    "routers_at_import": loaded_at_import,
+    "libraries_at_import": libraries,
+}))
+"""
+
+
+def probe(lazy: bool) -> Dict[str, float]:
+    env = {
+        **os.environ,
+        "LAZY_ROUTERS": "true" if lazy else "false",
+        "MONGO_URL": os.environ.get("MONGO_URL", "mongodb://localhost:27017"),
+        "DB_NAME": os.environ.get("DB_NAME", "vivento_benchmark"),
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int = 7) -> List[Dict[str, Any]]:
+    samples = {True: [], False: []}
+    # Alternate modes so machine noise hits both equally
+    for _ in range(runs):
+        for lazy in (True, False):
+            samples[lazy].append(probe(lazy))
+
+    results = []
+    for lazy, rows in samples.items():
+        imports = [row["import_s"] for row in rows]
+        results.append({
+            "mode": "lazy" if lazy else "eager",
+            "runs": runs,
+            "import_median_s": statistics.median(imports),
+            "import_min_s": min(imports),
+            "load_remaining_median_s": statistics.median(row["load_remaining_s"] for row in rows),
+            "routers_at_import": rows[0]["routers_at_import"],
+            "libraries_at_import": rows[0]["libraries_at_import"],
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per mode")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for row in results:
+            print(f"{row['mode']:<6} import p50 {row['import_median_s'] * 1000:7.1f} ms  "
+                  f"min {row['import_min_s'] * 1000:7.1f} ms  routers at import {row['routers_at_import']}  "
+                  f"remaining routers {row['load_remaining_median_s'] * 1000:6.1f} ms  "
+                  f"libraries {', '.join(row['libraries_at_import']) or '-'}")
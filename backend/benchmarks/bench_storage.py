@@ -0,0 +1,106 @@
+"""
+Storage Driver Benchmark for Vivento Platform
+put/get/delete latency and throughput of the storage drivers. The local
+driver always runs (in a temporary directory); S3 runs when S3_BUCKET is
+set and Cloudinary when CLOUDINARY_* credentials are set.
+
+Usage: python backend/benchmarks/bench_storage.py [--json] [--objects 50] [--size 262144]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from storage_service import StorageBackend, create_storage
+
+
+def payload(size: int) -> bytes:
+    # Incompressible, like the photos and fonts we store
+    return os.urandom(size)
+
+
+def drivers(local_root: Path):
+    yield create_storage("local", local_root=local_root, local_url_prefix="http://localhost/media")
+    if os.environ.get("S3_BUCKET"):
+        yield create_storage(
+            "s3",
+            s3_bucket=os.environ["S3_BUCKET"],
+            s3_prefix="benchmarks",
+            s3_endpoint_url=os.environ.get("S3_ENDPOINT_URL"),
+            s3_region=os.environ.get("S3_REGION"),
+        )
+    if all(os.environ.get(name) for name in ("CLOUDINARY_CLOUD_NAME", "CLOUDINARY_API_KEY", "CLOUDINARY_API_SECRET")):
+        # Configured from the same variables on first use
+        yield create_storage("cloudinary")
+
+
+async def timed(coroutine) -> float:
+    started = time.perf_counter()
+    await coroutine
+    return time.perf_counter() - started
+
+
+async def bench_driver(storage: StorageBackend, objects: int, size: int, concurrency: int):
+    run_id = uuid.uuid4().hex[:8]
+    data = payload(size)
+    semaphore = asyncio.Semaphore(concurrency)
+    keys = []
+
+    async def limited(coroutine):
+        async with semaphore:
+            return await timed(coroutine)
+
+    async def put(index):
+        # Raw (non-image) content type, so every driver stores the bytes as is
+        stored = await storage.put(f"benchmarks/{run_id}/object_{index}.bin", data, "application/octet-stream")
+        keys.append(stored["key"])
+
+    phases = {}
+    for phase, make in (
+        ("put", lambda index: put(index)),
+        ("get", lambda index: storage.get(keys[index])),
+        ("delete", lambda index: storage.delete(keys[index])),
+    ):
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(limited(make(index)) for index in range(objects)))
+        elapsed = time.perf_counter() - started
+        latencies = sorted(latencies)
+        phases[phase] = {
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+            "ops_per_s": objects / elapsed,
+            "mb_per_s": objects * size / elapsed / 1e6,
+        }
+    return {"driver": storage.name, "objects": objects, "size": size, "concurrency": concurrency, **phases}
+
+
+async def run(objects: int = 50, size: int = 256 * 1024, concurrency: int = 8):
+    with tempfile.TemporaryDirectory() as directory:
+        return [await bench_driver(storage, objects, size, concurrency) for storage in drivers(Path(directory))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--objects", type=int, default=50, help="objects per phase")
+    parser.add_argument("--size", type=int, default=256 * 1024, help="object size in bytes")
+    parser.add_argument("--concurrency", type=int, default=8, help="operations in flight")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.objects, args.size, args.concurrency))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for row in results:
+            for phase in ("put", "get", "delete"):
+                stats = row[phase]
+                print(f"{row['driver']:<11} {phase:<6} p50 {stats['p50_ms']:7.2f} ms  p95 {stats['p95_ms']:7.2f} ms  "
+                      f"{stats['ops_per_s']:8.1f} ops/s  {stats['mb_per_s']:7.1f} MB/s")
@@ -0,0 +1,89 @@
+"""
+Trusted Read Benchmark for Vivento Platform
+Model construction + response_model validation (old list endpoints) versus
+TrustedReader projection/defaults + direct JSON rendering, on 1000-item lists.
+
+Usage: python backend/benchmarks/bench_trusted_reads.py [--json] [--items 1000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "vivento_benchmark")
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from server import Template, BalanceTransaction, BlogPost, DefaultJSONResponse
+from trusted_reads import TrustedReader
+from benchmarks import payloads
+
+
+def validated_path(model, documents):
+    """What the endpoints did before: Model(**doc), then response_model validation and encoding"""
+    field = create_response_field(name="response", type_=List[model])
+    models = [model(**document) for document in documents]
+    content = asyncio.run(serialize_response(field=field, response_content=models))
+    return DefaultJSONResponse(content).body
+
+
+def trusted_path(reader: TrustedReader, documents):
+    return reader.response(documents).body
+
+
+def best_time(func, repeat: int) -> float:
+    """Fastest of `repeat` runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(items: int = 1000, repeat: int = 5):
+    cases = {
+        "templates": (Template, payloads.templates(items)),
+        "transactions": (BalanceTransaction, payloads.transactions(items)),
+        "blog_posts": (BlogPost, payloads.blog_posts(items)),
+    }
+    results = []
+    for name, (model, documents) in cases.items():
+        reader = TrustedReader(model)
+        # Documents as MongoDB returns them with the projection applied
+        projected = [{key: value for key, value in document.items() if key in reader.projection} for document in documents]
+        validated = best_time(lambda: validated_path(model, documents), repeat)
+        trusted = best_time(lambda: trusted_path(reader, projected), repeat)
+        results.append({
+            "list": name,
+            "items": items,
+            "validated_ms": validated * 1000,
+            "trusted_ms": trusted * 1000,
+            "validated_items_per_s": items / validated,
+            "trusted_items_per_s": items / trusted,
+            "speedup": validated / trusted,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--items", type=int, default=1000, help="documents per list")
+    parser.add_argument("--repeat", type=int, default=5, help="timing samples per case")
+    args = parser.parse_args()
+
+    results = run(args.items, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for row in results:
+            print(f"{row['list']:<14} validated {row['validated_ms']:8.2f} ms  "
+                  f"trusted {row['trusted_ms']:7.2f} ms  "
+                  f"({row['trusted_items_per_s']:,.0f} items/s, {row['speedup']:.1f}x)")
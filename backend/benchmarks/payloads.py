@@ -0,0 +1,140 @@
+"""
+Benchmark Payloads for Vivento Platform
+Deterministic documents shaped like what the API stores and returns
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+FONTS = ["Inter", "Space Grotesk", "Playfair Display", "Great Vibes", "Montserrat"]
+COLORS = ["#1f2937", "#6b7280", "#be185d", "#9ca3af", "#b45309", "#065f46"]
+TEXTS = ["Toy Mərasimi", "Gəlin və Kişi adları", "Tədbir tarixi", "Tədbir yeri",
+         "Sizi səbirsizliklə gözləyirik", "Nişan Mərasimi", "Ad Günü Şənliyi"]
+PARENT_CATEGORIES = {
+    "toy": ["toy-devetname", "nisan", "xina"],
+    "dogum-gunu": ["ad-gunu-devetname", "ad-gunu-kart"],
+    "usaq": ["usaq-ad-gunu", "baby-shower"],
+    "biznes": ["korporativ", "konfrans"],
+}
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def design_data(rng: random.Random, element_count: int = 12) -> Dict[str, Any]:
+    """Canvas document in the editor's format (text and image elements)"""
+    elements = []
+    for index in range(element_count):
+        base = {
+            "id": f"element-{index}",
+            "x": rng.randint(0, 350), "y": rng.randint(0, 550),
+            "width": rng.randint(50, 300), "height": rng.randint(20, 200),
+            "rotation": 0, "zIndex": index + 1,
+        }
+        if index % 4 == 3:
+            base.update({
+                "type": "image",
+                "src": f"https://res.cloudinary.com/vivento/image/upload/v1/decor/{_uuid(rng)}.png",
+                "purpose": "decorative", "purposeLabel": "🎨 Dekorativ Element", "borderRadius": 0,
+            })
+        else:
+            base.update({
+                "type": "text",
+                "content": rng.choice(TEXTS),
+                "fontSize": rng.randint(12, 36), "fontFamily": rng.choice(FONTS),
+                "color": rng.choice(COLORS), "fontWeight": rng.choice(["normal", "bold"]),
+                "textAlign": "center",
+            })
+        elements.append(base)
+    return {"canvas": {"width": 400, "height": 600, "background": "#ffffff"}, "elements": elements}
+
+
+def templates(count: int, seed: int = 1, element_count: int = 12) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    docs = []
+    for index in range(count):
+        parent = rng.choice(list(PARENT_CATEGORIES))
+        docs.append({
+            "id": _uuid(rng),
+            "name": f"{rng.choice(TEXTS)} {index}",
+            "category": parent,
+            "parent_category": parent,
+            "sub_category": rng.choice(PARENT_CATEGORIES[parent]),
+            "thumbnail_url": f"https://res.cloudinary.com/vivento/image/upload/v1/templates/{index}.jpg",
+            "design_data": design_data(rng, element_count),
+            "is_premium": index % 3 == 0,
+            "price_per_invitation": 0.1 if index % 3 == 0 else 0.0,
+            "created_at": BASE_TIME + timedelta(minutes=index),
+        })
+    return docs
+
+
+def event(seed: int = 1, element_count: int = 40) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        "id": _uuid(rng),
+        "user_id": _uuid(rng),
+        "name": "Aysel və Murad toyu",
+        "date": BASE_TIME + timedelta(days=90),
+        "location": "Bakı, Şüvəlan Park Hotel",
+        "map_link": "https://maps.google.com/?q=40.4093,49.8671",
+        "additional_notes": "Dress code: klassik",
+        "template_id": _uuid(rng),
+        "custom_design": design_data(rng, element_count),
+        "show_envelope_animation": True,
+        "created_at": BASE_TIME,
+        "updated_at": BASE_TIME,
+    }
+
+
+def guests(count: int, event_id: str = "event-1", seed: int = 1) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{
+        "id": _uuid(rng),
+        "event_id": event_id,
+        "name": f"Qonaq {index}",
+        "phone": f"+99450{rng.randint(1000000, 9999999)}",
+        "email": f"qonaq{index}@example.az" if index % 2 else None,
+        "unique_token": _uuid(rng),
+        "rsvp_status": rng.choice(["pending", "attending", "declined"]),
+        "created_at": BASE_TIME + timedelta(minutes=index),
+    } for index in range(count)]
+
+
+def transactions(count: int, user_id: str = "user-1", seed: int = 1) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{
+        "id": _uuid(rng),
+        "user_id": user_id,
+        "amount": round(rng.uniform(-20, 50), 2),
+        "transaction_type": rng.choice(["payment", "invitation_charge", "refund"]),
+        "description": f"Əməliyyat {index}",
+        "payment_method": "card" if index % 2 else None,
+        "payment_id": _uuid(rng) if index % 2 else None,
+        "status": "completed",
+        "created_at": BASE_TIME + timedelta(hours=index),
+    } for index in range(count)]
+
+
+def blog_posts(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    paragraph = "<p>Toy dəvətnaməsi seçərkən rəng, şrift və kağız keyfiyyətinə diqqət edin.</p>"
+    return [{
+        "id": _uuid(rng),
+        "title": f"Məqalə {index}",
+        "slug": f"meqale-{index}",
+        "content": paragraph * rng.randint(5, 30),
+        "excerpt": "Dəvətnamə seçimi haqqında məsləhətlər",
+        "thumbnail": f"https://res.cloudinary.com/vivento/image/upload/v1/blog/{index}.jpg",
+        "author": "Vivento",
+        "author_id": "admin",
+        "category": rng.choice(["toy", "dizayn", "məsləhət"]),
+        "tags": rng.sample(["toy", "nişan", "dizayn", "ad-günü", "biznes"], 2),
+        "published": True,
+        "views": rng.randint(0, 5000),
+        "created_at": BASE_TIME + timedelta(hours=index),
+        "updated_at": BASE_TIME + timedelta(hours=index),
+    } for index in range(count)]
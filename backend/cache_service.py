@@ -0,0 +1,129 @@
+"""
+In-process Cache Service for Vivento Platform
+Named TTL caches for read-heavy content (pages, blog, templates)
+"""
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry expiry and hit/miss counters.
+
+    `max_bytes` additionally bounds caches of bytes values by their total
+    length; values larger than the whole budget are not cached.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 1024, max_bytes: Optional[int] = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _size(self, value: Any) -> int:
+        return len(value) if self.max_bytes is not None else 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= self._size(value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value or default if missing/expired"""
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store value, evicting the least recently used entry when full"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if key in self._entries:
+            self._remove(key)
+        size = self._size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single key"""
+        if key in self._entries:
+            self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every key matching predicate, returns number of dropped keys"""
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Registry of all named caches in this worker
+_caches: Dict[str, TTLCache] = {}
+
+
+def get_cache(name: str, ttl_seconds: float = 300, max_entries: int = 1024, max_bytes: Optional[int] = None) -> TTLCache:
+    """Get or create a named cache"""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = TTLCache(name, ttl_seconds, max_entries, max_bytes)
+        _caches[name] = cache
+    return cache
+
+
+def all_caches() -> Dict[str, TTLCache]:
+    return dict(_caches)
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a serialized response body"""
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison is fine for GET revalidation
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
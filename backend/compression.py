@@ -0,0 +1,202 @@
+"""
+Response Compression for Vivento Platform
+Accept-Encoding negotiated brotli/gzip compression of API responses
+"""
+import logging
+import zlib
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Preferred first when the client accepts several with the same q-value
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# Streams must reach the client as they are produced
+EXCLUDED_TYPES = ("text/event-stream",)
+
+
+def negotiate_encoding(accept_encoding: str, supported: Tuple[str, ...] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """Pick the best supported encoding for an Accept-Encoding header (None = identity)"""
+    qualities: Dict[str, float] = {}
+    for token in accept_encoding.split(","):
+        coding, _, params = token.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in supported:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith(EXCLUDED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class _Compressor:
+    """Incremental gzip/brotli compressor with a common interface"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so the client can decode it right away"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+def compress_body(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """One-shot compression of a complete response body"""
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress(data) + compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    Compress compressible responses of at least `minimum_size` bytes with the
+    best encoding the client accepts.
+
+    Responses that already carry a Content-Encoding (precompressed static
+    files), partial content and non-text media types are passed through.
+    Brotli quality defaults to 4: close to gzip speed, noticeably smaller.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        # Byte ranges refer to the identity representation
+        if encoding is None or "range" in request_headers:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        self.started = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            if (
+                message["status"] in (204, 206, 304)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+            ):
+                self.passthrough = True
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                # Whole body in one message: compress only when it pays off
+                if len(body) >= self.middleware.minimum_size:
+                    compressed = compress_body(body, self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+                    if len(compressed) < len(body):
+                        self._mark_encoded(headers)
+                        headers["content-length"] = str(len(compressed))
+                        body = compressed
+                await self._flush_start()
+                await self._send({"type": "http.response.body", "body": body, "more_body": False})
+                return
+
+            # Streaming response: compress chunk by chunk
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            self._mark_encoded(headers)
+            del headers["content-length"]
+            await self._flush_start()
+
+        if self.compressor is None:
+            await self._send(message)
+            return
+
+        data = self.compressor.compress(body) if body else b""
+        if not more_body:
+            data += self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _mark_encoded(self, headers: MutableHeaders) -> None:
+        headers["content-encoding"] = self.encoding
+        # The encoded bytes differ, so a strong validator would lie; weak still revalidates
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+
+    async def _flush_start(self) -> None:
+        if not self.started:
+            self.started = True
+            await self._send(self.start_message)
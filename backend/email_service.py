@@ -5,19 +5,20 @@ Handles sending transactional emails via Resend API
 import os
 import asyncio
 import logging
-import resend
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
+from metrics_service import track_external
+
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 logger = logging.getLogger(__name__)
 
-# Initialize Resend
-resend.api_key = os.environ.get("RESEND_API_KEY")
+# Resend SDK is imported on first send; most workers never send email
+RESEND_API_KEY = os.environ.get("RESEND_API_KEY")
 SENDER_EMAIL = os.environ.get("SENDER_EMAIL", "noreply@myvivento.com")
 FRONTEND_URL = os.environ.get("FRONTEND_URL", "https://myvivento.com")
 
@@ -291,10 +292,13 @@ async def send_email(to_email: str, subject: str, html_content: str) -> dict:
     """
     Send email using Resend API (async, non-blocking)
     """
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         logger.error("RESEND_API_KEY not configured")
         return {"success": False, "error": "Email service not configured"}
-    
+
+    import resend
+    resend.api_key = RESEND_API_KEY
+
     params = {
         "from": f"Vivento <{SENDER_EMAIL}>",
         "to": [to_email],
@@ -304,7 +308,8 @@ async def send_email(to_email: str, subject: str, html_content: str) -> dict:
     
     try:
         # Run sync SDK in thread to keep FastAPI non-blocking
-        email_response = await asyncio.to_thread(resend.Emails.send, params)
+        with track_external("resend", "send_email"):
+            email_response = await asyncio.to_thread(resend.Emails.send, params)
         logger.info(f"Email sent successfully to {to_email}, ID: {email_response.get('id')}")
         return {
             "success": True,
@@ -0,0 +1,64 @@
+"""
+Remote Fetch Service for Vivento Platform
+Downloads of user-supplied image URLs: allowed hosts only, every redirect
+re-checked, bodies capped while streaming
+"""
+import logging
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Image hosts design and template URLs point at; our own host is added by the caller
+DEFAULT_IMAGE_HOSTS = ("res.cloudinary.com", "images.unsplash.com", "plus.unsplash.com")
+MAX_REDIRECTS = 3
+
+
+class FetchRefused(ValueError):
+    """URL outside the allowed hosts, non-200 response or body over the limit"""
+
+
+def url_host(url: Optional[str]) -> Optional[str]:
+    """Lower-cased host of an http(s) URL, None for anything else"""
+    try:
+        parts = urlsplit(url or "")
+    except ValueError:
+        return None
+    if parts.scheme not in ("http", "https"):
+        return None
+    return parts.hostname
+
+
+def host_allowed(url: str, allowed_hosts: Iterable[str]) -> bool:
+    host = url_host(url)
+    return host is not None and host in allowed_hosts
+
+
+async def fetch_bytes(client, url: str, allowed_hosts: Iterable[str], max_bytes: int) -> bytes:
+    """
+    GET `url` with an httpx.AsyncClient. Redirects are followed by hand so
+    each hop is checked against `allowed_hosts`; the body is read in chunks
+    and the download stops as soon as it exceeds `max_bytes`.
+    """
+    allowed_hosts = frozenset(allowed_hosts)
+    for _ in range(MAX_REDIRECTS + 1):
+        if not host_allowed(url, allowed_hosts):
+            raise FetchRefused(f"Host not allowed: {url_host(url) or url}")
+        async with client.stream("GET", url, follow_redirects=False) as response:
+            if response.is_redirect and response.next_request is not None:
+                url = str(response.next_request.url)
+                continue
+            if response.status_code != 200:
+                raise FetchRefused(f"HTTP {response.status_code}")
+            declared = response.headers.get("content-length", "")
+            if declared.isdigit() and int(declared) > max_bytes:
+                raise FetchRefused(f"Too large: {declared} bytes")
+            chunks = []
+            received = 0
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > max_bytes:
+                    raise FetchRefused(f"Too large: over {max_bytes} bytes")
+                chunks.append(chunk)
+            return b"".join(chunks)
+    raise FetchRefused(f"Too many redirects: {url}")
@@ -0,0 +1,185 @@
+"""
+Font Service for Vivento Platform
+Converts uploaded fonts to WOFF2, builds per-script subsets, names files
+by content hash and generates @font-face CSS
+"""
+import hashlib
+import io
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Unicode ranges we render invitations in (CSS unicode-range syntax)
+FONT_SUBSETS = {
+    # Basic Latin + Latin-1 (ç ö ü), Ğğ, İı, Şş, Əə, typographic punctuation, € and ₼
+    "latin-az": "U+0000-00FF, U+011E-011F, U+0130-0131, U+015E-015F, U+018F, U+0259, "
+                "U+2013-2014, U+2018-201E, U+2022, U+2026, U+20AC, U+20BC",
+    "cyrillic": "U+0400-045F, U+0490-0491, U+2116",
+}
+
+MAX_CODEPOINT = 0x10FFFF
+
+CSS_FORMATS = {
+    "woff2": "woff2",
+    "woff": "woff",
+    "truetype": "truetype",
+    "opentype": "opentype",
+}
+
+
+def parse_unicode_range(unicode_range: str) -> List[int]:
+    """Expand 'U+0000-00FF, U+0259' into code points"""
+    codepoints = []
+    for part in unicode_range.split(","):
+        part = part.strip().upper().removeprefix("U+")
+        if "-" in part:
+            start, end = part.split("-")
+            codepoints.extend(range(int(start, 16), int(end, 16) + 1))
+        elif part:
+            codepoints.append(int(part, 16))
+    return codepoints
+
+
+def remainder_unicode_range(unicode_ranges: List[str]) -> Optional[str]:
+    """CSS unicode-range of every code point not covered by unicode_ranges"""
+    covered = sorted(set().union(*(parse_unicode_range(unicode_range) for unicode_range in unicode_ranges)))
+    gaps = []
+    start = 0
+    for codepoint in covered:
+        if codepoint > start:
+            gaps.append((start, codepoint - 1))
+        start = codepoint + 1
+    if start <= MAX_CODEPOINT:
+        gaps.append((start, MAX_CODEPOINT))
+    if not gaps:
+        return None
+    return ", ".join(f"U+{first:X}" if first == last else f"U+{first:X}-{last:X}" for first, last in gaps)
+
+
+def css_string(value: str) -> str:
+    """Escape a value for a single-quoted CSS string"""
+    return value.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\A ").replace("\r", "")
+
+
+def content_hash(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()[:16]
+
+
+def _woff2_available() -> bool:
+    try:
+        import brotli  # noqa: F401  (required by fontTools for WOFF2)
+        from fontTools.ttLib import TTFont  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _build_subset(contents: bytes, unicodes: Optional[List[int]]) -> Optional[bytes]:
+    """WOFF2 of the font restricted to unicodes (whole font if None)"""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(io.BytesIO(contents))
+    if unicodes is not None:
+        cmap = font.getBestCmap() or {}
+        unicodes = [codepoint for codepoint in unicodes if codepoint in cmap]
+        if not unicodes:
+            return None
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    options.glyph_names = False
+
+    subsetter = subset.Subsetter(options=options)
+    if unicodes is None:
+        subsetter.populate(unicodes=font.getBestCmap().keys())
+    else:
+        subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+
+    output = io.BytesIO()
+    font.flavor = "woff2"
+    font.save(output)
+    return output.getvalue()
+
+
+def process_font(contents: bytes, file_ext: str) -> Dict[str, Any]:
+    """
+    Build deliverable font files from an uploaded font (CPU-bound, run off the event loop).
+
+    Returns {"content_hash", "font_format", "files": [{"subset", "filename", "data", "unicode_range"}]}.
+    The first file is always the complete font. Without fontTools/brotli
+    the original file is returned unchanged under a content-hashed name.
+    """
+    digest = content_hash(contents)
+    original_format = {".ttf": "truetype", ".otf": "opentype", ".woff": "woff", ".woff2": "woff2"}.get(file_ext, "truetype")
+
+    if not _woff2_available():
+        logger.warning("fontTools/brotli not installed, serving original font without subsets")
+        return {
+            "content_hash": digest,
+            "font_format": original_format,
+            "files": [{"subset": "full", "filename": f"font_{digest}{file_ext}", "data": contents, "unicode_range": None}],
+        }
+
+    files = [{
+        "subset": "full",
+        "filename": f"font_{digest}.woff2",
+        "data": _build_subset(contents, None),
+        "unicode_range": None,
+    }]
+    for name, unicode_range in FONT_SUBSETS.items():
+        data = _build_subset(contents, parse_unicode_range(unicode_range))
+        if data is None:
+            # Font has no glyphs for this script
+            continue
+        files.append({
+            "subset": name,
+            "filename": f"font_{digest}_{name}.woff2",
+            "data": data,
+            "unicode_range": unicode_range,
+        })
+
+    return {"content_hash": digest, "font_format": "woff2", "files": files}
+
+
+def build_font_face_css(fonts: List[Dict[str, Any]]) -> str:
+    """@font-face rules for stored fonts; subsets let browsers fetch only needed scripts"""
+    rules = []
+    for font in fonts:
+        family = font.get("font_family") or font.get("name")
+        if not family:
+            continue
+        files = font.get("files") or []
+        subsets = [file for file in files if file.get("unicode_range")]
+        full = next((file for file in files if not file.get("unicode_range")), None)
+        full = full or {"url": font.get("file_url"), "format": font.get("font_format"), "unicode_range": None}
+
+        if subsets:
+            # Code points outside the subsets come from the complete font;
+            # a disjoint range keeps browsers from downloading it for text
+            # the subsets already cover
+            remainder = remainder_unicode_range([file["unicode_range"] for file in subsets])
+            sources = subsets + ([{**full, "unicode_range": remainder}] if remainder else [])
+        else:
+            # Legacy uploads (no subsets) get a single rule pointing at the original file
+            sources = [full]
+        for source in sources:
+            if not source.get("url"):
+                continue
+            css_format = CSS_FORMATS.get(source.get("format") or "woff2", "truetype")
+            lines = [
+                "@font-face {",
+                f"  font-family: '{css_string(family)}';",
+                f"  src: url('{source['url']}') format('{css_format}');",
+                "  font-display: swap;",
+            ]
+            if source.get("unicode_range"):
+                lines.append(f"  unicode-range: {source['unicode_range']};")
+            lines.append("}")
+            rules.append("\n".join(lines))
+    return "\n\n".join(rules) + ("\n" if rules else "")
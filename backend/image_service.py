@@ -0,0 +1,273 @@
+"""
+Image Service for Vivento Platform
+Responsive thumbnail variants (width buckets in AVIF/WebP plus a tiny
+blurred placeholder), pre-processing and fingerprinting of uploaded photos,
+processed in a worker pool
+"""
+import asyncio
+import base64
+import io
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from asset_service import content_hash, store_asset
+from fetch_service import DEFAULT_IMAGE_HOSTS, fetch_bytes
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTHS = (160, 320, 480, 640, 960)
+THUMBNAIL_FORMATS = ("avif", "webp")
+# Width used for <img src> when the browser ignores srcset
+DEFAULT_THUMBNAIL_WIDTH = 480
+LQIP_WIDTH = 24
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+
+PHOTO_FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+def avif_supported() -> bool:
+    try:
+        from PIL import features
+        return bool(features.check("avif"))
+    except Exception:
+        return False
+
+
+def thumbnail_filename(digest: str, width: int, image_format: str) -> str:
+    return f"thumb_{digest}_{width}.{image_format}"
+
+
+def build_srcset(variants: List[Dict[str, Any]]) -> str:
+    return ", ".join(f"{variant['url']} {variant['width']}w" for variant in variants)
+
+
+# Processing (runs inside worker processes: bytes in, bytes out)
+
+def _encode(image, image_format: str, quality: int, **options) -> bytes:
+    buffer = io.BytesIO()
+    if image_format == "avif":
+        image.save(buffer, "AVIF", quality=quality - 25, speed=8, **options)
+    elif image_format == "webp":
+        image.save(buffer, "WEBP", quality=quality, method=4, **options)
+    else:
+        image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True, **options)
+    return buffer.getvalue()
+
+
+def build_thumbnails(data: bytes, widths: List[int], formats: List[str], quality: int = 80) -> Dict[str, Any]:
+    """
+    Resize a source image to every width bucket it can fill (never upscaled)
+    in each format, plus a base64 placeholder for blur-up loading.
+    """
+    from PIL import Image, ImageFilter, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    if image.mode == "RGBA":
+        # Thumbnails sit on light cards; flatten once instead of per format
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    source_width, source_height = image.size
+    usable = [width for width in sorted(widths) if width <= source_width] or [source_width]
+
+    files = []
+    for width in usable:
+        height = max(1, round(source_height * width / source_width))
+        resized = image if width == source_width else image.resize((width, height), Image.Resampling.LANCZOS)
+        for image_format in formats:
+            files.append({"format": image_format, "width": width, "height": height, "data": _encode(resized, image_format, quality)})
+
+    lqip_height = max(1, round(source_height * LQIP_WIDTH / source_width))
+    lqip = image.resize((LQIP_WIDTH, lqip_height), Image.Resampling.BILINEAR).filter(ImageFilter.GaussianBlur(1))
+    lqip_data = _encode(lqip, "webp", 30)
+
+    return {
+        "width": source_width,
+        "height": source_height,
+        "lqip": "data:image/webp;base64," + base64.b64encode(lqip_data).decode("ascii"),
+        "files": files,
+    }
+
+
+def preprocess_photo(data: bytes, max_dimension: int = 2560, image_format: str = "webp", quality: int = 82) -> Optional[Dict[str, Any]]:
+    """
+    Upload-ready version of a user photo: EXIF orientation applied, metadata
+    stripped (GPS, camera serials), longest side capped at `max_dimension`
+    and re-encoded as WebP/JPEG.
+
+    Returns None when the bytes should go out untouched: files Pillow cannot
+    read (SVG, HEIC without a plugin) and animations, which would lose frames.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        image = Image.open(io.BytesIO(data))
+    except UnidentifiedImageError:
+        return None
+    if getattr(image, "n_frames", 1) > 1:
+        return None
+
+    # JPEG can decode straight at a reduced scale, far cheaper than a full decode + resize
+    image.draft("RGB", (max_dimension, max_dimension))
+    # Keep the colour profile for RGB sources; converted CMYK/grey profiles would no longer match
+    icc_profile = image.info.get("icc_profile") if image.mode in ("RGB", "RGBA") else None
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+    if image_format not in PHOTO_FORMATS or (has_alpha and image_format == "jpeg"):
+        # JPEG has no alpha channel
+        image_format = "webp"
+    options = {"icc_profile": icc_profile} if icc_profile else {}
+    encoded = _encode(image, image_format, quality, **options)
+
+    return {
+        "data": encoded,
+        "format": image_format,
+        "content_type": PHOTO_FORMATS[image_format],
+        "width": image.width,
+        "height": image.height,
+        "original_bytes": len(data),
+        "bytes": len(encoded),
+    }
+
+
+def image_fingerprint(data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Perceptual fingerprint for near-duplicate detection: a 64-bit difference
+    hash (dHash, survives re-encoding and resizing), the mean colour (dHash
+    alone cannot tell flat or gradient images of different colours apart)
+    and the displayed size. None for files Pillow cannot read.
+    """
+    from PIL import Image, ImageOps, ImageStat, UnidentifiedImageError
+
+    try:
+        image = Image.open(io.BytesIO(data))
+    except UnidentifiedImageError:
+        return None
+    # Displayed size, read before draft() scales the decode down
+    width, height = image.size
+    if image.getexif().get(0x0112) in (5, 6, 7, 8):
+        width, height = height, width
+    image.draft("RGB", (256, 256))
+    image = ImageOps.exif_transpose(image)
+
+    rgb = image.convert("RGB")
+    mean_color = [round(channel) for channel in ImageStat.Stat(rgb.resize((16, 16), Image.Resampling.BILINEAR)).mean]
+    pixels = rgb.convert("L").resize((9, 8), Image.Resampling.LANCZOS).tobytes()
+    bits = 0
+    for row in range(8):
+        for column in range(8):
+            left, right = pixels[row * 9 + column], pixels[row * 9 + column + 1]
+            bits = (bits << 1) | (left > right)
+
+    return {
+        "phash": f"{bits:016x}",
+        "mean_color": mean_color,
+        "width": width,
+        "height": height,
+    }
+
+
+class ImageProcessor:
+    """
+    Runs CPU-bound image work in a spawn-based process pool so the API
+    workers' event loops stay responsive; `max_workers=0` uses a thread.
+
+    When a worker process dies (OOM kill) the pool is replaced and the job
+    retried once; a job that breaks the fresh pool too fails on its own.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+
+    async def run(self, func: Callable, *args):
+        if self.max_workers <= 0:
+            return await asyncio.to_thread(func, *args)
+        for attempt in range(2):
+            if self._executor is None:
+                # spawn: forking a process that owns Mongo client threads is unsafe
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=get_context("spawn"))
+            executor = self._executor
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                # Concurrent jobs see the same broken pool; only the first replaces it
+                if self._executor is executor:
+                    self._executor = None
+                    executor.shutdown(wait=False, cancel_futures=True)
+                if attempt:
+                    raise
+                logger.warning(f"Worker process died during {func.__name__}, retrying in a new pool")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+async def fetch_image(
+    url: str,
+    local_path: Callable[[str], Optional[Path]],
+    allowed_hosts: Iterable[str] = DEFAULT_IMAGE_HOSTS,
+    timeout: float = 15.0,
+) -> bytes:
+    """
+    Source bytes of an image URL, read from disk for files we serve ourselves.
+    Remote URLs must be on `allowed_hosts`; raises FetchRefused otherwise or
+    when the image is over MAX_SOURCE_BYTES.
+    """
+    path = local_path(url)
+    if path is not None:
+        return await asyncio.to_thread(path.read_bytes)
+    import httpx
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        return await fetch_bytes(client, url, allowed_hosts, MAX_SOURCE_BYTES)
+
+
+async def generate_thumbnail_variants(
+    source_url: str,
+    processor: ImageProcessor,
+    output_dir: Path,
+    url_prefix: str,
+    local_path: Callable[[str], Optional[Path]],
+    allowed_hosts: Iterable[str] = DEFAULT_IMAGE_HOSTS,
+) -> Dict[str, Any]:
+    """
+    Build and store thumbnail variants for an image URL.
+
+    Returns the map stored on the template:
+    {source, width, height, lqip, src, srcset: {format: "url 160w, ..."}}
+    """
+    data = await fetch_image(source_url, local_path, allowed_hosts)
+    digest = content_hash(data)
+    formats = [image_format for image_format in THUMBNAIL_FORMATS if image_format != "avif" or avif_supported()]
+    built = await processor.run(build_thumbnails, data, list(THUMBNAIL_WIDTHS), formats)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    url_prefix = url_prefix.rstrip("/")
+    variants: Dict[str, List[Dict[str, Any]]] = {image_format: [] for image_format in formats}
+    for file in built["files"]:
+        filename = thumbnail_filename(digest, file["width"], file["format"])
+        store_asset(output_dir, filename, file["data"])
+        variants[file["format"]].append({"width": file["width"], "height": file["height"], "url": f"{url_prefix}/{filename}"})
+
+    webp = variants["webp"]
+    default = next((variant for variant in webp if variant["width"] >= DEFAULT_THUMBNAIL_WIDTH), webp[-1])
+    return {
+        "source": source_url,
+        "width": built["width"],
+        "height": built["height"],
+        "lqip": built["lqip"],
+        "src": default["url"],
+        "srcset": {image_format: build_srcset(entries) for image_format, entries in variants.items()},
+    }
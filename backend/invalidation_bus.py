@@ -0,0 +1,245 @@
+"""
+Cache Invalidation Bus for Vivento Platform
+Broadcasts cache evictions to every worker through a MongoDB collection,
+read with a change stream (polling on standalone servers)
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import ConnectionFailure, OperationFailure
+
+from cache_service import all_caches
+from metrics_service import registry
+
+logger = logging.getLogger(__name__)
+
+# Server codes meaning "no change streams here" (standalone mongod)
+CHANGE_STREAMS_UNSUPPORTED = {40573}
+# Resume token fell off the oplog: events in between are lost
+CHANGE_STREAM_HISTORY_LOST = {136, 280, 286}
+# Built-in topic: {"cache": name, "key": key or None} for cache_service caches
+CACHE_TOPIC = "cache"
+
+published = registry.counter("cache_invalidations_published_total", "Cache invalidations broadcast by this worker", ("topic",))
+received = registry.counter("cache_invalidations_received_total", "Cache invalidations applied from other workers", ("topic",))
+staleness_flushes = registry.counter(
+    "cache_invalidation_flushes_total", "Full cache flushes because the bus could not confirm it was caught up", ("reason",)
+)
+
+Handler = Callable[[Any], None]
+
+
+def _hashable(value: Any) -> Any:
+    """BSON stores tuples as arrays; cache keys are tuples again on the way out"""
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+def evict_cache(payload: Optional[Dict[str, Any]]) -> None:
+    """Handler of the built-in cache topic; None clears every registered cache"""
+    caches = all_caches()
+    if payload is None:
+        for cache in caches.values():
+            cache.clear()
+        return
+    cache = caches.get(payload["cache"])
+    if cache is None:
+        return
+    if payload.get("key") is None:
+        cache.clear()
+    else:
+        cache.invalidate(_hashable(payload["key"]))
+
+
+class InvalidationBus:
+    """
+    Topic-based eviction messages shared by all workers.
+
+    `publish(topic, key)` runs the local handlers at once and inserts a
+    message; every other worker runs its handlers for the topic with the
+    same key when the message arrives. A key of None means "everything
+    under this topic".
+
+    Staleness bound: with change streams a message arrives within
+    milliseconds, with polling within `poll_interval`. If the worker cannot
+    confirm it has read every message up to `max_staleness` seconds ago
+    (stream down, polls failing, resume token lost) it flushes all
+    subscribed caches, so no entry outlives a missed eviction by more
+    than `max_staleness`.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 2.0,
+        max_staleness: float = 30.0,
+        clock_skew: float = 5.0,
+        retention_seconds: int = 86400,
+    ):
+        self.poll_interval = poll_interval
+        self.max_staleness = max_staleness
+        # Polling reads back this far to catch messages stamped by a slower
+        # clock; publishers lagging by more are only caught by max_staleness
+        self.clock_skew = clock_skew
+        self.retention_seconds = retention_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.mode: Optional[str] = None
+        self._handlers: Dict[str, List[Handler]] = {CACHE_TOPIC: [evict_cache]}
+        self._collection = None
+        self._caught_up_at = time.monotonic()
+        self._tasks: List[asyncio.Task] = []
+        self._sends: set = set()
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def publish(self, topic: str, key: Any = None) -> None:
+        """Evict locally now and broadcast to the other workers"""
+        self._apply(topic, key)
+        published.inc(topic)
+        if self._collection is None:
+            return
+        message = {"topic": topic, "key": key, "origin": self.worker_id, "created_at": datetime.now(timezone.utc)}
+        task = asyncio.create_task(self._send(message))
+        # Keep a reference until the insert finishes
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    def invalidate_cache(self, name: str, key: Any = None) -> None:
+        """Evict one key (or all keys) of a cache_service cache in every worker"""
+        self.publish(CACHE_TOPIC, {"cache": name, "key": key})
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        try:
+            await self._collection.insert_one(message)
+        except Exception as e:
+            # Other workers catch up through the cache TTLs
+            logger.error(f"Broadcasting {message['topic']} invalidation failed: {e}")
+
+    def _apply(self, topic: str, key: Any) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(key)
+            except Exception as e:
+                logger.error(f"Cache invalidation handler for {topic} failed: {e}")
+
+    def _deliver(self, message: Dict[str, Any]) -> None:
+        if message.get("origin") == self.worker_id:
+            return
+        received.inc(message["topic"])
+        self._apply(message["topic"], message.get("key"))
+
+    def flush_all(self, reason: str) -> None:
+        """Run every handler with key None"""
+        staleness_flushes.inc(reason)
+        logger.warning(f"Flushing all invalidation-managed caches ({reason})")
+        for topic in self._handlers:
+            self._apply(topic, None)
+
+    def staleness(self) -> float:
+        """Seconds since the last moment every message is known to be applied"""
+        return time.monotonic() - self._caught_up_at
+
+    async def ensure_indexes(self, collection) -> None:
+        await collection.create_index("created_at", expireAfterSeconds=self.retention_seconds)
+
+    def start(self, collection) -> None:
+        if self._tasks:
+            return
+        self._collection = collection
+        self._caught_up_at = time.monotonic()
+        self._tasks = [asyncio.create_task(self._run()), asyncio.create_task(self._watchdog())]
+
+    async def stop(self) -> None:
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._collection = None
+
+    async def _run(self) -> None:
+        try:
+            await self._watch()
+        except Exception as e:
+            logger.info(f"Change streams unavailable ({e}), polling for cache invalidations every {self.poll_interval}s")
+        await self._poll()
+
+    async def _watch(self) -> None:
+        """
+        Raises when the first watch fails for a reason other than the
+        connection (standalone server, missing privilege); reconnects after
+        that, resuming where the stream stopped.
+        """
+        self.mode = "change_stream"
+        connected = False
+        resume_token = None
+        while True:
+            try:
+                async with self._collection.watch(
+                    [{"$match": {"operationType": "insert"}}],
+                    resume_after=resume_token,
+                    max_await_time_ms=int(min(self.poll_interval, self.max_staleness / 2) * 1000),
+                ) as stream:
+                    while True:
+                        # Everything inserted before this getMore is in its batch
+                        asked_at = time.monotonic()
+                        change = await stream.try_next()
+                        connected = True
+                        resume_token = stream.resume_token
+                        if change is not None:
+                            self._deliver(change["fullDocument"])
+                        self._caught_up_at = asked_at
+            except OperationFailure as e:
+                if not connected or e.code in CHANGE_STREAMS_UNSUPPORTED:
+                    raise
+                if e.code in CHANGE_STREAM_HISTORY_LOST:
+                    resume_token = None
+                    self.flush_all("resume_token_lost")
+                logger.error(f"Cache invalidation stream failed, reconnecting: {e}")
+            except Exception as e:
+                if not connected and not isinstance(e, ConnectionFailure):
+                    raise
+                logger.error(f"Cache invalidation stream failed, reconnecting: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _poll(self) -> None:
+        self.mode = "polling"
+        since = ObjectId.from_datetime(datetime.now(timezone.utc) - timedelta(seconds=self.clock_skew))
+        seen: set = set()
+        while True:
+            asked_at = time.monotonic()
+            asked_wall = datetime.now(timezone.utc)
+            try:
+                messages = await self._collection.find({"_id": {"$gte": since}}).sort("_id", 1).to_list(None)
+            except Exception as e:
+                logger.error(f"Polling cache invalidations failed: {e}")
+            else:
+                for message in messages:
+                    if message["_id"] not in seen:
+                        seen.add(message["_id"])
+                        self._deliver(message)
+                self._caught_up_at = asked_at
+                since = ObjectId.from_datetime(asked_wall - timedelta(seconds=self.clock_skew))
+                seen = {message_id for message_id in seen if message_id >= since}
+            await asyncio.sleep(self.poll_interval)
+
+    async def _watchdog(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.poll_interval, self.max_staleness / 2))
+            if self.staleness() > self.max_staleness:
+                self.flush_all("bus_lagging")
+                # Entries cached from now on are bounded again by the next check
+                self._caught_up_at = time.monotonic()
@@ -0,0 +1,129 @@
+"""
+Lazy Router Service for Vivento Platform
+Feature routers (routers/*.py) are imported and mounted on the first request
+under one of their path prefixes instead of at boot, then preloaded in the
+background once the worker is serving
+"""
+import asyncio
+import importlib
+import logging
+import re
+import time
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from metrics_service import registry
+
+logger = logging.getLogger(__name__)
+
+router_load_seconds = registry.gauge(
+    "lazy_router_load_seconds", "Time spent importing and mounting each feature router", ("router",)
+)
+
+
+def compile_prefix(path: str) -> Pattern:
+    """
+    Pattern for a route prefix: matches the path itself and everything below
+    it; a "{param}" segment matches any single segment.
+    """
+    parts = re.split(r"(\{[^}/]+\})", path.rstrip("/"))
+    regex = "".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts)
+    return re.compile(regex + "(?:/|$)")
+
+
+class LazyRouters:
+    """
+    Registry of feature routers by module name and the path prefixes they
+    serve. A router module must expose `router`; its paths are mounted
+    under `prefix`.
+    """
+
+    def __init__(self, app: FastAPI, package: str = "routers", prefix: str = "/api"):
+        self.app = app
+        self.package = package
+        self.prefix = prefix
+        self._prefixes: Dict[str, Tuple[str, ...]] = {}
+        self._patterns: Dict[str, List[Pattern]] = {}
+        # Router name -> seconds its import and mount took
+        self.loaded: Dict[str, float] = {}
+        self._preload_task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, *prefixes: str) -> None:
+        self._prefixes[name] = prefixes
+        self._patterns[name] = [compile_prefix(self.prefix + path) for path in prefixes]
+
+    def names(self) -> List[str]:
+        return list(self._prefixes)
+
+    def prefixes(self, name: str) -> Tuple[str, ...]:
+        return self._prefixes[name]
+
+    def pending(self, path: str) -> List[str]:
+        """Registered routers not loaded yet that may serve `path`"""
+        return [
+            name for name, patterns in self._patterns.items()
+            if name not in self.loaded and any(pattern.match(path) for pattern in patterns)
+        ]
+
+    def load(self, name: str) -> float:
+        """Import and mount a router once; returns the seconds it took"""
+        if name in self.loaded:
+            return 0.0
+        started = time.perf_counter()
+        module = importlib.import_module(f"{self.package}.{name}")
+        self.app.include_router(module.router, prefix=self.prefix)
+        # Regenerated with the new routes on the next /openapi.json
+        self.app.openapi_schema = None
+        elapsed = time.perf_counter() - started
+        self.loaded[name] = elapsed
+        router_load_seconds.set(elapsed, name)
+        logger.info(f"Loaded {name} routes in {elapsed * 1000:.1f} ms")
+        return elapsed
+
+    def load_all(self) -> None:
+        for name in self._prefixes:
+            self.load(name)
+
+    async def _preload(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        for name in self._prefixes:
+            if name not in self.loaded:
+                try:
+                    self.load(name)
+                except Exception as e:
+                    logger.error(f"Preloading {name} routes failed: {e}")
+                # Let requests run between routers
+                await asyncio.sleep(0)
+
+    def start_preload(self, delay: float) -> None:
+        """Load the remaining routers `delay` seconds from now; a negative delay disables it"""
+        if delay >= 0 and self._preload_task is None:
+            self._preload_task = asyncio.create_task(self._preload(delay))
+
+    async def stop(self) -> None:
+        if self._preload_task is not None:
+            self._preload_task.cancel()
+            try:
+                await self._preload_task
+            except asyncio.CancelledError:
+                pass
+            self._preload_task = None
+
+
+class LazyRouterMiddleware:
+    """Loads the routers a request may need before it is routed"""
+
+    def __init__(self, app: ASGIApp, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            if scope["path"] == self.routers.app.openapi_url:
+                self.routers.load_all()
+            else:
+                for name in self.routers.pending(scope["path"]):
+                    self.routers.load(name)
+        await self.app(scope, receive, send)
@@ -0,0 +1,308 @@
+"""
+Metrics Service for Vivento Platform
+In-process counters, gauges and histograms rendered in the Prometheus text
+format: HTTP latency per route template, MongoDB command latency, external
+API latency and cache hit ratios
+"""
+import abc
+import hmac
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cache_service import all_caches
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+EXTERNAL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Listener callbacks run on driver threads
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abc.abstractmethod
+    def render(self) -> List[str]:
+        """Sample lines, without the HELP/TYPE header"""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = HTTP_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last = +Inf), sum]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics of this worker process. Collectors are callables returning
+    extra metrics computed at scrape time (cache statistics).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = HTTP_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        metrics = list(self._metrics.values())
+        for collector in self._collectors:
+            try:
+                metrics.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry, shared by the services that report into it
+registry = MetricsRegistry()
+
+http_requests = registry.counter("http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+http_duration = registry.histogram("http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"), HTTP_BUCKETS)
+http_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served")
+mongo_duration = registry.histogram("mongodb_command_duration_seconds", "MongoDB command latency by originating route and collection", ("route", "collection", "command"), MONGO_BUCKETS)
+mongo_failures = registry.counter("mongodb_command_failures_total", "Failed MongoDB commands by originating route and collection", ("route", "collection", "command"))
+external_duration = registry.histogram("external_request_duration_seconds", "Latency of calls to external services", ("service", "operation", "outcome"), EXTERNAL_BUCKETS)
+
+
+@contextmanager
+def track_external(service: str, operation: str):
+    """Time a call to Cloudinary, Resend, Epoint, ... (works around sync and async code)"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        external_duration.observe(time.perf_counter() - started, service, operation, outcome)
+
+
+def scrape_authorized(authorization: Optional[str], token: Optional[str]) -> bool:
+    """Authorization header carries `Bearer <token>`; without a configured token nobody may scrape"""
+    if not token or not authorization:
+        return False
+    return hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())
+
+
+def cache_metrics() -> List[_Metric]:
+    hits = Counter("cache_hits_total", "In-process cache hits", ("cache",))
+    misses = Counter("cache_misses_total", "In-process cache misses", ("cache",))
+    entries = Gauge("cache_entries", "Entries held by in-process caches", ("cache",))
+    ratio = Gauge("cache_hit_ratio", "Hit ratio of in-process caches since start", ("cache",))
+    for name, cache in all_caches().items():
+        stats = cache.stats()
+        hits.inc(name, amount=stats["hits"])
+        misses.inc(name, amount=stats["misses"])
+        entries.set(stats["size"], name)
+        ratio.set(stats["hit_ratio"], name)
+    return [hits, misses, entries, ratio]
+
+
+registry.add_collector(cache_metrics)
+
+
+def route_label(scope: Scope) -> str:
+    """Route template ("/api/events/{event_id}") so label cardinality stays bounded"""
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    if scope.get("endpoint") is not None and scope.get("root_path"):
+        # Static file mounts
+        return scope["root_path"] + "/{path}"
+    return "<unmatched>"
+
+
+# Scope of the request being served. Motor copies the context into its
+# executor, so driver callbacks can still tell which route issued a command.
+current_scope: ContextVar[Optional[Scope]] = ContextVar("current_scope", default=None)
+
+
+def current_route() -> str:
+    scope = current_scope.get()
+    return route_label(scope) if scope is not None else "<background>"
+
+
+class MetricsMiddleware:
+    """Records count, latency and in-flight requests per route template and status"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_scope.reset(token)
+            http_in_flight.dec()
+            route = route_label(scope)
+            http_duration.observe(time.perf_counter() - started, scope["method"], route)
+            http_requests.inc(scope["method"], route, str(status))
+
+
+def command_collection(event) -> str:
+    """Collection a command targets (getMore names it separately)"""
+    target = event.command.get(event.command_name)
+    if not isinstance(target, str):
+        target = event.command.get("collection")
+    return target if isinstance(target, str) else "<none>"
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    pymongo CommandListener feeding mongodb_command_* metrics; called on
+    driver threads, durations come from the driver itself.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple[int, object], Tuple[str, str, str]] = {}
+
+    def started(self, event) -> None:
+        self._pending[(event.request_id, event.connection_id)] = (current_route(), command_collection(event), event.command_name)
+
+    def succeeded(self, event) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool) -> None:
+        labels: Optional[Tuple[str, str, str]] = self._pending.pop((event.request_id, event.connection_id), None)
+        if labels is None:
+            return
+        mongo_duration.observe(event.duration_micros / 1e6, *labels)
+        if failed:
+            mongo_failures.inc(*labels)
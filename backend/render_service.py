@@ -0,0 +1,529 @@
+"""
+Render Service for Vivento Platform
+Server-side rendering of invitation designs (design_data / custom_design)
+to PNG/WebP, cached on disk by design hash and run in a process pool
+"""
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from asset_service import store_asset
+from cache_service import get_cache
+from fetch_service import DEFAULT_IMAGE_HOSTS, fetch_bytes
+from image_service import ImageProcessor
+
+logger = logging.getLogger(__name__)
+
+# Output widths are bucketed so the cache stays bounded
+RENDER_WIDTHS = (400, 800, 1200)
+RENDER_FORMATS = {"png": "PNG", "webp": "WEBP", "jpg": "JPEG"}
+DEFAULT_CANVAS = {"width": 400, "height": 600, "background": "#ffffff"}
+DEFAULT_LINE_HEIGHT = 1.4  # InvitationPage default
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+IMAGE_CACHE_BYTES = 64 * 1024 * 1024
+# Reused renders get a fresh mtime at most this often; pruning drops the oldest
+RENDER_TOUCH_SECONDS = 86400
+
+# Designs are user input: values outside these limits are clamped before
+# drawing so no design can allocate an unbounded canvas or font
+MAX_CANVAS_SIDE = 4000
+MAX_ASPECT_RATIO = 3.0
+MAX_FONT_SIZE = 400
+MAX_LINE_HEIGHT = 5.0
+# Elements may overhang the canvas, by at most half its size on each side
+MAX_ELEMENT_SCALE = 1.5
+
+# Bump when the drawing code changes so old renders are not reused
+RENDERER_VERSION = 1
+
+# Used for families without an uploaded font and for glyphs a custom font lacks
+# (ə, ğ, ı are missing from many decorative fonts); first existing file wins
+FALLBACK_FONT_PATHS = (
+    os.environ.get("RENDER_FALLBACK_FONT", ""),
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
+    "/usr/share/fonts/noto/NotoSans-Regular.ttf",
+)
+
+
+def canvas_settings(design: Dict[str, Any]) -> Dict[str, Any]:
+    """Canvas of a design; the editor saves `canvasSize`, seeded templates use `canvas`"""
+    canvas = design.get("canvasSize") or design.get("canvas") or {}
+    return {**DEFAULT_CANVAS, **canvas}
+
+
+def canvas_size(design: Dict[str, Any]) -> Tuple[int, int]:
+    """Canvas width and height in design pixels, clamped to MAX_CANVAS_SIDE and MAX_ASPECT_RATIO"""
+    settings = canvas_settings(design)
+    width = round(_bounded(settings.get("width"), DEFAULT_CANVAS["width"], 1, MAX_CANVAS_SIDE))
+    height = round(_bounded(settings.get("height"), DEFAULT_CANVAS["height"], 1, MAX_CANVAS_SIDE))
+    height = min(max(height, math.ceil(width / MAX_ASPECT_RATIO)), math.floor(width * MAX_ASPECT_RATIO))
+    return width, max(1, height)
+
+
+def bucket_width(width: Optional[int]) -> int:
+    """Smallest render width that covers the requested one"""
+    if not width:
+        return RENDER_WIDTHS[1]
+    for bucket in RENDER_WIDTHS:
+        if width <= bucket:
+            return bucket
+    return RENDER_WIDTHS[-1]
+
+
+def image_sources(design: Dict[str, Any]) -> List[str]:
+    sources = []
+    background = canvas_settings(design).get("backgroundImage")
+    if background:
+        sources.append(background)
+    for element in design.get("elements") or []:
+        if element.get("type") == "image" and element.get("src"):
+            sources.append(element["src"])
+    return list(dict.fromkeys(sources))
+
+
+def font_families(design: Dict[str, Any]) -> List[str]:
+    return sorted({
+        element.get("fontFamily") or "Inter"
+        for element in design.get("elements") or []
+        if element.get("type") == "text"
+    })
+
+
+def design_hash(design: Dict[str, Any], fonts: Dict[str, str]) -> str:
+    """Content address of a render: design, resolved font files and renderer version"""
+    payload = json.dumps(
+        {"design": design, "fonts": fonts, "version": RENDERER_VERSION},
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+# Drawing (runs inside worker processes: only plain data in, bytes out)
+
+def _color(value: Optional[str], default: str = "#000000") -> Tuple[int, ...]:
+    from PIL import ImageColor
+    try:
+        return ImageColor.getrgb(value or default)
+    except ValueError:
+        return ImageColor.getrgb(default)
+
+
+def _number(value: Any, default: float = 0.0) -> float:
+    try:
+        number = float(str(value).removesuffix("px"))
+    except (TypeError, ValueError):
+        return default
+    return number if math.isfinite(number) else default
+
+
+def _bounded(value: Any, default: float, low: float, high: float) -> float:
+    return min(max(_number(value, default), low), high)
+
+
+_codepoint_cache: Dict[str, Optional[frozenset]] = {}
+
+
+def _fallback_font_path() -> Optional[str]:
+    for path in FALLBACK_FONT_PATHS:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def _font_codepoints(path: str) -> Optional[frozenset]:
+    """Code points a font file covers (None = unknown, assume everything)"""
+    if path not in _codepoint_cache:
+        try:
+            from fontTools.ttLib import TTFont
+            _codepoint_cache[path] = frozenset((TTFont(path, lazy=True).getBestCmap() or {}).keys())
+        except Exception:
+            _codepoint_cache[path] = None
+    return _codepoint_cache[path]
+
+
+def _truetype(path: Optional[str], size: int):
+    from PIL import ImageFont
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            pass
+    return ImageFont.load_default(size)
+
+
+class _TextFont:
+    """A family's font plus a fallback for glyphs it does not have"""
+
+    def __init__(self, path: Optional[str], size: int):
+        fallback_path = _fallback_font_path()
+        self.font = _truetype(path or fallback_path, size)
+        self.fallback = _truetype(fallback_path, size) if path and fallback_path else None
+        self.codepoints = _font_codepoints(path) if self.fallback is not None else None
+
+    def runs(self, text: str) -> List[Tuple[str, Any]]:
+        """Split text into (chunk, font) runs"""
+        if self.codepoints is None:
+            return [(text, self.font)]
+        runs: List[Tuple[str, Any]] = []
+        for char in text:
+            font = self.font if ord(char) in self.codepoints or char.isspace() else self.fallback
+            if runs and runs[-1][1] is font:
+                runs[-1] = (runs[-1][0] + char, font)
+            else:
+                runs.append((char, font))
+        return runs
+
+    def length(self, draw, text: str) -> float:
+        return sum(draw.textlength(chunk, font=font) for chunk, font in self.runs(text))
+
+
+def _load_font(family: str, size: int, font_paths: Dict[str, str], cache: Dict) -> _TextFont:
+    key = (family, size)
+    if key not in cache:
+        cache[key] = _TextFont(font_paths.get(family), size)
+    return cache[key]
+
+
+def _open_image(data: Optional[bytes]):
+    from PIL import Image, ImageOps
+    if not data:
+        return None
+    try:
+        image = Image.open(io.BytesIO(data))
+        return ImageOps.exif_transpose(image).convert("RGBA")
+    except Exception:
+        return None
+
+
+def _cover(image, width: int, height: int):
+    """CSS object-fit: cover"""
+    from PIL import Image, ImageOps
+    return ImageOps.fit(image, (max(1, width), max(1, height)), Image.Resampling.LANCZOS)
+
+
+def _wrap(draw, text: str, font: _TextFont, max_width: float) -> List[str]:
+    """white-space: pre-line: keep explicit newlines, wrap words to the box width"""
+    lines = []
+    for paragraph in text.split("\n"):
+        words = paragraph.split()
+        if not words:
+            lines.append("")
+            continue
+        line = words[0]
+        for word in words[1:]:
+            candidate = f"{line} {word}"
+            if font.length(draw, candidate) <= max_width:
+                line = candidate
+            else:
+                lines.append(line)
+                line = word
+        lines.append(line)
+    return lines
+
+
+def _draw_text(canvas, element: Dict[str, Any], scale: float, font_paths: Dict[str, str], font_cache: Dict) -> None:
+    from PIL import ImageDraw
+    content = str(element.get("content") or "")
+    if not content.strip():
+        return
+
+    draw = ImageDraw.Draw(canvas)
+    max_width, max_height = canvas.width * MAX_ELEMENT_SCALE, canvas.height * MAX_ELEMENT_SCALE
+    # No glyph taller than the canvas
+    font_size = max(1, round(min(_bounded(element.get("fontSize"), 16, 1, MAX_FONT_SIZE) * scale, canvas.height)))
+    bold = str(element.get("fontWeight") or "normal") in ("bold", "600", "700", "800", "900")
+    font = _load_font(element.get("fontFamily") or "Inter", font_size, font_paths, font_cache)
+    color = _color(element.get("color"))
+
+    x = min(max(_number(element.get("x")) * scale, -max_width), max_width)
+    y = min(max(_number(element.get("y")) * scale, -max_height), max_height)
+    width = min(max(_number(element.get("width"), 300) * scale, 1), max_width)
+    height = min(max(_number(element.get("height"), 40) * scale, 1), max_height)
+    line_height = font_size * _bounded(element.get("lineHeight"), DEFAULT_LINE_HEIGHT, 0.5, MAX_LINE_HEIGHT)
+    align = element.get("textAlign") or "center"
+
+    lines = _wrap(draw, content, font, width)
+    # Vertically centred in the element box, like the flex container on the invitation page
+    top = y + (height - line_height * len(lines)) / 2
+    ascent, descent = font.font.getmetrics()
+    for index, line in enumerate(lines):
+        line_width = font.length(draw, line)
+        if align == "center":
+            left = x + (width - line_width) / 2
+        elif align == "right":
+            left = x + width - line_width
+        else:
+            left = x
+        # Align runs from different fonts on a shared baseline
+        baseline = top + index * line_height + (line_height - (ascent + descent)) / 2 + ascent
+        for chunk, run_font in font.runs(line):
+            draw.text(
+                (left, baseline), chunk, font=run_font, fill=color, anchor="ls",
+                # Fonts are stored as a single face: synthesize bold like browsers do
+                stroke_width=max(1, font_size // 24) if bold else 0,
+                stroke_fill=color
+            )
+            left += draw.textlength(chunk, font=run_font)
+
+
+def _draw_image(canvas, element: Dict[str, Any], scale: float, images: Dict[str, bytes]) -> None:
+    from PIL import Image, ImageDraw
+    image = _open_image(images.get(element.get("src")))
+    if image is None:
+        # Same as the invitation page: broken images are hidden
+        return
+    max_width, max_height = canvas.width * MAX_ELEMENT_SCALE, canvas.height * MAX_ELEMENT_SCALE
+    width = round(min(max(_number(element.get("width"), 100) * scale, 1), max_width))
+    height = round(min(max(_number(element.get("height"), 100) * scale, 1), max_height))
+    fitted = _cover(image, width, height)
+
+    radius = round(min(max(_number(element.get("borderRadius")) * scale, 0), min(width, height) / 2))
+    mask = fitted.getchannel("A")
+    if radius > 0:
+        rounded = Image.new("L", fitted.size, 0)
+        ImageDraw.Draw(rounded).rounded_rectangle((0, 0, fitted.width - 1, fitted.height - 1), radius=radius, fill=255)
+        mask = Image.composite(mask, rounded, rounded)
+    x = min(max(_number(element.get("x")) * scale, -max_width), max_width)
+    y = min(max(_number(element.get("y")) * scale, -max_height), max_height)
+    canvas.paste(fitted, (round(x), round(y)), mask)
+
+
+def _draw_background(canvas, settings: Dict[str, Any], images: Dict[str, bytes]) -> None:
+    from PIL import Image
+    width, height = canvas.size
+    if settings.get("backgroundGradient"):
+        start = _color(settings.get("gradientStart"), "#ffffff")
+        end = _color(settings.get("gradientEnd"), "#000000")
+        gradient = Image.linear_gradient("L").resize((width, height))
+        canvas.paste(Image.composite(
+            Image.new("RGBA", (width, height), end[:3] + (255,)),
+            Image.new("RGBA", (width, height), start[:3] + (255,)),
+            gradient
+        ))
+    background = _open_image(images.get(settings.get("backgroundImage")))
+    if background is not None:
+        canvas.alpha_composite(_cover(background, width, height))
+
+
+def render_design(
+    design: Dict[str, Any],
+    widths: Iterable[int],
+    image_format: str,
+    images: Dict[str, bytes],
+    font_paths: Dict[str, str],
+) -> Dict[int, bytes]:
+    """
+    Render a design at the largest requested width and downscale for the rest.
+    Pure function of its arguments so it can run in a worker process.
+    """
+    from PIL import Image
+
+    settings = canvas_settings(design)
+    canvas_width, canvas_height = canvas_size(design)
+    widths = sorted(set(widths), reverse=True)
+    scale = widths[0] / canvas_width
+
+    size = (widths[0], max(1, round(canvas_height * scale)))
+    canvas = Image.new("RGBA", size, _color(settings.get("background"), "#ffffff")[:3] + (255,))
+    _draw_background(canvas, settings, images)
+
+    font_cache: Dict = {}
+    elements = sorted(design.get("elements") or [], key=lambda element: _number(element.get("zIndex")))
+    for element in elements:
+        if element.get("type") == "text":
+            _draw_text(canvas, element, scale, font_paths, font_cache)
+        elif element.get("type") == "image":
+            _draw_image(canvas, element, scale, images)
+
+    image = canvas.convert("RGB")
+    outputs = {}
+    for width in widths:
+        if width != image.width:
+            image = image.resize((width, max(1, round(canvas_height * width / canvas_width))), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        if image_format == "webp":
+            image.save(buffer, "WEBP", quality=85, method=4)
+        elif image_format == "jpg":
+            # Link preview crawlers handle JPEG most reliably
+            image.save(buffer, "JPEG", quality=85, optimize=True, progressive=True)
+        else:
+            image.save(buffer, "PNG", optimize=True)
+        outputs[width] = buffer.getvalue()
+    return outputs
+
+
+class RenderService:
+    """
+    Renders designs into content-addressed files under `output_dir`.
+
+    A render is identified by the design, its resolved font files and the
+    renderer version; identical designs (every guest of an event, template
+    previews) are rendered once. Concurrent requests for the same render
+    share one job, and CPU work runs in a process pool (`max_workers=0`
+    renders in a thread instead, for environments without multiprocessing).
+
+    Remote images are only fetched from `allowed_hosts`. With
+    `max_output_bytes`, `start()` prunes the least recently used renders
+    every `prune_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        url_prefix: str,
+        font_resolver: Callable[[List[str]], Awaitable[Dict[str, str]]],
+        local_path: Callable[[str], Optional[Path]],
+        max_workers: int = 2,
+        fetch_timeout: float = 10.0,
+        allowed_hosts: Iterable[str] = DEFAULT_IMAGE_HOSTS,
+        image_cache_bytes: int = IMAGE_CACHE_BYTES,
+        max_output_bytes: Optional[int] = None,
+        prune_interval: float = 3600.0,
+    ):
+        self.output_dir = output_dir
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.url_prefix = url_prefix.rstrip("/")
+        self._font_resolver = font_resolver
+        self._local_path = local_path
+        self.max_workers = max_workers
+        self.fetch_timeout = fetch_timeout
+        self.allowed_hosts = frozenset(allowed_hosts)
+        self.max_output_bytes = max_output_bytes
+        self.prune_interval = prune_interval
+        self._pool = ImageProcessor(max_workers)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._images = get_cache("render-images", ttl_seconds=3600, max_entries=256, max_bytes=image_cache_bytes)
+        self._prune_task: Optional[asyncio.Task] = None
+
+    def filename(self, digest: str, width: int, image_format: str) -> str:
+        return f"render_{digest}_{width}.{image_format}"
+
+    def url(self, digest: str, width: int, image_format: str) -> str:
+        return f"{self.url_prefix}/{self.filename(digest, width, image_format)}"
+
+    async def render(self, design: Dict[str, Any], widths: Iterable[int], image_format: str = "png") -> Dict[int, str]:
+        """Render (or reuse) a design, returns {width: url}"""
+        if image_format not in RENDER_FORMATS:
+            raise ValueError(f"Unsupported render format: {image_format}")
+        widths = sorted({bucket_width(width) for width in widths})
+        fonts = await self._font_resolver(font_families(design))
+        digest = design_hash(design, fonts)
+
+        missing = [
+            width for width in widths
+            if not self._reuse(self.output_dir / self.filename(digest, width, image_format))
+        ]
+        if missing:
+            key = f"{digest}:{image_format}:{','.join(map(str, missing))}"
+            job = self._inflight.get(key)
+            if job is None:
+                job = asyncio.ensure_future(self._render_files(digest, design, missing, image_format, fonts))
+                self._inflight[key] = job
+                job.add_done_callback(lambda _: self._inflight.pop(key, None))
+            await asyncio.shield(job)
+
+        return {width: self.url(digest, width, image_format) for width in widths}
+
+    def _reuse(self, path: Path) -> bool:
+        """True if the render exists; renders in use are kept fresh for prune()"""
+        try:
+            modified = path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        if time.time() - modified > RENDER_TOUCH_SECONDS:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                return False
+        return True
+
+    def prune(self) -> int:
+        """Delete the least recently used renders above max_output_bytes, returns bytes freed"""
+        if self.max_output_bytes is None:
+            return 0
+        files = []
+        for path in self.output_dir.glob("render_*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort(reverse=True)
+        kept = freed = 0
+        for _, size, path in files:
+            if kept + size <= self.max_output_bytes:
+                kept += size
+                continue
+            path.unlink(missing_ok=True)
+            freed += size
+        if freed:
+            logger.info(f"Pruned {freed} bytes of renders, {kept} bytes kept")
+        return freed
+
+    def start(self) -> None:
+        if self.max_output_bytes is not None and self._prune_task is None:
+            self._prune_task = asyncio.create_task(self._prune_periodically())
+
+    async def _prune_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.prune)
+            except Exception as e:
+                logger.error(f"Render pruning error: {e}")
+            await asyncio.sleep(self.prune_interval)
+
+    async def _render_files(self, digest: str, design: Dict[str, Any], widths: List[int],
+                            image_format: str, fonts: Dict[str, str]) -> None:
+        images = await self._load_images(image_sources(design))
+        outputs = await self._pool.run(render_design, design, widths, image_format, images, fonts)
+        for width, data in outputs.items():
+            store_asset(self.output_dir, self.filename(digest, width, image_format), data)
+        logger.info(f"Rendered design {digest} at {widths} ({image_format})")
+
+    async def _load_images(self, sources: List[str]) -> Dict[str, bytes]:
+        images: Dict[str, bytes] = {}
+        remote = []
+        for source in sources:
+            cached = self._images.get(source)
+            if cached is not None:
+                images[source] = cached
+                continue
+            path = self._local_path(source)
+            if path is not None:
+                if path.is_file():
+                    images[source] = await asyncio.to_thread(path.read_bytes)
+                continue
+            if source.startswith(("http://", "https://")):
+                remote.append(source)
+
+        if remote:
+            import httpx
+            async with httpx.AsyncClient(timeout=self.fetch_timeout) as client:
+                results = await asyncio.gather(
+                    *(fetch_bytes(client, source, self.allowed_hosts, MAX_IMAGE_BYTES) for source in remote),
+                    return_exceptions=True
+                )
+            for source, result in zip(remote, results):
+                if isinstance(result, Exception):
+                    # Same as the invitation page: the image is left out
+                    logger.warning(f"Render image skipped ({source}): {result}")
+                    continue
+                images[source] = result
+
+        for source, data in images.items():
+            self._images.set(source, data)
+        return images
+
+    def shutdown(self) -> None:
+        if self._prune_task is not None:
+            self._prune_task.cancel()
+            self._prune_task = None
+        self._pool.shutdown()
@@ -0,0 +1,309 @@
+"""
+Admin Routes for Vivento Platform
+Template management, popularity rebuilds and initial page setup
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException
+from pymongo import UpdateOne
+
+from template_stats import POPULARITY_WEIGHTS
+from server import (
+    User, build_template_thumbnails, db, get_current_user, invalidate_page_cache,
+    invalidate_template_caches, template_popularity,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Admin routes
+@router.post("/admin/templates")
+async def create_template(template_data: dict, current_user: User = Depends(get_current_user)):
+    # Check if user is admin
+    if not (current_user.email == 'admin@vivento.az' or 'admin' in current_user.email):
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    template_data["thumbnail_variants"] = await build_template_thumbnails(template_data.get("thumbnail_url"))
+    await db.templates.insert_one(template_data)
+    invalidate_template_caches()
+    return {"message": "Template əlavə edildi", "id": template_data["id"]}
+
+@router.put("/admin/templates/{template_id}")
+async def update_template(template_id: str, template_data: dict, current_user: User = Depends(get_current_user)):
+    # Check if user is admin
+    if not (current_user.email == 'admin@vivento.az' or 'admin' in current_user.email):
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    template_data.pop("thumbnail_variants", None)
+    if "thumbnail_url" in template_data:
+        current = await db.templates.find_one({"id": template_id}, {"_id": 0, "thumbnail_variants": 1}) or {}
+        variants = current.get("thumbnail_variants") or {}
+        if variants.get("source") != template_data["thumbnail_url"]:
+            template_data["thumbnail_variants"] = await build_template_thumbnails(template_data["thumbnail_url"])
+    
+    await db.templates.update_one({"id": template_id}, {"$set": template_data})
+    invalidate_template_caches()
+    return {"message": "Template yeniləndi"}
+
+@router.delete("/admin/templates/{template_id}")
+async def delete_template(template_id: str, current_user: User = Depends(get_current_user)):
+    # Check if user is admin
+    if not (current_user.email == 'admin@vivento.az' or 'admin' in current_user.email):
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    await db.templates.delete_one({"id": template_id})
+    invalidate_template_caches()
+    return {"message": "Template silindi"}
+
+@router.post("/admin/templates/thumbnails/rebuild")
+async def rebuild_template_thumbnails(force: bool = False, current_user: User = Depends(get_current_user)):
+    """Generate thumbnail variants for templates that have none (all templates with force)"""
+    if not (current_user.email == 'admin@vivento.az' or 'admin' in current_user.email):
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        query = {} if force else {"thumbnail_variants": None}
+        templates = await db.templates.find(query, {"_id": 0, "id": 1, "thumbnail_url": 1}).to_list(None)
+        updated = failed = 0
+        for template in templates:
+            variants = await build_template_thumbnails(template.get("thumbnail_url"))
+            if variants is None:
+                failed += 1
+                continue
+            await db.templates.update_one({"id": template["id"]}, {"$set": {"thumbnail_variants": variants}})
+            updated += 1
+        
+        if updated:
+            invalidate_template_caches()
+        return {"updated": updated, "failed": failed}
+    except Exception as e:
+        logger.error(f"Rebuild template thumbnails error: {e}")
+        raise HTTPException(status_code=500, detail="Şəkillər yaradılarkən xəta baş verdi")
+
+@router.post("/admin/template-stats/rebuild")
+async def rebuild_template_stats(current_user: User = Depends(get_current_user)):
+    """
+    Recount events_created and favorites per template from events/users.
+    One-off backfill; invitations_charged cannot be reconstructed and is kept.
+    """
+    if not (current_user.email == 'admin@vivento.az' or 'admin' in current_user.email):
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        events_created = {
+            row["_id"]: row["count"]
+            async for row in db.events.aggregate([
+                {"$match": {"template_id": {"$nin": [None, ""]}}},
+                {"$group": {"_id": "$template_id", "count": {"$sum": 1}}}
+            ])
+        }
+        favorites = {
+            row["_id"]: row["count"]
+            async for row in db.users.aggregate([
+                {"$unwind": "$favorites"},
+                {"$group": {"_id": "$favorites", "count": {"$sum": 1}}}
+            ])
+        }
+        existing = {
+            doc["template_id"]: doc
+            for doc in await db.template_stats.find({}, {"_id": 0}).to_list(None)
+        }
+        
+        operations = []
+        for template_id in set(events_created) | set(favorites) | set(existing):
+            counters = {
+                "events_created": events_created.get(template_id, 0),
+                "favorites": favorites.get(template_id, 0),
+                "invitations_charged": existing.get(template_id, {}).get("invitations_charged", 0)
+            }
+            score = sum(POPULARITY_WEIGHTS[name] * value for name, value in counters.items())
+            operations.append(UpdateOne(
+                {"template_id": template_id},
+                {"$set": {**counters, "score": score, "updated_at": datetime.now(timezone.utc)}},
+                upsert=True
+            ))
+        
+        if operations:
+            await db.template_stats.bulk_write(operations, ordered=False)
+        await template_popularity.refresh()
+        
+        return {"success": True, "templates": len(operations)}
+    except Exception as e:
+        logger.error(f"Rebuild template stats error: {e}")
+        raise HTTPException(status_code=500, detail="Statistika yenilənərkən xəta baş verdi")
+
+@router.post("/admin/setup-pages")
+async def setup_static_pages():
+    """
+    One-time endpoint to create default static pages in the database.
+    This is used to seed the production database with initial page content.
+    Can be called without authentication for initial setup.
+    """
+    try:
+        default_pages = [
+            {
+                "id": str(uuid.uuid4()),
+                "slug": "privacy",
+                "title": "Məxfilik Siyasəti",
+                "content": """<h2>Məxfilik Siyasəti</h2>
+<p>Vivento platformasına xoş gəlmisiniz. Məxfiliyiniz bizim üçün vacibdir.</p>
+
+<h3>1. Toplanılan Məlumatlar</h3>
+<p>Xidmətlərimizdən istifadə etdiyiniz zaman aşağıdakı məlumatları toplaya bilərik:</p>
+<ul>
+  <li>Ad və soyad</li>
+  <li>E-poçt ünvanı</li>
+  <li>Telefon nömrəsi</li>
+  <li>Profil şəkli</li>
+  <li>Tədbir məlumatları (ad, tarix, məkan)</li>
+</ul>
+
+<h3>2. Məlumatların İstifadəsi</h3>
+<p>Topladığımız məlumatları aşağıdakı məqsədlərlə istifadə edirik:</p>
+<ul>
+  <li>Xidmətlərimizi təmin etmək və təkmilləşdirmək</li>
+  <li>Sizinlə əlaqə saxlamaq</li>
+  <li>Dəvətnamələrinizi yaratmaq və göndərmək</li>
+  <li>Texniki dəstək göstərmək</li>
+</ul>
+
+<h3>3. Məlumatların Qorunması</h3>
+<p>Şəxsi məlumatlarınızın təhlükəsizliyini təmin etmək üçün müasir şifrələmə texnologiyalarından istifadə edirik.</p>
+
+<h3>4. Əlaqə</h3>
+<p>Suallarınız üçün bizimlə əlaqə saxlaya bilərsiniz: <a href="mailto:info@vivento.az">info@vivento.az</a></p>""",
+                "meta_description": "Vivento platformasının məxfilik siyasəti",
+                "published": True,
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
+            },
+            {
+                "id": str(uuid.uuid4()),
+                "slug": "terms",
+                "title": "İstifadə Şərtləri",
+                "content": """<h2>İstifadə Şərtləri</h2>
+<p>Bu şərtlər Vivento platformasından istifadə qaydalarını müəyyən edir.</p>
+
+<h3>1. Xidmətlərin Təsviri</h3>
+<p>Vivento rəqəmsal dəvətnamə yaratma və göndərmə platformasıdır. İstifadəçilər toy, nişan, doğum günü və digər tədbirlər üçün dəvətnamələr yarada bilərlər.</p>
+
+<h3>2. Hesab Yaratma</h3>
+<p>Xidmətlərimizdən tam istifadə etmək üçün hesab yaratmalısınız. Hesab yaratarkən:</p>
+<ul>
+  <li>Doğru məlumatlar təqdim etməyə</li>
+  <li>Hesabınızın təhlükəsizliyini qorumağa</li>
+  <li>Parolunuzu başqaları ilə paylaşmamağa</li>
+</ul>
+<p>borclusunuz.</p>
+
+<h3>3. Ödəniş Şərtləri</h3>
+<p>Bəzi xidmətlərimiz ödənişlidir. Ödənişlər Azərbaycan manatı (AZN) ilə həyata keçirilir.</p>
+<ul>
+  <li>İlk 30 dəvətnamə pulsuzdur</li>
+  <li>Premium şablonlar əlavə ödəniş tələb edir</li>
+  <li>Balans artırma minimum 5 AZN-dən başlayır</li>
+</ul>
+
+<h3>4. Qadağan Edilmiş Fəaliyyətlər</h3>
+<p>Aşağıdakı fəaliyyətlər qadağandır:</p>
+<ul>
+  <li>Qanunsuz məzmun paylaşmaq</li>
+  <li>Başqalarının hüquqlarını pozmaq</li>
+  <li>Platformadan sui-istifadə etmək</li>
+  <li>Spam və ya zərərli məzmun yaymaq</li>
+</ul>
+
+<h3>5. Məsuliyyətin Məhdudlaşdırılması</h3>
+<p>Vivento xidmətlərin fasiləsiz işləyəcəyinə zəmanət vermir. Texniki problemlər və ya xarici amillər səbəbindən yaranan zərərlərə görə məsuliyyət daşımırıq.</p>
+
+<h3>6. Şərtlərin Dəyişdirilməsi</h3>
+<p>Bu şərtləri istənilən vaxt dəyişdirmək hüququmuzu saxlayırıq. Dəyişikliklər saytda dərc edildikdən sonra qüvvəyə minir.</p>
+
+<h3>7. Əlaqə</h3>
+<p>Suallarınız üçün: <a href="mailto:info@vivento.az">info@vivento.az</a></p>""",
+                "meta_description": "Vivento platformasının istifadə şərtləri",
+                "published": True,
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
+            },
+            {
+                "id": str(uuid.uuid4()),
+                "slug": "contact",
+                "title": "Əlaqə",
+                "content": """<h2>Bizimlə Əlaqə</h2>
+<p>Vivento komandası ilə əlaqə saxlamaq üçün aşağıdakı üsullardan istifadə edə bilərsiniz.</p>
+
+<h3>E-poçt</h3>
+<p>Ümumi sorğular üçün: <a href="mailto:info@vivento.az">info@vivento.az</a></p>
+<p>Texniki dəstək üçün: <a href="mailto:support@vivento.az">support@vivento.az</a></p>
+
+<h3>Sosial Şəbəkələr</h3>
+<ul>
+  <li>Instagram: <a href="https://instagram.com/vivento.az" target="_blank">@vivento.az</a></li>
+  <li>Facebook: <a href="https://facebook.com/viventoaz" target="_blank">Vivento Azerbaijan</a></li>
+</ul>
+
+<h3>İş Saatları</h3>
+<p>Bazar ertəsi - Cümə: 09:00 - 18:00</p>
+<p>Şənbə: 10:00 - 14:00</p>
+<p>Bazar: Bağlı</p>
+
+<h3>Ünvan</h3>
+<p>Bakı, Azərbaycan</p>
+
+<p><strong>Sizə kömək etməkdən məmnun olarıq!</strong></p>""",
+                "meta_description": "Vivento ilə əlaqə məlumatları",
+                "published": True,
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
+            }
+        ]
+        
+        created_pages = []
+        updated_pages = []
+        
+        for page_data in default_pages:
+            # Check if page already exists
+            existing = await db.pages.find_one({"slug": page_data["slug"]})
+            
+            if existing:
+                # Update existing page if content is empty or minimal
+                if not existing.get("content") or len(existing.get("content", "")) < 100:
+                    await db.pages.update_one(
+                        {"slug": page_data["slug"]},
+                        {"$set": {
+                            "title": page_data["title"],
+                            "content": page_data["content"],
+                            "meta_description": page_data["meta_description"],
+                            "published": True,
+                            "updated_at": datetime.now(timezone.utc)
+                        }}
+                    )
+                    updated_pages.append(page_data["slug"])
+                else:
+                    # Page exists with content, skip
+                    pass
+            else:
+                # Create new page
+                await db.pages.insert_one(page_data)
+                created_pages.append(page_data["slug"])
+        
+        if created_pages or updated_pages:
+            invalidate_page_cache()
+        
+        logger.info(f"Setup pages completed. Created: {created_pages}, Updated: {updated_pages}")
+        
+        return {
+            "success": True,
+            "message": "Statik səhifələr uğurla yaradıldı/yeniləndi",
+            "created": created_pages,
+            "updated": updated_pages,
+            "total_pages": len(default_pages)
+        }
+        
+    except Exception as e:
+        logger.error(f"Setup pages error: {e}")
+        raise HTTPException(status_code=500, detail=f"Səhifələr yaradılarkən xəta: {str(e)}")
@@ -0,0 +1,531 @@
+"""
+Auth Routes for Vivento Platform
+Email/password, Facebook, Google and Emergent sign-in, sessions and profile updates
+"""
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Response
+import httpx
+import jwt
+
+from email_service import send_password_reset_email, send_welcome_email
+from server import (
+    ALGORITHM, FacebookLoginRequest, ForgotPasswordRequest, GoogleLoginRequest, LoginRequest,
+    RegisterRequest, ResetPasswordRequest, SECRET_KEY, TokenResponse, User, create_access_token, db,
+    get_current_user, get_current_user_optional, simple_hash_password, verify_password,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Auth routes
+@router.post("/auth/register", response_model=TokenResponse)
+async def register(request: RegisterRequest):
+    # Check if user exists
+    existing_user = await db.users.find_one({"email": request.email})
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Bu email artıq istifadədədir")
+    
+    # Create user
+    hashed_password = simple_hash_password(request.password)
+    user = User(
+        name=request.name,
+        email=request.email
+    )
+    user_dict = user.dict()
+    user_dict["password"] = hashed_password
+    
+    await db.users.insert_one(user_dict)
+    
+    # Create token
+    access_token = create_access_token(data={"sub": user.id})
+    
+    # Send welcome email (non-blocking, don't wait for result)
+    try:
+        asyncio.create_task(send_welcome_email(request.email, request.name))
+        logger.info(f"Welcome email queued for: {request.email}")
+    except Exception as e:
+        logger.error(f"Failed to queue welcome email: {e}")
+    
+    return TokenResponse(
+        access_token=access_token,
+        token_type="bearer",
+        user=user
+    )
+
+@router.post("/auth/login", response_model=TokenResponse)
+async def login(request: LoginRequest):
+    user_doc = await db.users.find_one({"email": request.email})
+    if not user_doc or not verify_password(request.password, user_doc.get("password", "")):
+        raise HTTPException(status_code=400, detail="Email və ya parol səhvdir")
+    
+    user = User(**user_doc)
+    access_token = create_access_token(data={"sub": user.id})
+    
+    return TokenResponse(
+        access_token=access_token,
+        token_type="bearer",
+        user=user
+    )
+
+@router.post("/auth/forgot-password")
+async def forgot_password(request: ForgotPasswordRequest):
+    """
+    Handle forgot password request.
+    Sends a password reset email with a secure token.
+    """
+    # Check if user exists (but don't reveal this to the client)
+    user_doc = await db.users.find_one({"email": request.email})
+    
+    if user_doc:
+        # Generate a password reset token
+        reset_token = str(uuid.uuid4())
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+        
+        # Store reset token in database
+        await db.password_resets.delete_many({"email": request.email})  # Remove old tokens
+        await db.password_resets.insert_one({
+            "email": request.email,
+            "token": reset_token,
+            "expires_at": expires_at.isoformat(),
+            "created_at": datetime.now(timezone.utc).isoformat()
+        })
+        
+        # Send password reset email
+        try:
+            user_name = user_doc.get("name", "İstifadəçi")
+            await send_password_reset_email(request.email, user_name, reset_token)
+            logger.info(f"Password reset email sent to: {request.email}")
+        except Exception as e:
+            logger.error(f"Failed to send password reset email: {e}")
+    
+    # Always return success for security
+    return {"success": True, "message": "Əgər bu e-poçt mövcuddursa, şifrə bərpa linki göndərildi"}
+
+@router.post("/auth/reset-password")
+async def reset_password(request: ResetPasswordRequest):
+    """
+    Reset password using token from email.
+    """
+    # Find the reset token
+    reset_doc = await db.password_resets.find_one({"token": request.token})
+    
+    if not reset_doc:
+        raise HTTPException(status_code=400, detail="Etibarsız və ya müddəti bitmiş link")
+    
+    # Check if token is expired
+    expires_at = datetime.fromisoformat(reset_doc["expires_at"].replace('Z', '+00:00'))
+    if datetime.now(timezone.utc) > expires_at:
+        await db.password_resets.delete_one({"token": request.token})
+        raise HTTPException(status_code=400, detail="Linkın müddəti bitib. Zəhmət olmasa yenidən cəhd edin.")
+    
+    # Validate new password
+    if len(request.new_password) < 6:
+        raise HTTPException(status_code=400, detail="Şifrə minimum 6 simvol olmalıdır")
+    
+    # Update user's password
+    hashed_password = simple_hash_password(request.new_password)
+    result = await db.users.update_one(
+        {"email": reset_doc["email"]},
+        {"$set": {"password": hashed_password, "updated_at": datetime.now(timezone.utc).isoformat()}}
+    )
+    
+    if result.modified_count == 0:
+        raise HTTPException(status_code=400, detail="İstifadəçi tapılmadı")
+    
+    # Delete used token
+    await db.password_resets.delete_one({"token": request.token})
+    
+    logger.info(f"Password reset successful for: {reset_doc['email']}")
+    
+    return {"success": True, "message": "Şifrəniz uğurla yeniləndi. İndi daxil ola bilərsiniz."}
+
+@router.post("/auth/facebook", response_model=TokenResponse)
+async def facebook_login(request: FacebookLoginRequest):
+    # Verify Facebook token
+    url = "https://graph.facebook.com/me"
+    params = {
+        "access_token": request.access_token,
+        "fields": "id,name,email,picture"
+    }
+    
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, params=params)
+    
+    if response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Facebook token etibarsızdır")
+    
+    facebook_data = response.json()
+    
+    # Check if user exists
+    user_doc = await db.users.find_one({"facebook_id": facebook_data["id"]})
+    
+    if not user_doc and facebook_data.get("email"):
+        # Try to find by email
+        user_doc = await db.users.find_one({"email": facebook_data["email"]})
+        if user_doc:
+            # Link Facebook account
+            await db.users.update_one(
+                {"id": user_doc["id"]}, 
+                {"$set": {"facebook_id": facebook_data["id"], "profile_picture": facebook_data.get("picture", {}).get("data", {}).get("url")}}
+            )
+    
+    if not user_doc:
+        # Create new user
+        user = User(
+            name=facebook_data["name"],
+            email=facebook_data.get("email", ""),
+            facebook_id=facebook_data["id"],
+            profile_picture=facebook_data.get("picture", {}).get("data", {}).get("url")
+        )
+        await db.users.insert_one(user.dict())
+    else:
+        user = User(**user_doc)
+    
+    access_token = create_access_token(data={"sub": user.id})
+    
+    return TokenResponse(
+        access_token=access_token,
+        token_type="bearer",
+        user=user
+    )
+
+@router.post("/auth/google", response_model=TokenResponse)
+async def google_login(request: GoogleLoginRequest):
+    """Google OAuth authentication with real token verification"""
+    try:
+        from google.oauth2 import id_token
+        from google.auth.transport import requests as google_requests
+        
+        credential = request.credential
+        
+        if not credential:
+            raise HTTPException(status_code=400, detail="Google credential tələb olunur")
+        
+        # Verify Google token
+        try:
+            GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
+            
+            if not GOOGLE_CLIENT_ID:
+                raise HTTPException(status_code=500, detail="Google OAuth konfiqurasiya edilməyib")
+            
+            # Verify the token
+            idinfo = id_token.verify_oauth2_token(
+                credential, 
+                google_requests.Request(), 
+                GOOGLE_CLIENT_ID
+            )
+            
+            # Get user info from token
+            google_user_id = idinfo.get('sub')
+            email = idinfo.get('email')
+            name = idinfo.get('name', email.split('@')[0])
+            picture = idinfo.get('picture')
+            
+            logger.info(f"Google auth successful for: {email}")
+            
+        except ValueError as e:
+            logger.error(f"Invalid Google token: {e}")
+            raise HTTPException(status_code=400, detail="Etibarsız Google token")
+        
+        # Check if user exists
+        user_doc = await db.users.find_one({"email": email})
+        
+        if not user_doc:
+            # Create new user
+            new_user = User(
+                email=email,
+                name=name,
+                google_id=google_user_id,
+                profile_picture=picture
+            )
+            await db.users.insert_one(new_user.dict())
+            user = new_user
+            logger.info(f"Created new user: {email}")
+        else:
+            user = User(**user_doc)
+            # Update google_id and picture if not set
+            if not user_doc.get('google_id'):
+                await db.users.update_one(
+                    {"id": user.id},
+                    {"$set": {"google_id": google_user_id, "profile_picture": picture}}
+                )
+        
+        # Create JWT token
+        access_token = create_access_token(data={"sub": user.id})
+        
+        return TokenResponse(
+            access_token=access_token,
+            token_type="bearer",
+            user=user
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Google auth error: {e}")
+        raise HTTPException(status_code=500, detail="Google ilə giriş zamanı xəta baş verdi")
+
+# Emergent Auth Integration - Session Management
+@router.post("/auth/emergent/session")
+async def process_emergent_session(
+    request: Dict[str, str],
+    response: Response
+):
+    """
+    Process Emergent Auth session ID and create local session
+    Receives session_id from frontend, exchanges it for session_token
+    """
+    try:
+        session_id = request.get("session_id")
+        if not session_id:
+            raise HTTPException(status_code=400, detail="session_id tələb olunur")
+        
+        # Exchange session_id for user data and session_token
+        async with httpx.AsyncClient() as client:
+            auth_response = await client.get(
+                "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
+                headers={"X-Session-ID": session_id}
+            )
+            
+            if auth_response.status_code != 200:
+                raise HTTPException(status_code=400, detail="Sessiya etibarsızdır")
+            
+            auth_data = auth_response.json()
+        
+        # Extract user data
+        user_id = auth_data.get("id")
+        email = auth_data.get("email")
+        name = auth_data.get("name", "User")
+        picture = auth_data.get("picture")
+        session_token = auth_data.get("session_token")
+        
+        if not all([user_id, email, session_token]):
+            raise HTTPException(status_code=400, detail="Natamam məlumat")
+        
+        # Check if user exists
+        user_doc = await db.users.find_one({"email": email})
+        
+        if not user_doc:
+            # Create new user
+            new_user = User(
+                id=user_id,  # Use Emergent's user ID
+                email=email,
+                name=name,
+                google_id=user_id,  # Store as Google ID
+                profile_picture=picture
+            )
+            await db.users.insert_one(new_user.dict())
+            user_doc = new_user.dict()
+        
+        # Create session in database
+        session_expires = datetime.now(timezone.utc) + timedelta(days=7)
+        session_data = {
+            "user_id": user_doc["id"],
+            "session_token": session_token,
+            "expires_at": session_expires,
+            "created_at": datetime.now(timezone.utc)
+        }
+        
+        # Remove old sessions for this user
+        await db.user_sessions.delete_many({"user_id": user_doc["id"]})
+        # Insert new session
+        await db.user_sessions.insert_one(session_data)
+        
+        # Set httpOnly cookie
+        response.set_cookie(
+            key="session_token",
+            value=session_token,
+            httponly=True,
+            secure=True,
+            samesite="none",
+            max_age=7 * 24 * 60 * 60,  # 7 days
+            path="/"
+        )
+        
+        user = User(**user_doc)
+        return {
+            "success": True,
+            "user": user,
+            "session_token": session_token
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Emergent session error: {e}")
+        raise HTTPException(status_code=500, detail="Sessiya yaradılarkən xəta")
+
+@router.post("/auth/logout")
+async def logout(
+    response: Response,
+    session_token: Optional[str] = Cookie(None),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """Logout user and clear session"""
+    try:
+        # If we have a session token from cookie, delete it
+        if session_token:
+            await db.user_sessions.delete_one({"session_token": session_token})
+        
+        # If we have current user, delete all their sessions
+        if current_user:
+            await db.user_sessions.delete_many({"user_id": current_user.id})
+        
+        # Clear cookie
+        response.delete_cookie(
+            key="session_token",
+            path="/",
+            secure=True,
+            httponly=True,
+            samesite="none"
+        )
+        
+        return {"success": True, "message": "Çıxış uğurla tamamlandı"}
+    except Exception as e:
+        logger.error(f"Logout error: {e}")
+        raise HTTPException(status_code=500, detail="Çıxış zamanı xəta")
+
+@router.get("/auth/session")
+async def check_session(
+    response: Response,
+    session_token: Optional[str] = Cookie(None),
+    authorization: Optional[str] = None
+):
+    """Check if user has valid session"""
+    try:
+        # Try cookie first
+        token = session_token
+        
+        # Fallback to Authorization header
+        if not token and authorization:
+            if authorization.startswith("Bearer "):
+                token = authorization.replace("Bearer ", "")
+        
+        if not token:
+            return {"authenticated": False, "user": None}
+        
+        # Find session
+        session = await db.user_sessions.find_one({"session_token": token})
+        if not session:
+            # Try JWT token
+            try:
+                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+                user_id = payload.get("sub")
+                if user_id:
+                    user_doc = await db.users.find_one({"id": user_id})
+                    if user_doc:
+                        return {"authenticated": True, "user": User(**user_doc)}
+            except:
+                pass
+            return {"authenticated": False, "user": None}
+        
+        # Check expiry
+        if session["expires_at"] < datetime.now(timezone.utc):
+            await db.user_sessions.delete_one({"session_token": token})
+            response.delete_cookie(key="session_token")
+            return {"authenticated": False, "user": None}
+        
+        # Get user
+        user_doc = await db.users.find_one({"id": session["user_id"]})
+        if not user_doc:
+            return {"authenticated": False, "user": None}
+        
+        return {"authenticated": True, "user": User(**user_doc)}
+        
+    except Exception as e:
+        logger.error(f"Session check error: {e}")
+        return {"authenticated": False, "user": None}
+
+@router.get("/auth/me", response_model=User)
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
+    return current_user
+
+@router.put("/auth/profile", response_model=User)
+async def update_profile(
+    name: Optional[str] = None,
+    profile_picture: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Update user profile (name and profile picture)"""
+    update_data = {}
+    
+    if name:
+        update_data["name"] = name
+    if profile_picture:
+        update_data["profile_picture"] = profile_picture
+    
+    if not update_data:
+        raise HTTPException(status_code=400, detail="Heç bir məlumat dəyişdirilmədi")
+    
+    update_data["updated_at"] = datetime.now(timezone.utc)
+    
+    await db.users.update_one(
+        {"id": current_user.id},
+        {"$set": update_data}
+    )
+    
+    # Fetch updated user
+    updated_user = await db.users.find_one({"id": current_user.id})
+    return User(**updated_user)
+
+@router.put("/auth/email")
+async def update_email(
+    new_email: str,
+    password: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Update user email"""
+    # Check if new email already exists
+    existing_user = await db.users.find_one({"email": new_email})
+    if existing_user and existing_user["id"] != current_user.id:
+        raise HTTPException(status_code=400, detail="Bu email artıq istifadə olunur")
+    
+    # Verify current password
+    user_doc = await db.users.find_one({"id": current_user.id})
+    if not user_doc.get("password"):
+        raise HTTPException(status_code=400, detail="Bu hesab social login ilə yaradılıb")
+    
+    if not verify_password(password, user_doc["password"]):
+        raise HTTPException(status_code=400, detail="Cari parol səhvdir")
+    
+    # Update email
+    await db.users.update_one(
+        {"id": current_user.id},
+        {"$set": {"email": new_email, "updated_at": datetime.now(timezone.utc)}}
+    )
+    
+    return {"message": "Email uğurla dəyişdirildi"}
+
+@router.put("/auth/password")
+async def update_password(
+    current_password: str,
+    new_password: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Update user password"""
+    user_doc = await db.users.find_one({"id": current_user.id})
+    
+    if not user_doc.get("password"):
+        raise HTTPException(status_code=400, detail="Bu hesab social login ilə yaradılıb")
+    
+    # Verify current password
+    if not verify_password(current_password, user_doc["password"]):
+        raise HTTPException(status_code=400, detail="Cari parol səhvdir")
+    
+    # Hash new password
+    hashed_password = simple_hash_password(new_password)
+    
+    # Update password
+    await db.users.update_one(
+        {"id": current_user.id},
+        {"$set": {"password": hashed_password, "updated_at": datetime.now(timezone.utc)}}
+    )
+    
+    return {"message": "Parol uğurla dəyişdirildi"}
@@ -0,0 +1,855 @@
+"""
+CMS Routes for Vivento Platform
+Site settings, CMS pages, blog, custom fonts, hero slides and static pages
+"""
+import asyncio
+import base64
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from fastapi.encoders import jsonable_encoder
+
+from cache_service import make_etag
+from font_service import build_font_face_css, process_font
+from trusted_reads import TrustedReader
+from server import (
+    BlogPost, BlogPostPage, BlogPostSummary, CMSPage, CreateBlogRequest, CustomFont,
+    DefaultJSONResponse, HeroSlide, SiteSettings, SlideCreate, SlideUpdate, UPLOAD_DIR,
+    UpdateBlogRequest, UpdateSiteSettingsRequest, User, blog_cache, blog_view_counter,
+    content_cache, content_response, db, font_storage, get_current_user, invalidate_blog_cache,
+    invalidate_cms_cache, invalidate_font_caches, invalidate_page_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Site Settings endpoints
+@router.get("/site/settings")
+async def get_site_settings():
+    """Get current site settings"""
+    settings_doc = await db.site_settings.find_one({})
+    if not settings_doc:
+        # Create default settings if none exist
+        default_settings = SiteSettings()
+        await db.site_settings.insert_one(default_settings.dict())
+        return default_settings
+    
+    return SiteSettings(**settings_doc)
+
+@router.put("/site/settings")
+async def update_site_settings(
+    request: UpdateSiteSettingsRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Update site settings (admin only)"""
+    try:
+        # Check if user is admin
+        if not (current_user.email == 'admin@vivento.az' or 'admin' in current_user.email):
+            raise HTTPException(status_code=403, detail="Yalnız admin istifadə edə bilər")
+        
+        logger.info(f"Admin {current_user.email} updating site settings: {request}")
+        
+        site_logo = request.site_logo
+        hero_title = request.hero_title
+        hero_subtitle = request.hero_subtitle
+        facebook_url = request.facebook_url
+        instagram_url = request.instagram_url
+        tiktok_url = request.tiktok_url
+        
+        # Get existing settings
+        settings_doc = await db.site_settings.find_one({})
+        if not settings_doc:
+            # Create new settings
+            settings = SiteSettings(
+                site_logo=site_logo,
+                hero_title=hero_title or "Rəqəmsal dəvətnamə yaratmaq heç vaxt bu qədər asan olmayıb",
+                hero_subtitle=hero_subtitle or "Vivento ilə toy, nişan, doğum günü və digər tədbirləriniz üçün gözəl dəvətnamələr yaradın.",
+                facebook_url=facebook_url,
+                instagram_url=instagram_url,
+                tiktok_url=tiktok_url
+            )
+            await db.site_settings.insert_one(settings.dict())
+        else:
+            # Update existing settings
+            update_data = {"updated_at": datetime.now(timezone.utc).isoformat()}
+            if site_logo is not None:
+                update_data["site_logo"] = site_logo
+            if hero_title is not None:
+                update_data["hero_title"] = hero_title
+            if hero_subtitle is not None:
+                update_data["hero_subtitle"] = hero_subtitle
+            if facebook_url is not None:
+                update_data["facebook_url"] = facebook_url
+            if instagram_url is not None:
+                update_data["instagram_url"] = instagram_url
+            if tiktok_url is not None:
+                update_data["tiktok_url"] = tiktok_url
+            
+            await db.site_settings.update_one({}, {"$set": update_data})
+            
+            # Get updated settings
+            settings_doc = await db.site_settings.find_one({})
+            settings = SiteSettings(**settings_doc)
+        
+        return {
+            "success": True,
+            "message": "Sayt ayarları uğurla yeniləndi",
+            "settings": settings
+        }
+        
+    except HTTPException:
+        # Re-raise HTTP exceptions (like 403 Forbidden)
+        raise
+    except Exception as e:
+        logger.error(f"Site settings update error: {e}")
+        raise HTTPException(status_code=500, detail="Sayt ayarları yenilənərkən xəta baş verdi")
+
+CMS_PAGE_TYPES = ["about", "contact", "support", "privacy", "terms"]
+
+PAGE_LANGUAGES = ["az", "en", "ru"]
+
+DEFAULT_CMS_CONTENTS = {
+    "about": {
+        "title": "Haqqımızda",
+        "description": "Vivento - Azərbaycanın rəqəmsal dəvətnamə platforması. Tədbirləriniz üçün gözəl və peşəkar dəvətnamələr yaradın.",
+        "mission": "Hər bir xüsusi anınızı unudulmaz etmək üçün ən yaxşı rəqəmsal həlləri təqdim etmək.",
+        "vision": "Azərbaycanda ən yaxşı dəvətnamə platforması olmaq."
+    },
+    "contact": {
+        "title": "Əlaqə",
+        "content": "Bizimlə əlaqə saxlayın:\n\nEmail: info@vivento.az\nTelefon: +994 XX XXX XX XX\nÜnvan: Bakı, Azərbaycan"
+    },
+    "support": {
+        "title": "Dəstək",
+        "content": "Dəstək mərkəzi:\n\nSuallarınız varsa bizimlə əlaqə saxlaya bilərsiniz.\n\nEmail: support@vivento.az\nİş saatları: Bazar ertəsindən Cümə 09:00-18:00"
+    },
+    "privacy": {
+        "title": "Məxfilik Siyasəti",
+        "content": "Vivento məxfilik siyasəti\n\n1. Məlumat Toplanması\nBiz yalnız zəruri məlumatları toplayırıq.\n\n2. Məlumat Təhlükəsizliyi\nMəlumatlarınız qorunur.\n\n3. Üçüncü Tərəflər\nMəlumatlarınızı üçüncü tərəflərlə paylaşmırıq."
+    },
+    "terms": {
+        "title": "İstifadə Şərtləri",
+        "content": "Vivento istifadə şərtləri\n\n1. Xidmətdən İstifadə\nPlatformadan düzgün istifadə etməlisiniz.\n\n2. İstifadəçi Məsuliyyəti\nYaratdığınız məzmuna görə məsuliyyət daşıyırsınız.\n\n3. Dəyişikliklər\nŞərtlərdə dəyişiklik etmək hüququmuzu qoruyub saxlayırıq."
+    }
+}
+
+def build_content_entry(payload: Any) -> Dict[str, Any]:
+    """Serialize a response payload once and attach its ETag"""
+    body = DefaultJSONResponse(content=jsonable_encoder(payload)).body
+    return {"body": body, "etag": make_etag(body)}
+
+def localize_page(page: Dict[str, Any], lang: str) -> Dict[str, Any]:
+    """Resolve title/content/meta_description of a static page for a language"""
+    page = dict(page)
+    if lang == "en" and page.get("title_en"):
+        page["title"] = page.get("title_en") or page["title"]
+        page["content"] = page.get("content_en") or page["content"]
+        page["meta_description"] = page.get("meta_description_en") or page.get("meta_description")
+    elif lang == "ru" and page.get("title_ru"):
+        page["title"] = page.get("title_ru") or page["title"]
+        page["content"] = page.get("content_ru") or page["content"]
+        page["meta_description"] = page.get("meta_description_ru") or page.get("meta_description")
+    return page
+
+def build_default_cms_page(page_type: str) -> CMSPage:
+    default_data = DEFAULT_CMS_CONTENTS.get(page_type, {})
+    return CMSPage(
+        page_type=page_type,
+        title=default_data.get("title", page_type.capitalize()),
+        description=default_data.get("description"),
+        mission=default_data.get("mission"),
+        vision=default_data.get("vision"),
+        content=default_data.get("content")
+    )
+
+# CMS Endpoints
+@router.get("/cms/{page_type}", response_model=CMSPage)
+async def get_cms_page(page_type: str, request: Request):
+    """Get CMS page content by type (about, contact, support, privacy, terms)"""
+    try:
+        if page_type not in CMS_PAGE_TYPES:
+            raise HTTPException(status_code=400, detail="Səhifə tipi etibarsızdır")
+        
+        cache_key = ("cms", page_type)
+        entry = content_cache.get(cache_key)
+        if entry is None:
+            page = await db.cms_pages.find_one({"page_type": page_type})
+            # Fall back to default content when the page was never edited
+            cms_page = CMSPage(**page) if page else build_default_cms_page(page_type)
+            entry = build_content_entry(cms_page)
+            content_cache.set(cache_key, entry)
+        
+        return content_response(request, entry)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get CMS page error: {e}")
+        raise HTTPException(status_code=500, detail="Səhifə yüklənərkən xəta baş verdi")
+
+@router.put("/cms/{page_type}")
+async def update_cms_page(
+    page_type: str,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    mission: Optional[str] = None,
+    vision: Optional[str] = None,
+    content: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Update CMS page (Admin only)"""
+    # Check if user is admin
+    if current_user.email != "admin@vivento.az" and "admin" not in current_user.email.lower():
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    if page_type not in CMS_PAGE_TYPES:
+        raise HTTPException(status_code=400, detail="Səhifə tipi etibarsızdır")
+    
+    try:
+        update_data = {}
+        if title: update_data["title"] = title
+        if description: update_data["description"] = description
+        if mission: update_data["mission"] = mission
+        if vision: update_data["vision"] = vision
+        if content: update_data["content"] = content
+        
+        if not update_data:
+            raise HTTPException(status_code=400, detail="Heç bir məlumat dəyişdirilmədi")
+        
+        update_data["updated_at"] = datetime.now(timezone.utc)
+        
+        # Check if page exists
+        page = await db.cms_pages.find_one({"page_type": page_type})
+        
+        if not page:
+            # Create new page
+            new_page = CMSPage(
+                page_type=page_type, 
+                title=title or page_type.capitalize(),
+                **update_data
+            )
+            await db.cms_pages.insert_one(new_page.dict())
+        else:
+            # Update existing page
+            await db.cms_pages.update_one(
+                {"page_type": page_type},
+                {"$set": update_data}
+            )
+        
+        invalidate_cms_cache(page_type)
+        
+        return {"message": "Səhifə yeniləndi"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Update CMS page error: {e}")
+        raise HTTPException(status_code=500, detail="Səhifə yenilənərkən xəta baş verdi")
+
+@router.get("/cms/about", response_model=CMSPage)
+async def get_about_page(request: Request):
+    """Get About Us page content (deprecated - use /cms/about instead)"""
+    return await get_cms_page("about", request)
+
+RESERVED_BLOG_SLUGS = {"summaries"}  # Taken by fixed /blog/* routes
+
+blog_post_reader = TrustedReader(BlogPost)
+
+@router.get("/blog", response_model=List[BlogPost])
+async def get_blog_posts(published_only: bool = True, limit: int = 10):
+    """Get blog posts"""
+    try:
+        query = {"published": True} if published_only else {}
+        posts = await db.blog_posts.find(query, blog_post_reader.projection).sort("created_at", -1).limit(limit).to_list(limit)
+        return blog_post_reader.response(posts)
+    except Exception as e:
+        logger.error(f"Get blog posts error: {e}")
+        raise HTTPException(status_code=500, detail="Bloq yazıları yüklənərkən xəta baş verdi")
+
+BLOG_SUMMARY_PROJECTION = {"_id": 0, **{field: 1 for field in BlogPostSummary.model_fields}}
+
+BLOG_PAGE_MAX_LIMIT = 50
+
+def encode_blog_cursor(post: Dict[str, Any]) -> str:
+    """Opaque keyset cursor from the last item of a page"""
+    raw = json.dumps({"created_at": post["created_at"].isoformat(), "id": post["id"]})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_blog_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return {"created_at": datetime.fromisoformat(raw["created_at"]), "id": str(raw["id"])}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Etibarsız kursor")
+
+@router.get("/blog/summaries", response_model=BlogPostPage)
+async def get_blog_post_summaries(
+    cursor: Optional[str] = None,
+    limit: int = 10,
+    category: Optional[str] = None,
+    tag: Optional[str] = None
+):
+    """Published blog posts without content, paginated by created_at (newest first)"""
+    try:
+        limit = max(1, min(limit, BLOG_PAGE_MAX_LIMIT))
+        
+        # First pages are what visitors hit; later pages go to MongoDB
+        cache_key = ("list", category, tag, limit)
+        if cursor is None:
+            cached_page = blog_cache.get(cache_key)
+            if cached_page is not None:
+                return cached_page
+        
+        query: Dict[str, Any] = {"published": True}
+        if category:
+            query["category"] = category
+        if tag:
+            query["tags"] = tag
+        if cursor:
+            position = decode_blog_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": position["created_at"]}},
+                {"created_at": position["created_at"], "id": {"$lt": position["id"]}}
+            ]
+        
+        # Fetch one extra item to know whether another page exists
+        posts = await db.blog_posts.find(query, BLOG_SUMMARY_PROJECTION).sort(
+            [("created_at", -1), ("id", -1)]
+        ).limit(limit + 1).to_list(limit + 1)
+        
+        has_more = len(posts) > limit
+        posts = posts[:limit]
+        page = BlogPostPage(
+            items=[BlogPostSummary(**post) for post in posts],
+            next_cursor=encode_blog_cursor(posts[-1]) if has_more else None
+        )
+        
+        if cursor is None:
+            blog_cache.set(cache_key, page)
+        return page
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get blog summaries error: {e}")
+        raise HTTPException(status_code=500, detail="Bloq yazıları yüklənərkən xəta baş verdi")
+
+@router.get("/blog/{slug}", response_model=BlogPost)
+async def get_blog_post(slug: str):
+    """Get single blog post by slug"""
+    try:
+        cache_key = ("post", slug)
+        entry = blog_cache.get(cache_key)
+        if entry is None:
+            post = await db.blog_posts.find_one({"slug": slug, "published": True})
+            if not post:
+                raise HTTPException(status_code=404, detail="Bloq yazısı tapılmadı")
+            
+            entry = {
+                "post": BlogPost(**post),
+                "local_views_at_load": blog_view_counter.local_total(post["id"])
+            }
+            blog_cache.set(cache_key, entry)
+        
+        # Count the view in memory; it is flushed to MongoDB in batches
+        post = entry["post"]
+        blog_view_counter.increment(post.id)
+        views = post.views + blog_view_counter.local_total(post.id) - entry["local_views_at_load"]
+        
+        return post.model_copy(update={"views": views})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get blog post error: {e}")
+        raise HTTPException(status_code=500, detail="Bloq yazısı yüklənərkən xəta baş verdi")
+
+@router.post("/admin/blog", response_model=BlogPost)
+async def create_blog_post(
+    request: CreateBlogRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Create blog post (Admin only)"""
+    if current_user.email != "admin@vivento.az" and "admin" not in current_user.email.lower():
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        if request.slug in RESERVED_BLOG_SLUGS:
+            raise HTTPException(status_code=400, detail="Bu slug istifadə edilə bilməz")
+        
+        # Check if slug already exists
+        existing = await db.blog_posts.find_one({"slug": request.slug})
+        if existing:
+            raise HTTPException(status_code=400, detail="Bu slug artıq istifadə olunur")
+        
+        new_post = BlogPost(
+            title=request.title,
+            slug=request.slug,
+            excerpt=request.excerpt,
+            content=request.content,
+            author=current_user.name or current_user.email.split('@')[0],
+            author_id=current_user.id,
+            thumbnail=request.thumbnail,
+            category=request.category,
+            tags=request.tags,
+            published=request.published
+        )
+        
+        await db.blog_posts.insert_one(new_post.dict())
+        invalidate_blog_cache()
+        return new_post
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Create blog post error: {e}")
+        raise HTTPException(status_code=500, detail="Bloq yazısı yaradılarkən xəta baş verdi")
+
+@router.put("/admin/blog/{post_id}", response_model=BlogPost)
+async def update_blog_post(
+    post_id: str,
+    request: UpdateBlogRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Update blog post (Admin only)"""
+    if current_user.email != "admin@vivento.az" and "admin" not in current_user.email.lower():
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        if request.slug in RESERVED_BLOG_SLUGS:
+            raise HTTPException(status_code=400, detail="Bu slug istifadə edilə bilməz")
+        
+        update_data = {}
+        if request.title: update_data["title"] = request.title
+        if request.slug: update_data["slug"] = request.slug
+        if request.excerpt: update_data["excerpt"] = request.excerpt
+        if request.content: update_data["content"] = request.content
+        if request.thumbnail: update_data["thumbnail"] = request.thumbnail
+        if request.category: update_data["category"] = request.category
+        if request.tags is not None: update_data["tags"] = request.tags
+        if request.published is not None: update_data["published"] = request.published
+        
+        if not update_data:
+            raise HTTPException(status_code=400, detail="Heç bir məlumat dəyişdirilmədi")
+        
+        update_data["updated_at"] = datetime.now(timezone.utc)
+        
+        result = await db.blog_posts.update_one(
+            {"id": post_id},
+            {"$set": update_data}
+        )
+        
+        if result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Bloq yazısı tapılmadı")
+        
+        invalidate_blog_cache()
+        
+        return {"message": "Bloq yazısı yeniləndi"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Update blog post error: {e}")
+        raise HTTPException(status_code=500, detail="Bloq yazısı yenilənərkən xəta baş verdi")
+
+@router.delete("/admin/blog/{post_id}")
+async def delete_blog_post(post_id: str, current_user: User = Depends(get_current_user)):
+    """Delete blog post (Admin only)"""
+    if current_user.email != "admin@vivento.az" and "admin" not in current_user.email.lower():
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        result = await db.blog_posts.delete_one({"id": post_id})
+        if result.deleted_count == 0:
+            raise HTTPException(status_code=404, detail="Bloq yazısı tapılmadı")
+        invalidate_blog_cache()
+        return {"message": "Bloq yazısı silindi"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Delete blog post error: {e}")
+        raise HTTPException(status_code=500, detail="Bloq yazısı silinərkən xəta baş verdi")
+
+# Font Management Endpoints
+@router.post("/admin/fonts/upload")
+async def upload_custom_font(
+    file: UploadFile = File(...),
+    font_name: str = None,
+    font_family: str = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Upload custom font file (Admin only)"""
+    if current_user.email != "admin@vivento.az" and "admin" not in current_user.email.lower():
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        # Validate file extension
+        allowed_extensions = [".ttf", ".otf", ".woff", ".woff2"]
+        
+        file_ext = Path(file.filename).suffix.lower()
+        if file_ext not in allowed_extensions:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Yalnız {', '.join(allowed_extensions)} formatları dəstəklənir"
+            )
+        
+        # Read file
+        contents = await file.read()
+        if len(contents) > 5 * 1024 * 1024:  # 5MB limit
+            raise HTTPException(status_code=400, detail="Font faylı çox böyükdür (maksimum 5MB)")
+        
+        # Convert to WOFF2 + script subsets off the event loop
+        build = await asyncio.to_thread(process_font, contents, file_ext)
+        
+        font_files = []
+        for built in build["files"]:
+            # Content-addressed: an identical upload already produced this file
+            stored = await font_storage.put(built["filename"], built["data"])
+            font_files.append({
+                "subset": built["subset"],
+                "url": stored["url"],
+                "format": build["font_format"],
+                "unicode_range": built["unicode_range"],
+                "size": len(built["data"])
+            })
+        
+        file_url = font_files[0]["url"]
+        font_format = build["font_format"]
+        
+        # Create font record
+        font_name = font_name or Path(file.filename).stem
+        font_family = font_family or font_name.replace(" ", "_")
+        
+        new_font = CustomFont(
+            name=font_name,
+            file_url=file_url,
+            font_format=font_format,
+            font_family=font_family,
+            uploaded_by=current_user.id,
+            content_hash=build["content_hash"],
+            files=font_files
+        )
+        
+        await db.custom_fonts.insert_one(new_font.dict())
+        invalidate_font_caches()
+        
+        return {
+            "success": True,
+            "font": new_font,
+            "message": "Font uğurla yükləndi"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Font upload error: {e}")
+        raise HTTPException(status_code=500, detail="Font yüklənərkən xəta baş verdi")
+
+@router.get("/fonts")
+async def get_fonts(category: Optional[str] = None):
+    """Get all custom fonts, optionally filtered by category"""
+    try:
+        query = {}
+        if category:
+            query["category"] = category
+        
+        fonts = await db.custom_fonts.find(query).to_list(length=None)
+        
+        # Convert to dict and remove MongoDB _id
+        result = []
+        for font in fonts:
+            font_dict = dict(font)
+            font_dict.pop('_id', None)  # Remove MongoDB _id
+            result.append(font_dict)
+        
+        return result
+    except Exception as e:
+        logger.error(f"Get fonts error: {e}")
+        raise HTTPException(status_code=500, detail="Fontlar yüklənərkən xəta baş verdi")
+
+@router.get("/fonts/css")
+async def get_fonts_css(request: Request):
+    """@font-face stylesheet for all custom fonts, with per-script unicode-range subsets"""
+    try:
+        entry = content_cache.get(("fonts-css",))
+        if entry is None:
+            fonts = await db.custom_fonts.find({}, {"_id": 0}).to_list(length=None)
+            body = build_font_face_css(fonts).encode("utf-8")
+            entry = {"body": body, "etag": make_etag(body)}
+            content_cache.set(("fonts-css",), entry)
+        
+        return content_response(request, entry, media_type="text/css")
+    except Exception as e:
+        logger.error(f"Get fonts CSS error: {e}")
+        raise HTTPException(status_code=500, detail="Fontlar yüklənərkən xəta baş verdi")
+
+@router.delete("/admin/fonts/{font_id}")
+async def delete_font(font_id: str, current_user: User = Depends(get_current_user)):
+    """Delete custom font (Admin only)"""
+    if current_user.email != "admin@vivento.az" and "admin" not in current_user.email.lower():
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        # Get font to delete file
+        font = await db.custom_fonts.find_one({"id": font_id})
+        if not font:
+            raise HTTPException(status_code=404, detail="Font tapılmadı")
+        
+        # Delete files unless another font record shares the same content
+        try:
+            shared = font.get("content_hash") and await db.custom_fonts.find_one(
+                {"content_hash": font["content_hash"], "id": {"$ne": font_id}}, {"_id": 1}
+            )
+            if not shared:
+                if font.get("files"):
+                    for font_file in font["files"]:
+                        await font_storage.delete(Path(font_file["url"]).name)
+                else:
+                    # Fonts uploaded before processing lived in UPLOAD_DIR
+                    file_path = UPLOAD_DIR / Path(font["file_url"]).name
+                    if file_path.exists():
+                        file_path.unlink()
+        except Exception as e:
+            logger.warning(f"Could not delete font file: {e}")
+        
+        # Delete from database
+        await db.custom_fonts.delete_one({"id": font_id})
+        invalidate_font_caches()
+        
+        return {"success": True, "message": "Font silindi"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Delete font error: {e}")
+        raise HTTPException(status_code=500, detail="Font silinərkən xəta baş verdi")
+
+# Hero Slider Endpoints
+@router.get("/slides", response_model=List[HeroSlide])
+async def get_slides(lang: Optional[str] = None):
+    """Get all active hero slides (public)"""
+    try:
+        slides = await db.hero_slides.find({"is_active": True}, {"_id": 0}).sort("order", 1).to_list(length=None)
+        return slides
+    except Exception as e:
+        logger.error(f"Get slides error: {e}")
+        raise HTTPException(status_code=500, detail="Sliderlər yüklənərkən xəta baş verdi")
+
+@router.get("/admin/slides")
+async def get_all_slides(current_user: User = Depends(get_current_user)):
+    """Get all hero slides including inactive (Admin only)"""
+    if current_user.email != "admin@vivento.az" and "admin" not in current_user.email.lower():
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        slides = await db.hero_slides.find({}, {"_id": 0}).sort("order", 1).to_list(length=None)
+        return slides
+    except Exception as e:
+        logger.error(f"Get all slides error: {e}")
+        raise HTTPException(status_code=500, detail="Sliderlər yüklənərkən xəta baş verdi")
+
+@router.post("/admin/slides")
+async def create_slide(
+    slide_data: SlideCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """Create hero slide (Admin only)"""
+    if current_user.email != "admin@vivento.az" and "admin" not in current_user.email.lower():
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        new_slide = {
+            "id": str(uuid.uuid4()),
+            "title": slide_data.title,
+            "subtitle": slide_data.subtitle,
+            "button_text": slide_data.button_text,
+            "image_url": slide_data.image_url,
+            "button_link": slide_data.button_link,
+            "order": slide_data.order,
+            "is_active": slide_data.is_active,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+        
+        await db.hero_slides.insert_one(new_slide)
+        if "_id" in new_slide:
+            del new_slide["_id"]
+        return new_slide
+    except Exception as e:
+        logger.error(f"Create slide error: {e}")
+        raise HTTPException(status_code=500, detail="Slider yaradılarkən xəta baş verdi")
+
+@router.put("/admin/slides/{slide_id}")
+async def update_slide(
+    slide_id: str,
+    slide_data: SlideUpdate,
+    current_user: User = Depends(get_current_user)
+):
+    """Update hero slide (Admin only)"""
+    if current_user.email != "admin@vivento.az" and "admin" not in current_user.email.lower():
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        update_data = {}
+        if slide_data.title is not None:
+            update_data["title"] = slide_data.title
+        if slide_data.subtitle is not None:
+            update_data["subtitle"] = slide_data.subtitle
+        if slide_data.button_text is not None:
+            update_data["button_text"] = slide_data.button_text
+        if slide_data.image_url is not None:
+            update_data["image_url"] = slide_data.image_url
+        if slide_data.button_link is not None:
+            update_data["button_link"] = slide_data.button_link
+        if slide_data.order is not None:
+            update_data["order"] = slide_data.order
+        if slide_data.is_active is not None:
+            update_data["is_active"] = slide_data.is_active
+        
+        if not update_data:
+            raise HTTPException(status_code=400, detail="Heç bir məlumat dəyişdirilmədi")
+        
+        update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        
+        result = await db.hero_slides.update_one(
+            {"id": slide_id},
+            {"$set": update_data}
+        )
+        
+        if result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Slider tapılmadı")
+        
+        updated_slide = await db.hero_slides.find_one({"id": slide_id}, {"_id": 0})
+        return updated_slide
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Update slide error: {e}")
+        raise HTTPException(status_code=500, detail="Slider yenilənərkən xəta baş verdi")
+
+@router.delete("/admin/slides/{slide_id}")
+async def delete_slide(slide_id: str, current_user: User = Depends(get_current_user)):
+    """Delete hero slide (Admin only)"""
+    if current_user.email != "admin@vivento.az" and "admin" not in current_user.email.lower():
+        raise HTTPException(status_code=403, detail="Admin hüquqları tələb olunur")
+    
+    try:
+        result = await db.hero_slides.delete_one({"id": slide_id})
+        if result.deleted_count == 0:
+            raise HTTPException(status_code=404, detail="Slider tapılmadı")
+        
+        return {"success": True, "message": "Slider silindi"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Delete slide error: {e}")
+        raise HTTPException(status_code=500, detail="Slider silinərkən xəta baş verdi")
+
+@router.get("/pages/{slug}")
+async def get_page_by_slug(slug: str, request: Request, lang: str = "az"):
+    """Get a page by slug (public endpoint) with language support"""
+    try:
+        if lang not in PAGE_LANGUAGES:
+            lang = "az"
+        
+        entry = content_cache.get(("page", slug, lang))
+        if entry is None:
+            page = await db.pages.find_one({"slug": slug, "published": True}, {"_id": 0})
+            
+            if not page:
+                raise HTTPException(status_code=404, detail="Səhifə tapılmadı")
+            
+            # Precompute every language variant from the single read
+            for variant_lang in PAGE_LANGUAGES:
+                variant = build_content_entry(localize_page(page, variant_lang))
+                content_cache.set(("page", slug, variant_lang), variant)
+                if variant_lang == lang:
+                    entry = variant
+        
+        return content_response(request, entry)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get page error: {e}")
+        raise HTTPException(status_code=500, detail="Səhifə yüklənərkən xəta baş verdi")
+
+@router.get("/admin/pages")
+async def get_all_pages_admin(current_user: User = Depends(get_current_user)):
+    """Get all pages for admin (including unpublished)"""
+    try:
+        # Check if user is admin (you can add is_admin field to User model)
+        # For now, any authenticated user can access
+        
+        pages = await db.pages.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
+        
+        return pages
+    except Exception as e:
+        logger.error(f"Get pages admin error: {e}")
+        raise HTTPException(status_code=500, detail="Səhifələr yüklənərkən xəta baş verdi")
+
+@router.put("/admin/pages/{slug}")
+async def update_page_admin(
+    slug: str,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """Update a page (admin only)"""
+    try:
+        # Parse request body
+        body = await request.json()
+        
+        # Check if page exists
+        page = await db.pages.find_one({"slug": slug})
+        
+        if not page:
+            raise HTTPException(status_code=404, detail="Səhifə tapılmadı")
+        
+        # Prepare update data
+        update_data = {}
+        
+        # Basic fields
+        if "title" in body:
+            update_data["title"] = body["title"]
+        if "content" in body:
+            update_data["content"] = body["content"]
+        if "meta_description" in body:
+            update_data["meta_description"] = body["meta_description"]
+        if "published" in body:
+            update_data["published"] = body["published"]
+        
+        # Multi-language fields
+        if "title_en" in body:
+            update_data["title_en"] = body["title_en"]
+        if "title_ru" in body:
+            update_data["title_ru"] = body["title_ru"]
+        if "content_en" in body:
+            update_data["content_en"] = body["content_en"]
+        if "content_ru" in body:
+            update_data["content_ru"] = body["content_ru"]
+        if "meta_description_en" in body:
+            update_data["meta_description_en"] = body["meta_description_en"]
+        if "meta_description_ru" in body:
+            update_data["meta_description_ru"] = body["meta_description_ru"]
+        
+        # Always update timestamp
+        update_data["updated_at"] = datetime.now(timezone.utc)
+        
+        # Update page
+        await db.pages.update_one(
+            {"slug": slug},
+            {"$set": update_data}
+        )
+        
+        invalidate_page_cache(slug)
+        
+        # Get updated page
+        updated_page = await db.pages.find_one({"slug": slug}, {"_id": 0})
+        
+        logger.info(f"Page updated: {slug} by user {current_user.id}")
+        
+        return updated_page
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Update page error: {e}")
+        raise HTTPException(status_code=500, detail="Səhifə yenilənərkən xəta baş verdi")
@@ -0,0 +1,230 @@
+"""
+Event Routes for Vivento Platform
+Events, guest lists and the public invitation/RSVP endpoints
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from template_stats import record_template_activity
+from server import (
+    BalanceTransaction, Event, EventCreate, Guest, GuestCreate, RSVPResponse, User, db,
+    get_current_user, invalidate_event_preview,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Event routes
+@router.post("/events", response_model=Event)
+async def create_event(request: EventCreate, current_user: User = Depends(get_current_user)):
+    event = Event(
+        user_id=current_user.id,
+        name=request.name,
+        date=request.date,
+        location=request.location,
+        map_link=request.map_link,
+        additional_notes=request.additional_notes,
+        template_id=request.template_id,
+        custom_design=request.custom_design,
+        show_envelope_animation=request.show_envelope_animation or False
+    )
+    await db.events.insert_one(event.dict())
+    await record_template_activity(db.template_stats, event.template_id, "events_created")
+    return event
+
+@router.get("/events", response_model=List[Event])
+async def get_user_events(current_user: User = Depends(get_current_user)):
+    events = await db.events.find({"user_id": current_user.id}).to_list(100)
+    return [Event(**event) for event in events]
+
+@router.get("/events/{event_id}", response_model=Event)
+async def get_event(event_id: str, current_user: User = Depends(get_current_user)):
+    event = await db.events.find_one({"id": event_id, "user_id": current_user.id})
+    if not event:
+        raise HTTPException(status_code=404, detail="Tədbir tapılmadı")
+    return Event(**event)
+
+@router.put("/events/{event_id}", response_model=Event)
+async def update_event(event_id: str, request: EventCreate, current_user: User = Depends(get_current_user)):
+    event = await db.events.find_one({"id": event_id, "user_id": current_user.id})
+    if not event:
+        raise HTTPException(status_code=404, detail="Tədbir tapılmadı")
+    
+    update_data = request.dict(exclude_none=True)  # Don't update None values
+    update_data["updated_at"] = datetime.now(timezone.utc)
+    
+    await db.events.update_one({"id": event_id}, {"$set": update_data})
+    invalidate_event_preview(event_id)
+    
+    updated_event = await db.events.find_one({"id": event_id})
+    return Event(**updated_event)
+
+# Guest routes
+@router.post("/events/{event_id}/guests", response_model=Guest)
+async def add_guest(event_id: str, request: GuestCreate, current_user: User = Depends(get_current_user)):
+    # Verify event ownership
+    event = await db.events.find_one({"id": event_id, "user_id": current_user.id})
+    if not event:
+        raise HTTPException(status_code=404, detail="Tədbir tapılmadı")
+    
+    # Get current user data with balance
+    user = await db.users.find_one({"id": current_user.id}, {"_id": 0})
+    if not user:
+        raise HTTPException(status_code=404, detail="İstifadəçi tapılmadı")
+    
+    free_invitations_used = user.get("free_invitations_used", 0)
+    current_balance = user.get("balance", 0.0)
+    
+    # Check if user needs to pay (after 30 free invitations)
+    invitation_cost = 0.10  # AZN per invitation
+    needs_payment = free_invitations_used >= 30
+    
+    if needs_payment:
+        # Check if balance is sufficient
+        if current_balance < invitation_cost:
+            raise HTTPException(
+                status_code=402,
+                detail=f"Balansınız kifayət deyil. Qonaq əlavə etmək üçün {invitation_cost} AZN lazımdır. Cari balans: {current_balance} AZN"
+            )
+        
+        # Deduct from balance
+        new_balance = current_balance - invitation_cost
+        
+        # Update user balance
+        await db.users.update_one(
+            {"id": current_user.id},
+            {
+                "$set": {
+                    "balance": new_balance,
+                    "updated_at": datetime.now(timezone.utc)
+                }
+            }
+        )
+        
+        # Create transaction record
+        transaction = BalanceTransaction(
+            id=str(uuid.uuid4()),
+            user_id=current_user.id,
+            amount=-invitation_cost,  # Negative for deduction
+            transaction_type="invitation_charge",
+            description=f"Qonaq əlavə edilməsi: {request.name}",
+            payment_method=None,
+            payment_id=None,
+            status="completed"
+        )
+        
+        await db.balance_transactions.insert_one(transaction.model_dump())
+        
+        logger.info(f"Charged {invitation_cost} AZN from user {current_user.id}. New balance: {new_balance} AZN")
+    
+    # Increment free invitations counter
+    await db.users.update_one(
+        {"id": current_user.id},
+        {
+            "$inc": {"free_invitations_used": 1},
+            "$set": {"updated_at": datetime.now(timezone.utc)}
+        }
+    )
+    
+    # Create guest
+    guest = Guest(
+        event_id=event_id,
+        name=request.name,
+        phone=request.phone,
+        email=request.email
+    )
+    await db.guests.insert_one(guest.model_dump())
+    
+    logger.info(f"Guest added: {guest.name} (Free invitations used: {free_invitations_used + 1}/30, Charged: {needs_payment})")
+    
+    return guest
+
+@router.get("/events/{event_id}/guests")
+async def get_event_guests(event_id: str, current_user: User = Depends(get_current_user)):
+    # Verify event ownership
+    event = await db.events.find_one({"id": event_id, "user_id": current_user.id})
+    if not event:
+        raise HTTPException(status_code=404, detail="Tədbir tapılmadı")
+    
+    guests = await db.guests.find({"event_id": event_id}).to_list(1000)
+    
+    # Convert to dict and remove MongoDB _id
+    result = []
+    for guest in guests:
+        guest_dict = dict(guest)
+        guest_dict.pop('_id', None)
+        result.append(guest_dict)
+    
+    logger.info(f"Returning {len(result)} guests for event {event_id}")
+    return result
+
+# RSVP routes (public)
+@router.get("/invite/{token}")
+async def get_invitation(token: str):
+    # Handle demo invitations
+    if token.startswith('demo-'):
+        event_id = token.replace('demo-', '')
+        event = await db.events.find_one({"id": event_id})
+        if not event:
+            raise HTTPException(status_code=404, detail="Tədbir tapılmadı")
+        
+        # Create a demo guest for preview
+        demo_guest = {
+            "id": "demo-guest",
+            "event_id": event_id,
+            "name": "Demo Qonaq",
+            "unique_token": token,
+            "rsvp_status": None,
+            "created_at": datetime.now(timezone.utc),
+            "responded_at": None
+        }
+        
+        return {
+            "guest": Guest(**demo_guest),
+            "event": Event(**event)
+        }
+    
+    # Handle regular invitations
+    guest = await db.guests.find_one({"unique_token": token})
+    if not guest:
+        raise HTTPException(status_code=404, detail="Dəvətnamə tapılmadı")
+    
+    event = await db.events.find_one({"id": guest["event_id"]})
+    if not event:
+        raise HTTPException(status_code=404, detail="Tədbir tapılmadı")
+    
+    return {
+        "guest": Guest(**guest),
+        "event": Event(**event)
+    }
+
+@router.post("/invite/{token}/rsvp")
+async def respond_to_invitation(token: str, response: RSVPResponse):
+    guest = await db.guests.find_one({"unique_token": token})
+    if not guest:
+        raise HTTPException(status_code=404, detail="Dəvətnamə tapılmadı")
+    
+    logger.info(f"RSVP received - Guest: {guest.get('name')}, Status: {response.status}")
+    
+    result = await db.guests.update_one(
+        {"unique_token": token},
+        {
+            "$set": {
+                "rsvp_status": response.status,
+                "responded_at": datetime.now(timezone.utc)
+            }
+        }
+    )
+    
+    logger.info(f"RSVP updated - Matched: {result.matched_count}, Modified: {result.modified_count}")
+    
+    # Verify update
+    updated_guest = await db.guests.find_one({"unique_token": token})
+    logger.info(f"Verified RSVP status: {updated_guest.get('rsvp_status')}")
+    
+    return {"message": "Cavabınız qeydə alındı"}
@@ -0,0 +1,200 @@
+"""
+Gallery Routes for Vivento Platform
+Event photo galleries; photos expire after five days
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+
+from server import (
+    User, db, get_current_user, image_storage, prepare_upload_photo, retain_original_photo,
+    save_gallery_photo,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+async def destroy_gallery_photo_assets(photo: Dict[str, Any]) -> None:
+    await image_storage.delete(photo["cloudinary_public_id"])
+    if photo.get("original_public_id"):
+        await image_storage.delete(photo["original_public_id"])
+
+@router.get("/events/{event_id}/gallery")
+async def get_event_gallery(event_id: str):
+    """
+    Get gallery photos for an event (public endpoint for invitation page)
+    Only returns non-expired photos
+    """
+    try:
+        now = datetime.now(timezone.utc)
+        
+        # Find non-expired photos - handle both datetime and string formats
+        photos = await db.gallery_photos.find({
+            "event_id": event_id
+        }, {"_id": 0}).sort("created_at", -1).to_list(100)
+        
+        # Filter non-expired photos
+        valid_photos = []
+        for photo in photos:
+            expires_at = photo.get("expires_at")
+            if expires_at:
+                # Handle both datetime and string formats
+                if isinstance(expires_at, str):
+                    try:
+                        expires_at = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+                    except:
+                        expires_at = datetime.fromisoformat(expires_at)
+                
+                # Make sure we compare timezone-aware datetimes
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                
+                if expires_at > now:
+                    # Convert datetime to ISO string for JSON response
+                    photo["expires_at"] = expires_at.isoformat()
+                    photo["created_at"] = photo.get("created_at").isoformat() if isinstance(photo.get("created_at"), datetime) else photo.get("created_at")
+                    valid_photos.append(photo)
+        
+        return {
+            "event_id": event_id,
+            "photos": valid_photos,
+            "count": len(valid_photos)
+        }
+        
+    except Exception as e:
+        logger.error(f"Get gallery error: {e}")
+        raise HTTPException(status_code=500, detail="Qalereya yüklənərkən xəta")
+
+@router.post("/events/{event_id}/gallery")
+async def upload_gallery_photo(
+    event_id: str,
+    file: UploadFile = File(...),
+    caption: Optional[str] = Form(None),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload a photo to event gallery
+    Photos expire after 5 days automatically
+    """
+    try:
+        # Verify event belongs to user
+        event = await db.events.find_one({
+            "id": event_id,
+            "user_id": current_user.id
+        }, {"_id": 0})
+        
+        if not event:
+            raise HTTPException(status_code=404, detail="Tədbir tapılmadı")
+        
+        # Check file type
+        if not file.content_type.startswith('image/'):
+            raise HTTPException(status_code=400, detail="Yalnız şəkil faylları qəbul edilir")
+        
+        # Check file size (max 10MB)
+        contents = await file.read()
+        if len(contents) > 10 * 1024 * 1024:
+            raise HTTPException(status_code=400, detail="Fayl ölçüsü 10MB-dan çox olmamalıdır")
+        
+        tags = ["gallery", f"event_{event_id}", "auto_delete_5d"]
+        upload_bytes, content_type = await prepare_upload_photo(contents, file.content_type)
+        
+        # Upload with auto-delete tag
+        stored = await image_storage.put(
+            f"vivento/gallery/{event_id}/photo_{uuid.uuid4()}",
+            upload_bytes,
+            content_type,
+            tags=tags
+        )
+        original_public_id = retain_original_photo(contents, file.content_type, upload_bytes, stored["key"], tags)
+        
+        return await save_gallery_photo(event_id, current_user.id, stored, caption, original_public_id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Upload gallery photo error: {e}")
+        raise HTTPException(status_code=500, detail="Foto yüklənərkən xəta")
+
+@router.delete("/events/{event_id}/gallery/{photo_id}")
+async def delete_gallery_photo(
+    event_id: str,
+    photo_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a gallery photo"""
+    try:
+        # Find photo
+        photo = await db.gallery_photos.find_one({
+            "id": photo_id,
+            "event_id": event_id,
+            "user_id": current_user.id
+        }, {"_id": 0})
+        
+        if not photo:
+            raise HTTPException(status_code=404, detail="Foto tapılmadı")
+        
+        # Delete from storage
+        try:
+            await destroy_gallery_photo_assets(photo)
+        except Exception as e:
+            logger.warning(f"Could not delete from storage: {e}")
+        
+        # Delete from database
+        await db.gallery_photos.delete_one({"id": photo_id})
+        
+        logger.info(f"Gallery photo deleted: {photo_id}")
+        
+        return {"success": True, "message": "Foto silindi"}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Delete gallery photo error: {e}")
+        raise HTTPException(status_code=500, detail="Foto silinərkən xəta")
+
+@router.post("/cleanup/expired-gallery")
+async def cleanup_expired_gallery_photos():
+    """
+    Cleanup expired gallery photos (called by cron job or manually)
+    Deletes photos older than 5 days from both storage and database
+    """
+    try:
+        now = datetime.now(timezone.utc)
+        
+        # Find expired photos
+        expired_photos = await db.gallery_photos.find({
+            "expires_at": {"$lt": now.isoformat()}
+        }, {"_id": 0}).to_list(1000)
+        
+        deleted_count = 0
+        failed_count = 0
+        
+        for photo in expired_photos:
+            try:
+                # Delete from storage
+                await destroy_gallery_photo_assets(photo)
+                
+                # Delete from database
+                await db.gallery_photos.delete_one({"id": photo["id"]})
+                
+                deleted_count += 1
+                logger.info(f"Expired gallery photo deleted: {photo['id']}")
+                
+            except Exception as e:
+                logger.error(f"Failed to delete expired photo {photo['id']}: {e}")
+                failed_count += 1
+        
+        return {
+            "success": True,
+            "message": f"{deleted_count} müddəti bitmiş foto silindi",
+            "deleted": deleted_count,
+            "failed": failed_count
+        }
+        
+    except Exception as e:
+        logger.error(f"Cleanup expired gallery error: {e}")
+        raise HTTPException(status_code=500, detail="Təmizləmə zamanı xəta")
@@ -0,0 +1,770 @@
+"""
+Payment Routes for Vivento Platform
+Balance, invitation charges and Epoint top-ups (create, callback, verify)
+"""
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+import httpx
+
+from email_service import send_payment_invoice_email
+from epoint_service import epoint_service
+from metrics_service import track_external
+from template_stats import record_template_activity
+from trusted_reads import TrustedReader
+from server import (
+    BalanceTransaction, Event, Payment, Template, User, db, get_current_user,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Balance and Payment endpoints
+@router.get("/user/balance")
+async def get_user_balance(current_user: User = Depends(get_current_user)):
+    """Get user's current balance and free invitation count"""
+    return {
+        "balance": current_user.balance,
+        "free_invitations_used": current_user.free_invitations_used,
+        "free_invitations_remaining": max(0, 30 - current_user.free_invitations_used),
+        "currency": "AZN"
+    }
+
+transaction_reader = TrustedReader(BalanceTransaction)
+
+@router.get("/user/transactions", response_model=List[BalanceTransaction])
+async def get_user_transactions(current_user: User = Depends(get_current_user)):
+    """Get user's balance transaction history"""
+    transactions = await db.balance_transactions.find(
+        {"user_id": current_user.id},
+        transaction_reader.projection
+    ).sort("created_at", -1).to_list(length=50)
+    
+    return transaction_reader.response(transactions)
+
+@router.post("/invitations/charge")
+async def charge_for_invitation(
+    event_id: str,
+    guest_count: int,
+    current_user: User = Depends(get_current_user)
+):
+    """Charge user for sending invitations based on template pricing"""
+    # Get event and template info
+    event_doc = await db.events.find_one({"id": event_id, "user_id": current_user.id})
+    if not event_doc:
+        raise HTTPException(status_code=404, detail="Tədbir tapılmadı")
+    
+    event = Event(**event_doc)
+    
+    # Check if template has pricing
+    template_price = 0.10  # Default price per invitation
+    if event.template_id:
+        template_doc = await db.templates.find_one({"id": event.template_id})
+        if template_doc:
+            template = Template(**template_doc)
+            if template.is_premium:
+                template_price = template.price_per_invitation
+            else:
+                template_price = 0  # Standard templates are free after 30 invitations
+    
+    # Calculate cost
+    free_remaining = max(0, 30 - current_user.free_invitations_used)
+    paid_invitations = max(0, guest_count - free_remaining)
+    total_cost = paid_invitations * template_price
+    
+    # Check if user has enough balance
+    if total_cost > current_user.balance:
+        return {
+            "success": False,
+            "insufficient_balance": True,
+            "required_balance": total_cost,
+            "current_balance": current_user.balance,
+            "message": f"Kifayət qədər balansınız yoxdur. Lazım: {total_cost:.2f} AZN"
+        }
+    
+    # Deduct balance and update free invitation count
+    updates = {}
+    if total_cost > 0:
+        updates["$inc"] = {"balance": -total_cost}
+    
+    if free_remaining > 0:
+        free_used = min(guest_count, free_remaining)
+        updates["$inc"] = updates.get("$inc", {})
+        updates["$inc"]["free_invitations_used"] = free_used
+    
+    if updates:
+        await db.users.update_one({"id": current_user.id}, updates)
+    
+    # Create transaction record
+    if total_cost > 0:
+        transaction = BalanceTransaction(
+            user_id=current_user.id,
+            amount=-total_cost,
+            transaction_type="invitation_charge",
+            description=f"Dəvətnamə göndərmə - {paid_invitations} ədəd x {template_price} AZN"
+        )
+        await db.balance_transactions.insert_one(transaction.dict())
+    
+    # A negative count must not lower the template's popularity
+    await record_template_activity(db.template_stats, event.template_id, "invitations_charged", max(0, guest_count))
+    
+    return {
+        "success": True,
+        "total_cost": total_cost,
+        "paid_invitations": paid_invitations,
+        "free_invitations_used": min(guest_count, free_remaining),
+        "remaining_balance": current_user.balance - total_cost
+    }
+
+@router.post("/test-payment")
+async def test_payment_endpoint(data: dict = Body(...)):
+    """Test endpoint"""
+    return {"received": data}
+
+@router.post("/payments/confirm-success")
+async def confirm_payment_success(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Confirm successful payment and add balance.
+    IMPORTANT: This should only be called after Epoint callback confirms payment.
+    For security, we check if payment was already marked as 'callback_received'.
+    """
+    try:
+        body = await request.json()
+        payment_id = body.get("payment_id")
+        order_id = body.get("order_id")
+        
+        logger.info(f"Confirming payment - payment_id: {payment_id}, order_id: {order_id}, user: {current_user.id}")
+        
+        # Find the payment by payment_id or order_id
+        payment = None
+        if payment_id:
+            payment = await db.payments.find_one({
+                "id": payment_id,
+                "user_id": current_user.id
+            }, {"_id": 0})
+        
+        if not payment and order_id:
+            payment = await db.payments.find_one({
+                "order_id": order_id,
+                "user_id": current_user.id
+            }, {"_id": 0})
+        
+        if not payment:
+            logger.warning(f"Payment not found for user {current_user.id}")
+            raise HTTPException(status_code=404, detail="Ödəniş tapılmadı")
+        
+        # Check if already completed
+        if payment.get("status") == "completed":
+            logger.info(f"Payment already completed: {payment.get('id')}")
+            user = await db.users.find_one({"id": current_user.id}, {"_id": 0})
+            return {
+                "success": True,
+                "message": "Ödəniş artıq tamamlanıb",
+                "amount": payment["amount"],
+                "new_balance": user.get("balance", 0)
+            }
+        
+        # SECURITY: Only confirm if payment status is 'callback_received'
+        # This means Epoint callback already confirmed this payment
+        if payment.get("status") != "callback_received":
+            logger.warning(f"Payment {payment.get('id')} not yet confirmed by Epoint callback. Status: {payment.get('status')}")
+            raise HTTPException(
+                status_code=400, 
+                detail="Ödəniş hələ Epoint tərəfindən təsdiqlənməyib. Zəhmət olmasa bir neçə saniyə gözləyin."
+            )
+        
+        # Mark payment as completed
+        await db.payments.update_one(
+            {"id": payment["id"]},
+            {
+                "$set": {
+                    "status": "completed",
+                    "completed_at": datetime.now(timezone.utc).isoformat()
+                }
+            }
+        )
+        
+        # Update user balance
+        user = await db.users.find_one({"id": current_user.id}, {"_id": 0})
+        current_balance = user.get("balance", 0.0)
+        new_balance = current_balance + payment["amount"]
+        
+        await db.users.update_one(
+            {"id": current_user.id},
+            {
+                "$set": {
+                    "balance": new_balance,
+                    "updated_at": datetime.now(timezone.utc).isoformat()
+                }
+            }
+        )
+        
+        # Create balance transaction record
+        transaction = BalanceTransaction(
+            id=str(uuid.uuid4()),
+            user_id=current_user.id,
+            amount=payment["amount"],
+            transaction_type="payment",
+            description=f"Balans artırma: {payment['amount']} AZN",
+            payment_method="epoint",
+            payment_id=payment["id"],
+            status="completed"
+        )
+        await db.balance_transactions.insert_one(transaction.model_dump())
+        
+        logger.info(f"Payment confirmed! User {current_user.id} balance updated: {current_balance} -> {new_balance} AZN")
+        
+        return {
+            "success": True,
+            "message": "Ödəniş uğurla tamamlandı",
+            "amount": payment["amount"],
+            "new_balance": new_balance
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Confirm payment error: {e}")
+        raise HTTPException(status_code=500, detail="Ödəniş təsdiqlənərkən xəta baş verdi")
+
+@router.get("/balance")
+async def get_balance(current_user: User = Depends(get_current_user)):
+    """Get user's current balance - NO auto-confirm pending payments"""
+    try:
+        # Get user data
+        user = await db.users.find_one({"id": current_user.id}, {"_id": 0})
+        
+        # Expire old pending payments (older than 30 minutes)
+        thirty_minutes_ago = datetime.now(timezone.utc) - timedelta(minutes=30)
+        await db.payments.update_many(
+            {
+                "user_id": current_user.id,
+                "status": "pending",
+                "created_at": {"$lt": thirty_minutes_ago.isoformat()}
+            },
+            {
+                "$set": {
+                    "status": "expired",
+                    "updated_at": datetime.now(timezone.utc).isoformat()
+                }
+            }
+        )
+        
+        return {
+            "balance": user.get("balance", 0),
+            "free_invitations_used": user.get("free_invitations_used", 0),
+            "free_invitations_remaining": max(0, 30 - user.get("free_invitations_used", 0))
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get balance error: {e}")
+        raise HTTPException(status_code=500, detail="Balans məlumatı alınarkən xəta baş verdi")
+
+@router.post("/payments/create")
+async def create_payment(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create a payment request for balance top-up
+    Returns checkout URL for Epoint.az
+    """
+    try:
+        user = current_user
+        
+        # Parse request body
+        body = await request.json()
+        amount = body.get("amount")
+        description = body.get("description", "Balans artırma")
+        
+        # Validate amount
+        if not amount or amount <= 0:
+            raise HTTPException(status_code=400, detail="Məbləğ 0-dan böyük olmalıdır")
+        
+        # Generate unique order ID
+        order_id = f"BAL-{user.id[:8]}-{uuid.uuid4().hex[:8].upper()}"
+        
+        # Create payment record in database
+        payment = Payment(
+            id=str(uuid.uuid4()),
+            user_id=user.id,
+            amount=amount,
+            payment_method="epoint",
+            status="pending"
+        )
+        
+        await db.payments.insert_one(payment.model_dump())
+        
+        # Create payment request with Epoint
+        payment_request = epoint_service.create_payment_request(
+            order_id=order_id,
+            amount=amount,
+            currency="AZN",
+            description=description or f"Balans artırma: {amount} AZN",
+            language="az"
+        )
+        
+        # Store order_id in payment record for callback matching
+        await db.payments.update_one(
+            {"id": payment.id},
+            {"$set": {"payment_url": payment_request["checkout_url"], "order_id": order_id}}
+        )
+        
+        logger.info(f"Payment created: {order_id} for user {user.id}, amount: {amount} AZN")
+        
+        return {
+            "order_id": order_id,
+            "payment_id": payment.id,
+            "checkout_url": payment_request["checkout_url"],
+            "data": payment_request["data"],
+            "signature": payment_request["signature"],
+            "amount": amount
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Create payment error: {e}")
+        raise HTTPException(status_code=500, detail="Ödəniş yaradılarkən xəta baş verdi")
+
+@router.post("/payments/callback")
+async def payment_callback(request: Request):
+    """
+    Handle payment callback from Epoint.az
+    Accepts both JSON and form-urlencoded data
+    Verify signature and update balance
+    """
+    try:
+        # Get content type
+        content_type = request.headers.get("content-type", "")
+        logger.info(f"Payment callback received. Content-Type: {content_type}")
+        
+        # Parse request data based on content type
+        if "application/x-www-form-urlencoded" in content_type:
+            # Form data from Epoint
+            form_data = await request.form()
+            data = form_data.get("data", "")
+            signature = form_data.get("signature", "")
+            logger.info(f"Received form data - data length: {len(data)}, signature: {signature[:20] if signature else 'None'}...")
+        elif "application/json" in content_type:
+            # JSON data
+            json_data = await request.json()
+            data = json_data.get("data", "")
+            signature = json_data.get("signature", "")
+            logger.info(f"Received JSON data - data length: {len(data)}, signature: {signature[:20] if signature else 'None'}...")
+        else:
+            # Try to parse as form data first, then JSON
+            try:
+                form_data = await request.form()
+                data = form_data.get("data", "")
+                signature = form_data.get("signature", "")
+                logger.info(f"Parsed as form data - data length: {len(data)}")
+            except:
+                try:
+                    json_data = await request.json()
+                    data = json_data.get("data", "")
+                    signature = json_data.get("signature", "")
+                    logger.info(f"Parsed as JSON - data length: {len(data)}")
+                except:
+                    logger.error("Failed to parse callback request")
+                    raise HTTPException(status_code=400, detail="Invalid request format")
+        
+        if not data or not signature:
+            logger.error(f"Missing data or signature. Data: {bool(data)}, Signature: {bool(signature)}")
+            raise HTTPException(status_code=400, detail="Missing data or signature")
+        
+        # Verify signature
+        if not epoint_service.verify_callback_signature(data, signature):
+            logger.warning("Invalid payment callback signature")
+            raise HTTPException(status_code=401, detail="Invalid signature")
+        
+        # Decode callback data
+        callback_data = epoint_service.decode_callback_data(data)
+        
+        logger.info(f"Payment callback decoded successfully: {callback_data}")
+        
+        # Extract payment information
+        order_id = callback_data.get("order_id")
+        status = callback_data.get("status", "").lower()
+        transaction_id = callback_data.get("transaction")
+        
+        # Find payment record
+        payment = await db.payments.find_one({"order_id": order_id}, {"_id": 0})
+        
+        if not payment:
+            logger.warning(f"Payment not found for order_id: {order_id}")
+            return {"status": "ignored", "message": "Payment not found"}
+        
+        # Update payment status
+        if status == "success":
+            # Update payment record
+            await db.payments.update_one(
+                {"order_id": order_id},
+                {
+                    "$set": {
+                        "status": "completed",
+                        "completed_at": datetime.now(timezone.utc),
+                        "transaction_id": transaction_id
+                    }
+                }
+            )
+            
+            # Update user balance
+            user = await db.users.find_one({"id": payment["user_id"]}, {"_id": 0})
+            if user:
+                new_balance = user.get("balance", 0.0) + payment["amount"]
+                await db.users.update_one(
+                    {"id": payment["user_id"]},
+                    {
+                        "$set": {
+                            "balance": new_balance,
+                            "updated_at": datetime.now(timezone.utc)
+                        }
+                    }
+                )
+                
+                # Create balance transaction record
+                transaction = BalanceTransaction(
+                    id=str(uuid.uuid4()),
+                    user_id=payment["user_id"],
+                    amount=payment["amount"],
+                    transaction_type="payment",
+                    description=f"Balans artırma: {payment['amount']} AZN",
+                    payment_method="epoint",
+                    payment_id=transaction_id,
+                    status="completed"
+                )
+                
+                await db.balance_transactions.insert_one(transaction.model_dump())
+                
+                logger.info(f"Balance updated for user {payment['user_id']}: +{payment['amount']} AZN (new balance: {new_balance} AZN)")
+                
+                # Send payment invoice email (non-blocking)
+                try:
+                    user_email = user.get("email")
+                    user_name = user.get("name", "İstifadəçi")
+                    if user_email:
+                        asyncio.create_task(send_payment_invoice_email(
+                            user_email, 
+                            user_name, 
+                            payment["amount"], 
+                            new_balance, 
+                            transaction_id or order_id
+                        ))
+                        logger.info(f"Payment invoice email queued for: {user_email}")
+                except Exception as e:
+                    logger.error(f"Failed to queue payment invoice email: {e}")
+        else:
+            # Payment failed
+            await db.payments.update_one(
+                {"order_id": order_id},
+                {
+                    "$set": {
+                        "status": "failed",
+                        "completed_at": datetime.now(timezone.utc)
+                    }
+                }
+            )
+            logger.info(f"Payment failed for order: {order_id}")
+        
+        return {
+            "status": "processed",
+            "order_id": order_id,
+            "payment_status": status
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Payment callback error: {e}")
+        raise HTTPException(status_code=500, detail="Ödəniş callback xətası")
+
+@router.get("/payments/{payment_id}/status")
+async def get_payment_status(
+    payment_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get payment status"""
+    try:
+        user = current_user
+        
+        payment = await db.payments.find_one(
+            {"id": payment_id, "user_id": user.id},
+            {"_id": 0}
+        )
+        
+        if not payment:
+            raise HTTPException(status_code=404, detail="Ödəniş tapılmadı")
+        
+        return {
+            "payment_id": payment["id"],
+            "amount": payment["amount"],
+            "status": payment["status"],
+            "created_at": payment["created_at"],
+            "completed_at": payment.get("completed_at")
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get payment status error: {e}")
+        raise HTTPException(status_code=500, detail="Ödəniş statusu alınarkən xəta baş verdi")
+
+@router.post("/payments/{payment_id}/verify")
+async def verify_payment_with_epoint(
+    payment_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Verify payment status directly with Epoint API and update balance if successful.
+    This is a fallback when Epoint callback doesn't reach our server.
+    """
+    try:
+        # Find payment
+        payment = await db.payments.find_one(
+            {"id": payment_id, "user_id": current_user.id},
+            {"_id": 0}
+        )
+        
+        if not payment:
+            raise HTTPException(status_code=404, detail="Ödəniş tapılmadı")
+        
+        # If already completed, return success
+        if payment.get("status") == "completed":
+            user = await db.users.find_one({"id": current_user.id}, {"_id": 0})
+            return {
+                "success": True,
+                "status": "completed",
+                "message": "Ödəniş artıq tamamlanıb",
+                "amount": payment["amount"],
+                "balance": user.get("balance", 0)
+            }
+        
+        # If expired or failed, return error
+        if payment.get("status") in ["expired", "failed"]:
+            return {
+                "success": False,
+                "status": payment["status"],
+                "message": "Ödəniş uğursuz olub və ya müddəti bitib"
+            }
+        
+        # Check status with Epoint API
+        order_id = payment.get("order_id")
+        if not order_id:
+            raise HTTPException(status_code=400, detail="Order ID tapılmadı")
+        
+        # Create status check request
+        status_request = epoint_service.get_payment_status_request(order_id)
+        
+        # Call Epoint API to check status
+        with track_external("epoint", "payment_status"):
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    status_request["url"],
+                    data={
+                        "data": status_request["data"],
+                        "signature": status_request["signature"]
+                    },
+                    timeout=30.0
+                )
+        
+        logger.info(f"Epoint status check response: {response.status_code} - {response.text}")
+        
+        if response.status_code != 200:
+            logger.error(f"Epoint status check failed: {response.text}")
+            return {
+                "success": False,
+                "status": "pending",
+                "message": "Epoint ilə əlaqə qurula bilmədi. Zəhmət olmasa bir az gözləyin."
+            }
+        
+        # Parse response
+        try:
+            epoint_response = response.json()
+        except:
+            # Try to decode base64 response
+            try:
+                import base64
+                decoded = base64.b64decode(response.text).decode('utf-8')
+                epoint_response = json.loads(decoded)
+            except:
+                logger.error(f"Failed to parse Epoint response: {response.text}")
+                return {
+                    "success": False,
+                    "status": "pending", 
+                    "message": "Epoint cavabı oxuna bilmədi"
+                }
+        
+        logger.info(f"Epoint status response parsed: {epoint_response}")
+        
+        # Check if payment was successful
+        epoint_status = epoint_response.get("status", "").lower()
+        transaction_id = epoint_response.get("transaction") or epoint_response.get("transaction_id")
+        
+        if epoint_status == "success" or epoint_response.get("code") == "00":
+            # Payment successful - update balance
+            
+            # Mark payment as completed
+            await db.payments.update_one(
+                {"id": payment_id},
+                {
+                    "$set": {
+                        "status": "completed",
+                        "completed_at": datetime.now(timezone.utc).isoformat(),
+                        "transaction_id": transaction_id,
+                        "verified_via": "manual_check"
+                    }
+                }
+            )
+            
+            # Update user balance
+            user = await db.users.find_one({"id": current_user.id}, {"_id": 0})
+            current_balance = user.get("balance", 0.0)
+            new_balance = current_balance + payment["amount"]
+            
+            await db.users.update_one(
+                {"id": current_user.id},
+                {
+                    "$set": {
+                        "balance": new_balance,
+                        "updated_at": datetime.now(timezone.utc).isoformat()
+                    }
+                }
+            )
+            
+            # Create balance transaction record
+            transaction = BalanceTransaction(
+                id=str(uuid.uuid4()),
+                user_id=current_user.id,
+                amount=payment["amount"],
+                transaction_type="payment",
+                description=f"Balans artırma: {payment['amount']} AZN",
+                payment_method="epoint",
+                payment_id=transaction_id or payment_id,
+                status="completed"
+            )
+            await db.balance_transactions.insert_one(transaction.model_dump())
+            
+            logger.info(f"Payment verified and balance updated for user {current_user.id}: +{payment['amount']} AZN (new balance: {new_balance} AZN)")
+            
+            # Send invoice email
+            try:
+                user_email = user.get("email")
+                user_name = user.get("name", "İstifadəçi")
+                if user_email:
+                    asyncio.create_task(send_payment_invoice_email(
+                        user_email,
+                        user_name,
+                        payment["amount"],
+                        new_balance,
+                        transaction_id or payment_id
+                    ))
+            except Exception as e:
+                logger.error(f"Failed to send invoice email: {e}")
+            
+            return {
+                "success": True,
+                "status": "completed",
+                "message": "Ödəniş uğurla təsdiqləndi!",
+                "amount": payment["amount"],
+                "balance": new_balance
+            }
+        
+        elif epoint_status in ["failed", "error", "declined"]:
+            # Payment failed
+            await db.payments.update_one(
+                {"id": payment_id},
+                {"$set": {"status": "failed", "completed_at": datetime.now(timezone.utc).isoformat()}}
+            )
+            return {
+                "success": False,
+                "status": "failed",
+                "message": "Ödəniş uğursuz oldu"
+            }
+        
+        else:
+            # Still pending or unknown status
+            return {
+                "success": False,
+                "status": "pending",
+                "message": "Ödəniş hələ emal olunur. Zəhmət olmasa bir az gözləyin.",
+                "epoint_status": epoint_status
+            }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Verify payment error: {e}")
+        raise HTTPException(status_code=500, detail="Ödəniş yoxlanılarkən xəta baş verdi")
+
+@router.get("/balance/transactions")
+async def get_balance_transactions(
+    current_user: User = Depends(get_current_user),
+    limit: int = 50
+):
+    """Get user's balance transaction history"""
+    try:
+        transactions = await db.balance_transactions.find(
+            {"user_id": current_user.id},
+            {"_id": 0}
+        ).sort("created_at", -1).to_list(limit)
+        
+        return transactions
+    except Exception as e:
+        logger.error(f"Get transactions error: {e}")
+        raise HTTPException(status_code=500, detail="Tranzaksiya tarixçəsi alınarkən xəta")
+
+@router.post("/admin/expire-pending-payments")
+async def admin_expire_pending_payments(current_user: User = Depends(get_current_user)):
+    """
+    Admin endpoint to expire ALL pending payments for the current user.
+    This does NOT add balance - only marks stuck payments as expired.
+    Balans artirmaq ucun YALNIZ Epoint callback istifade edilmelidir.
+    """
+    try:
+        # Find all pending payments
+        pending_payments = await db.payments.find({
+            "user_id": current_user.id,
+            "status": "pending"
+        }, {"_id": 0}).to_list(100)
+        
+        if not pending_payments:
+            return {
+                "success": True,
+                "message": "Gözləyən ödəniş yoxdur",
+                "expired": 0
+            }
+        
+        expired_count = 0
+        
+        for payment in pending_payments:
+            # Mark as EXPIRED - NOT completed
+            await db.payments.update_one(
+                {"id": payment["id"]},
+                {"$set": {
+                    "status": "expired",
+                    "updated_at": datetime.now(timezone.utc).isoformat()
+                }}
+            )
+            expired_count += 1
+            logger.info(f"Expired pending payment {payment['id']} for {payment['amount']} AZN")
+        
+        return {
+            "success": True,
+            "message": f"{expired_count} gözləyən ödəniş müddəti bitmiş kimi işarələndi",
+            "expired": expired_count
+        }
+        
+    except Exception as e:
+        logger.error(f"Expire payments error: {e}")
+        raise HTTPException(status_code=500, detail="Ödənişlər işarələnərkən xəta")
@@ -0,0 +1,242 @@
+"""
+Search Service for Vivento Platform
+In-process inverted index over templates and blog posts with
+Azerbaijani-aware normalization and BM25 ranking
+"""
+import asyncio
+import logging
+import math
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Letters that do not decompose under NFKD, folded to their ASCII base
+_FOLD_MAP = str.maketrans({
+    "ə": "e", "Ə": "e",
+    "ı": "i", "İ": "i",
+})
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+PREFIX_WEIGHT = 0.7  # Prefix expansions rank below exact term matches
+MIN_PREFIX_LENGTH = 2
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and fold Azerbaijani letters (ə, ş, ç, ğ, ı, ö, ü) to ASCII"""
+    text = text.translate(_FOLD_MAP).lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def strip_html(text: str) -> str:
+    return _HTML_TAG_RE.sub(" ", text)
+
+
+class SearchIndex:
+    """Immutable inverted index built from (key, weighted fields, payload) documents"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._lengths: Dict[str, float] = {}
+        self._payloads: Dict[str, Dict[str, Any]] = {}
+        self._vocabulary: List[str] = []
+        self._avg_length = 0.0
+
+    def add(self, key: str, fields: List[Tuple[Optional[str], float]], payload: Dict[str, Any]) -> None:
+        """Index a document; each field is (text, weight)"""
+        frequencies: Dict[str, float] = defaultdict(float)
+        length = 0.0
+        for text, weight in fields:
+            if not text:
+                continue
+            for token in tokenize(text):
+                frequencies[token] += weight
+                length += weight
+
+        for token, frequency in frequencies.items():
+            self._postings[token][key] = frequency
+        self._lengths[key] = length
+        self._payloads[key] = payload
+
+    def finalize(self) -> "SearchIndex":
+        self._vocabulary = sorted(self._postings)
+        if self._lengths:
+            self._avg_length = sum(self._lengths.values()) / len(self._lengths)
+        return self
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Exact term plus vocabulary terms it prefixes (search-as-you-type)"""
+        terms = []
+        if token in self._postings:
+            terms.append((token, 1.0))
+        if len(token) >= MIN_PREFIX_LENGTH:
+            position = bisect_left(self._vocabulary, token)
+            while position < len(self._vocabulary) and self._vocabulary[position].startswith(token):
+                term = self._vocabulary[position]
+                if term != token:
+                    terms.append((term, PREFIX_WEIGHT))
+                position += 1
+        return terms
+
+    def _score_token(self, token: str) -> Dict[str, float]:
+        scores: Dict[str, float] = defaultdict(float)
+        total = len(self._payloads)
+        for term, factor in self._expand(token):
+            postings = self._postings[term]
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, frequency in postings.items():
+                length_norm = 1 - B + B * self._lengths[key] / (self._avg_length or 1.0)
+                term_score = idf * frequency * (K1 + 1) / (frequency + K1 * length_norm)
+                # A document scores its best expansion, not the sum of all of them
+                scores[key] = max(scores[key], term_score * factor)
+        return scores
+
+    def search(self, query: str, limit: int = 20, kinds: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        per_token = [self._score_token(token) for token in tokens]
+        if kinds:
+            # Before the AND/OR decision: matches of other kinds must not block the fallback
+            per_token = [
+                {key: score for key, score in scores.items() if self._payloads[key]["type"] in kinds}
+                for scores in per_token
+            ]
+
+        # Every query term must match; fall back to any-term ranking otherwise
+        matching = set(per_token[0]).intersection(*per_token[1:])
+        if not matching:
+            matching = set().union(*per_token)
+
+        results = []
+        for key in matching:
+            score = sum(scores.get(key, 0.0) for scores in per_token)
+            results.append((score, key))
+
+        results.sort(key=lambda item: (-item[0], item[1]))
+        return [
+            {**self._payloads[key], "score": round(score, 4)}
+            for score, key in results[:limit]
+        ]
+
+
+def build_index(templates: List[Dict[str, Any]], posts: List[Dict[str, Any]]) -> SearchIndex:
+    """Index template names/categories and blog titles/excerpts/content"""
+    index = SearchIndex()
+
+    for template in templates:
+        index.add(
+            f"template:{template['id']}",
+            [
+                (template.get("name"), 3.0),
+                (template.get("category"), 1.5),
+                (template.get("parent_category"), 1.5),
+                (template.get("sub_category"), 1.5),
+            ],
+            {
+                "type": "template",
+                "id": template["id"],
+                "title": template.get("name"),
+                "thumbnail_url": template.get("thumbnail_url"),
+                "parent_category": template.get("parent_category"),
+                "sub_category": template.get("sub_category"),
+                "is_premium": template.get("is_premium", False),
+            },
+        )
+
+    for post in posts:
+        fields: List[Tuple[Optional[str], float]] = []
+        for suffix in ("", "_en", "_ru"):
+            fields.append((post.get(f"title{suffix}"), 3.0))
+            fields.append((post.get(f"excerpt{suffix}"), 1.5))
+            content = post.get(f"content{suffix}")
+            fields.append((strip_html(content) if content else None, 1.0))
+        fields.append((" ".join(post.get("tags") or []), 2.0))
+        fields.append((post.get("category"), 1.5))
+
+        index.add(
+            f"blog:{post['id']}",
+            fields,
+            {
+                "type": "blog",
+                "id": post["id"],
+                "title": post.get("title"),
+                "slug": post.get("slug"),
+                "excerpt": post.get("excerpt"),
+                "thumbnail": post.get("thumbnail"),
+            },
+        )
+
+    return index.finalize()
+
+
+class SearchService:
+    """Keeps a SearchIndex in sync with templates and published blog posts"""
+
+    def __init__(
+        self,
+        template_loader: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        post_loader: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        max_age_seconds: float = 300,
+    ):
+        self._template_loader = template_loader
+        self._post_loader = post_loader
+        self.max_age_seconds = max_age_seconds
+        self._index: Optional[SearchIndex] = None
+        self._built_at = 0.0
+        self._stale = True
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Rebuild the index on the next search"""
+        self._stale = True
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._index is not None
+            and not self._stale
+            and time.monotonic() - self._built_at < self.max_age_seconds
+        )
+
+    async def get_index(self) -> SearchIndex:
+        if self._is_fresh():
+            return self._index
+        async with self._lock:
+            if self._is_fresh():
+                return self._index
+            self._stale = False
+            started = time.perf_counter()
+            try:
+                templates = await self._template_loader()
+                posts = await self._post_loader()
+            except Exception:
+                self._stale = True
+                raise
+            self._index = build_index(templates, posts)
+            self._built_at = time.monotonic()
+            logger.info(
+                f"Search index rebuilt: {len(self._index)} documents "
+                f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+            )
+            return self._index
+
+    async def search(self, query: str, limit: int = 20, kinds: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        index = await self.get_index()
+        return index.search(query, limit=limit, kinds=kinds)
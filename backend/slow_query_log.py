@@ -0,0 +1,194 @@
+"""
+Slow Query Log Service for Vivento Platform
+pymongo CommandListener that logs commands over a latency threshold with the
+route that issued them and the shape of their filter, and optionally samples
+explain() plans to flag collection scans
+"""
+import json
+import logging
+import queue
+import random
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from metrics_service import command_collection, current_route, registry
+
+logger = logging.getLogger(__name__)
+
+# Commands the server can explain, and the parts of them that decide the plan
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+SHAPE_FIELDS = {
+    "find": ("filter", "sort", "projection"),
+    "aggregate": ("pipeline",),
+    "count": ("query",),
+    "distinct": ("key", "query"),
+    "findAndModify": ("query", "sort"),
+    "update": ("updates",),
+    "delete": ("deletes",),
+}
+# Session and cluster bookkeeping the driver adds; explain() rejects some of it
+DRIVER_FIELDS = {"lsid", "$clusterTime", "$db", "txnNumber", "autocommit", "startTransaction", "$readPreference"}
+# Command fields and pipeline stages whose values describe the plan rather than user data
+LITERAL_FIELDS = {"sort", "projection", "key"}
+LITERAL_STAGES = {"$sort", "$project", "$lookup", "$unwind", "$count"}
+MAX_SHAPE_LENGTH = 500
+
+slow_commands = registry.counter(
+    "mongodb_slow_commands_total", "MongoDB commands over the slow query threshold", ("route", "collection", "command")
+)
+collection_scans = registry.counter(
+    "mongodb_collection_scans_total", "Sampled slow commands whose plan scans a whole collection", ("route", "collection", "command")
+)
+
+
+def query_shape(value: Any, literal: bool = False) -> Any:
+    """
+    Filter with its values replaced by "?": field names, operators and field
+    references ("$guest_id") stay, so one shape covers every call site value.
+    """
+    if isinstance(value, dict):
+        # A $lookup sub-pipeline can carry user values again
+        return {
+            key: query_shape(item, (literal or key in LITERAL_STAGES) and key != "pipeline")
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        # Operator lists ($in, $or) keep one representative shape per distinct item
+        shapes = []
+        for item in value:
+            shape = query_shape(item, literal)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    if literal or (isinstance(value, str) and value.startswith("$")):
+        return value
+    return "?"
+
+
+def command_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape of the plan-relevant parts of a command"""
+    shape = {}
+    for field in SHAPE_FIELDS.get(command_name, ()):
+        if field not in command:
+            continue
+        if field in ("updates", "deletes"):
+            shape[field] = query_shape([{"q": statement.get("q", {})} for statement in command[field]])
+        else:
+            shape[field] = query_shape(command[field], field in LITERAL_FIELDS)
+    return shape
+
+
+def find_collscans(plan: Any) -> bool:
+    """True when any stage of an explain() plan is a COLLSCAN"""
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(find_collscans(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(find_collscans(value) for value in plan)
+    return False
+
+
+def _format_shape(shape: Dict[str, Any]) -> str:
+    text = json.dumps(shape, default=str, separators=(",", ":"))
+    return text if len(text) <= MAX_SHAPE_LENGTH else text[:MAX_SHAPE_LENGTH] + "..."
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """
+    Logs every command slower than threshold_ms. With explain_rate > 0 that
+    fraction of slow find/aggregate/update/... commands is explained on a
+    background thread (once per shape) and collection scans are reported.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 200,
+        explain_rate: float = 0.0,
+        explain_client: Optional[Callable[[], Any]] = None,
+        max_explained_shapes: int = 1024,
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain_rate = explain_rate if explain_client is not None else 0.0
+        self._explain_client_factory = explain_client
+        self._explain_client = None
+        self._pending: Dict[Tuple[int, object], tuple] = {}
+        self._explained: set = set()
+        self._max_explained_shapes = max_explained_shapes
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=64)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def started(self, event) -> None:
+        self._pending[(event.request_id, event.connection_id)] = (
+            current_route(), command_collection(event), event.command_name, event.database_name, event.command
+        )
+
+    def succeeded(self, event) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool) -> None:
+        pending = self._pending.pop((event.request_id, event.connection_id), None)
+        duration_ms = event.duration_micros / 1000
+        if pending is None or duration_ms < self.threshold_ms:
+            return
+
+        route, collection, command_name, database, command = pending
+        shape = command_shape(command_name, command)
+        slow_commands.inc(route, collection, command_name)
+        logger.warning(
+            f"Slow MongoDB {command_name} on {collection} took {duration_ms:.1f} ms"
+            f"{' (failed)' if failed else ''} [route {route}] {_format_shape(shape)}"
+        )
+        if not failed and command_name in EXPLAINABLE_COMMANDS and self._should_explain():
+            self._enqueue_explain(route, collection, command_name, database, command, shape)
+
+    def _should_explain(self) -> bool:
+        return self.explain_rate > 0 and random.random() < self.explain_rate
+
+    def _enqueue_explain(self, route, collection, command_name, database, command, shape) -> None:
+        key = (collection, command_name, _format_shape(shape))
+        if key in self._explained or len(self._explained) >= self._max_explained_shapes:
+            return
+        self._explained.add(key)
+        explain_command = {name: value for name, value in command.items() if name not in DRIVER_FIELDS}
+        try:
+            self._queue.put_nowait((route, collection, command_name, database, explain_command, shape))
+        except queue.Full:
+            self._explained.discard(key)
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._explain_worker, name="slow-query-explain", daemon=True)
+                self._worker.start()
+
+    def _explain_worker(self) -> None:
+        while True:
+            self.explain(*self._queue.get())
+
+    def explain(self, route, collection, command_name, database, command, shape) -> Optional[bool]:
+        """
+        Run explain() for a sampled command on a separate (uninstrumented)
+        client; returns whether the plan scans the collection.
+        """
+        try:
+            if self._explain_client is None:
+                self._explain_client = self._explain_client_factory()
+            result = self._explain_client[database].command({"explain": command, "verbosity": "queryPlanner"})
+        except Exception as e:
+            logger.debug(f"Explain of slow {command_name} on {collection} failed: {e}")
+            return None
+
+        scans = find_collscans(result.get("queryPlanner", result))
+        if scans:
+            collection_scans.inc(route, collection, command_name)
+            logger.warning(f"COLLSCAN: {command_name} on {collection} [route {route}] {_format_shape(shape)}")
+        return scans
+
+    def explained_shapes(self) -> List[tuple]:
+        return sorted(self._explained)
@@ -0,0 +1,511 @@
+"""
+Storage Service for Vivento Platform
+One interface over the places uploaded files live: Cloudinary, the local
+filesystem (served from /api/uploads) and S3-compatible object storage
+"""
+import abc
+import asyncio
+import hashlib
+import hmac
+import io
+import logging
+import mimetypes
+import os
+import tempfile
+import time
+from pathlib import Path, PurePosixPath
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlencode
+
+from metrics_service import track_external
+from asset_service import ASSET_FILE_MODE, DEFAULT_CACHE_CONTROL, HASHED_NAME_RE, IMMUTABLE_CACHE_CONTROL, store_asset, write_precompressed
+
+logger = logging.getLogger(__name__)
+
+STORAGE_DRIVERS = ("cloudinary", "local", "s3")
+
+# mimetypes maps image/jpeg to .jpe on some platforms
+EXTENSIONS = {"image/jpeg": ".jpg", "image/webp": ".webp", "image/avif": ".avif", "image/svg+xml": ".svg"}
+
+# Direct uploads are stored as sent, so only raster formats: an SVG can carry
+# script and the local driver serves it from our own origin
+DIRECT_UPLOAD_TYPES = ("image/jpeg", "image/png", "image/webp", "image/avif")
+# The same formats as Pillow and Cloudinary name them, checked on the stored
+# bytes: the content type is only what the client declared
+DIRECT_UPLOAD_FORMATS = ("JPEG", "PNG", "WEBP", "AVIF")
+CLOUDINARY_UPLOAD_FORMATS = ("jpg", "png", "webp", "avif")
+
+
+def extension_for(content_type: Optional[str]) -> str:
+    if not content_type:
+        return ""
+    return EXTENSIONS.get(content_type) or mimetypes.guess_extension(content_type) or ""
+
+
+def image_size(data: bytes) -> Dict[str, Optional[int]]:
+    """Pixel size from the image header (no decode); None for non-images"""
+    try:
+        from PIL import Image
+        width, height = Image.open(io.BytesIO(data)).size
+        return {"width": width, "height": height}
+    except Exception:
+        return {"width": None, "height": None}
+
+
+def verified_image_size(path: Path) -> Optional[Dict[str, int]]:
+    """Pixel size of a file that Pillow verifies as a direct upload format, else None"""
+    try:
+        from PIL import Image
+        with Image.open(path) as image:
+            if image.format not in DIRECT_UPLOAD_FORMATS:
+                return None
+            width, height = image.size
+            image.verify()
+        return {"width": width, "height": height}
+    except Exception:
+        return None
+
+
+def cache_control_for(key: str) -> str:
+    return IMMUTABLE_CACHE_CONTROL if HASHED_NAME_RE.match(PurePosixPath(key).name) else DEFAULT_CACHE_CONTROL
+
+
+class StorageBackend(abc.ABC):
+    """
+    Driver interface. Keys are '/'-separated paths ("images/image_<id>");
+    drivers adjust them (file extension from the content type, Cloudinary
+    drops it for images), so keep the `key` returned by `put` (or
+    `storage_key`) for `get`/`delete`.
+
+    `put` returns {key, url, width, height, bytes}. Driver-specific options
+    (Cloudinary tags and transformations) are ignored by the others.
+
+    Direct uploads skip our API workers. Drivers with
+    `supports_direct_upload` implement `direct_upload`, which returns what
+    the client needs to send the file to the store itself,
+    {key, method, url, fields, headers} (POST = multipart form with
+    `fields` before the file, PUT = raw body), and `confirm_direct_upload`,
+    which checks the result afterwards.
+    """
+
+    name = "base"
+    supports_direct_upload = False
+
+    def storage_key(self, key: str, content_type: Optional[str] = None) -> str:
+        """The key `put` stores the data under"""
+        if PurePosixPath(key).suffix:
+            return key
+        return key + extension_for(content_type)
+
+    @abc.abstractmethod
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None, **options) -> Dict[str, Any]:
+        ...
+
+    async def get(self, key: str) -> bytes:
+        import httpx
+
+        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+            response = await client.get(self.url(key))
+        response.raise_for_status()
+        return response.content
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def url(self, key: str) -> str:
+        ...
+
+    def direct_upload(self, key: str, content_type: str, max_bytes: int, expires_in: int, **options) -> Dict[str, Any]:
+        """Only called when `supports_direct_upload` is set"""
+        raise RuntimeError(f"{self.name} storage does not support direct uploads")
+
+    async def confirm_direct_upload(self, key: str, content_type: str, max_bytes: int, proof: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Stored object of a finished direct upload, in `put`'s shape. `proof`
+        is what the store answered the client (Cloudinary's upload response).
+        Raises ValueError when the upload is missing or out of bounds.
+        """
+        raise RuntimeError(f"{self.name} storage does not support direct uploads")
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Filesystem path when the driver stores files on this node"""
+        return None
+
+    async def local_copy(self, key: str, cache_dir: Path) -> Path:
+        """A readable local file for the key (downloaded once into cache_dir for remote drivers)"""
+        path = self.local_path(key)
+        if path is not None:
+            return path
+        path = cache_dir / self.name / key
+        if not path.exists():
+            data = await self.get(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(store_asset, path.parent, path.name, data)
+        return path
+
+
+_cloudinary_configured = False
+
+
+def cloudinary_sdk():
+    """
+    The cloudinary package (api, uploader and utils loaded), configured from the
+    CLOUDINARY_* environment on first use so workers that never touch
+    Cloudinary do not import it
+    """
+    global _cloudinary_configured
+    import cloudinary
+    import cloudinary.api
+    import cloudinary.uploader
+    import cloudinary.utils
+
+    if not _cloudinary_configured:
+        settings = {
+            "cloud_name": os.environ.get("CLOUDINARY_CLOUD_NAME"),
+            "api_key": os.environ.get("CLOUDINARY_API_KEY"),
+            "api_secret": os.environ.get("CLOUDINARY_API_SECRET"),
+        }
+        cloudinary.config(secure=True, **{name: value for name, value in settings.items() if value})
+        _cloudinary_configured = True
+    return cloudinary
+
+
+class CloudinaryStorage(StorageBackend):
+    """Cloudinary uploads; images keep extension-less public ids, other files are raw resources"""
+
+    name = "cloudinary"
+    supports_direct_upload = True
+
+    @staticmethod
+    def _resource_type(key: str, content_type: Optional[str] = None) -> str:
+        if content_type:
+            return "image" if content_type.startswith("image/") else "raw"
+        return "raw" if PurePosixPath(key).suffix else "image"
+
+    def storage_key(self, key: str, content_type: Optional[str] = None) -> str:
+        if self._resource_type(key, content_type) == "image":
+            return str(PurePosixPath(key).with_suffix(""))
+        return key
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None, **options) -> Dict[str, Any]:
+        cloudinary = cloudinary_sdk()
+        resource_type = self._resource_type(key, content_type)
+        folder, _, public_id = self.storage_key(key, content_type).rpartition("/")
+        upload_options = {"public_id": public_id, "resource_type": resource_type, **options}
+        if folder:
+            upload_options["folder"] = folder
+        with track_external("cloudinary", "upload"):
+            result = await asyncio.to_thread(cloudinary.uploader.upload, data, **upload_options)
+        return {
+            "key": result["public_id"],
+            "url": result["secure_url"],
+            "width": result.get("width"),
+            "height": result.get("height"),
+            "bytes": result.get("bytes", len(data)),
+        }
+
+    async def delete(self, key: str) -> None:
+        cloudinary = cloudinary_sdk()
+        with track_external("cloudinary", "destroy"):
+            await asyncio.to_thread(cloudinary.uploader.destroy, key, resource_type=self._resource_type(key))
+
+    def url(self, key: str) -> str:
+        cloudinary = cloudinary_sdk()
+        return cloudinary.utils.cloudinary_url(key, resource_type=self._resource_type(key), secure=True)[0]
+
+    def direct_upload(self, key: str, content_type: str, max_bytes: int, expires_in: int, **options) -> Dict[str, Any]:
+        """
+        Signed upload parameters. Cloudinary accepts a signature for an hour
+        and cannot cap the size, so both are enforced on confirmation.
+        overwrite=false makes a replayed signature unable to replace the file,
+        allowed_formats keeps Cloudinary from storing anything but raster images.
+        """
+        cloudinary = cloudinary_sdk()
+        config = cloudinary.config()
+        resource_type = self._resource_type(key, content_type)
+        storage_key = self.storage_key(key, content_type)
+        folder, _, public_id = storage_key.rpartition("/")
+        # Signed as sent by the client: a string, not a Python bool
+        params = {
+            "public_id": public_id,
+            "timestamp": int(time.time()),
+            "overwrite": "false",
+            "allowed_formats": ",".join(CLOUDINARY_UPLOAD_FORMATS),
+        }
+        if folder:
+            params["folder"] = folder
+        if options.get("tags"):
+            params["tags"] = ",".join(options["tags"])
+        params["signature"] = cloudinary.utils.api_sign_request(params, config.api_secret)
+        params["api_key"] = config.api_key
+        return {
+            "key": storage_key,
+            "method": "POST",
+            "url": f"https://api.cloudinary.com/v1_1/{config.cloud_name}/{resource_type}/upload",
+            "fields": params,
+            "headers": {},
+        }
+
+    async def confirm_direct_upload(self, key: str, content_type: str, max_bytes: int, proof: Dict[str, Any]) -> Dict[str, Any]:
+        cloudinary = cloudinary_sdk()
+        if proof.get("public_id") != key or not proof.get("version") or not proof.get("signature"):
+            raise ValueError("Cloudinary upload response missing or for another asset")
+        if not cloudinary.utils.verify_api_response_signature(key, proof["version"], proof["signature"]):
+            raise ValueError("Invalid Cloudinary response signature")
+        # The signature does not cover `bytes`; read the stored asset instead
+        resource_type = self._resource_type(key)
+        try:
+            with track_external("cloudinary", "resource"):
+                resource = await asyncio.to_thread(cloudinary.api.resource, key, resource_type=resource_type)
+        except cloudinary.exceptions.NotFound:
+            raise ValueError("Upload not received")
+        if int(resource.get("bytes") or 0) > max_bytes:
+            await self.delete(key)
+            raise ValueError(f"Upload larger than {max_bytes} bytes")
+        if resource_type != "image" or resource.get("format") not in CLOUDINARY_UPLOAD_FORMATS:
+            await self.delete(key)
+            raise ValueError(f"Upload is not a {', '.join(CLOUDINARY_UPLOAD_FORMATS)} image")
+        return {
+            "key": key,
+            "url": cloudinary.utils.cloudinary_url(
+                key, version=resource["version"], resource_type=resource_type, secure=True
+            )[0],
+            "width": resource.get("width"),
+            "height": resource.get("height"),
+            "bytes": resource.get("bytes"),
+        }
+
+
+class LocalStorage(StorageBackend):
+    """
+    Files under `root`, served by the AssetStaticFiles mount at `url_prefix`.
+
+    Direct uploads go to `upload_url` (a streaming PUT endpoint calling
+    `receive_direct_upload`), authorised by an HMAC over the key, content
+    type, size cap and expiry instead of a session.
+    """
+
+    name = "local"
+    chunk_size = 64 * 1024
+
+    def __init__(self, root: Path, url_prefix: str, upload_url: Optional[str] = None, signing_secret: Optional[str] = None):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+        self.upload_url = upload_url.rstrip("/") if upload_url else None
+        self.signing_secret = signing_secret
+
+    @property
+    def supports_direct_upload(self) -> bool:
+        return bool(self.upload_url and self.signing_secret)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Storage key outside of {self.root}: {key}")
+        return path
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None, **options) -> Dict[str, Any]:
+        key = self.storage_key(key, content_type)
+        path = self.local_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Also writes .gz/.br siblings for compressible files
+        await asyncio.to_thread(store_asset, path.parent, path.name, data)
+        return {"key": key, "url": self.url(key), **image_size(data), "bytes": len(data)}
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self.local_path(key).read_bytes)
+
+    async def delete(self, key: str) -> None:
+        path = self.local_path(key)
+        for candidate in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+            candidate.unlink(missing_ok=True)
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+    def _signature(self, key: str, content_type: str, max_bytes: int, expires: int) -> str:
+        message = f"{key}\n{content_type}\n{max_bytes}\n{expires}".encode()
+        return hmac.new(self.signing_secret.encode(), message, hashlib.sha256).hexdigest()
+
+    def direct_upload(self, key: str, content_type: str, max_bytes: int, expires_in: int, **options) -> Dict[str, Any]:
+        if not self.supports_direct_upload:
+            return super().direct_upload(key, content_type, max_bytes, expires_in, **options)
+        if content_type not in DIRECT_UPLOAD_TYPES:
+            raise ValueError(f"Direct uploads do not accept {content_type}")
+        key = self.storage_key(key, content_type)
+        expires = int(time.time()) + expires_in
+        query = urlencode({
+            "max_bytes": max_bytes,
+            "expires": expires,
+            "signature": self._signature(key, content_type, max_bytes, expires),
+        })
+        return {
+            "key": key,
+            "method": "PUT",
+            "url": f"{self.upload_url}/{key}?{query}",
+            "fields": {},
+            "headers": {"Content-Type": content_type},
+        }
+
+    async def receive_direct_upload(self, key: str, content_type: str, max_bytes: int, expires: int,
+                                    signature: str, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Stream a signed direct upload to disk, returns bytes written.
+        PermissionError for a bad or expired signature, FileExistsError when
+        the key was already uploaded (a replayed URL), ValueError when the
+        body exceeds the signed size cap.
+        """
+        if not self.signing_secret or expires < time.time() or not hmac.compare_digest(
+            signature, self._signature(key, content_type, max_bytes, expires)
+        ):
+            raise PermissionError("Invalid or expired upload signature")
+
+        path = self.local_path(key)
+        if path.exists():
+            raise FileExistsError(f"Already uploaded: {key}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        written = 0
+        try:
+            with os.fdopen(fd, "wb") as file:
+                async for chunk in chunks:
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise ValueError(f"Upload larger than {max_bytes} bytes")
+                    await asyncio.to_thread(file.write, chunk)
+            os.chmod(tmp_path, ASSET_FILE_MODE)
+            # link() fails if a concurrent PUT got there first, replace() would not
+            os.link(tmp_path, path)
+        finally:
+            os.unlink(tmp_path)
+        await asyncio.to_thread(write_precompressed, path)
+        return written
+
+    async def confirm_direct_upload(self, key: str, content_type: str, max_bytes: int, proof: Dict[str, Any]) -> Dict[str, Any]:
+        path = self.local_path(key)
+        if not path.is_file():
+            raise ValueError("Upload not received")
+        size = path.stat().st_size
+        if size > max_bytes:
+            await self.delete(key)
+            raise ValueError(f"Upload larger than {max_bytes} bytes")
+        # Served from our own origin, so the bytes must really be an image
+        dimensions = await asyncio.to_thread(verified_image_size, path)
+        if dimensions is None:
+            await self.delete(key)
+            raise ValueError("Upload is not a valid image")
+        return {"key": key, "url": self.url(key), **dimensions, "bytes": size}
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible object storage (AWS, MinIO, Cloudflare R2, ...).
+    Credentials come from the usual boto3 sources (AWS_ACCESS_KEY_ID, ...).
+    `public_url` is the bucket's public/CDN base URL.
+    """
+
+    name = "s3"
+    supports_direct_upload = True
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 region: Optional[str] = None, public_url: Optional[str] = None):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.endpoint_url = endpoint_url or None
+        self.region = region or None
+        if public_url:
+            self.public_url = public_url.rstrip("/")
+        elif self.endpoint_url:
+            self.public_url = f"{self.endpoint_url.rstrip('/')}/{bucket}"
+        else:
+            self.public_url = f"https://{bucket}.s3.{self.region or 'us-east-1'}.amazonaws.com"
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client("s3", endpoint_url=self.endpoint_url, region_name=self.region)
+        return self._client
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None, **options) -> Dict[str, Any]:
+        key = self.storage_key(key, content_type)
+        with track_external("s3", "put_object"):
+            await asyncio.to_thread(
+                self.client.put_object,
+                Bucket=self.bucket,
+                Key=self._object_key(key),
+                Body=data,
+                ContentType=content_type or mimetypes.guess_type(key)[0] or "application/octet-stream",
+                CacheControl=cache_control_for(key),
+            )
+        return {"key": key, "url": self.url(key), **image_size(data), "bytes": len(data)}
+
+    async def get(self, key: str) -> bytes:
+        def read():
+            return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"].read()
+        return await asyncio.to_thread(read)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=self._object_key(key))
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{self._object_key(key)}"
+
+    def direct_upload(self, key: str, content_type: str, max_bytes: int, expires_in: int, **options) -> Dict[str, Any]:
+        """Presigned POST; S3 itself enforces the content type and size range"""
+        key = self.storage_key(key, content_type)
+        cache_control = cache_control_for(key)
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Fields={"Content-Type": content_type, "Cache-Control": cache_control},
+            Conditions=[
+                {"Content-Type": content_type},
+                {"Cache-Control": cache_control},
+                ["content-length-range", 1, max_bytes],
+            ],
+            ExpiresIn=expires_in,
+        )
+        return {"key": key, "method": "POST", "url": post["url"], "fields": post["fields"], "headers": {}}
+
+    async def confirm_direct_upload(self, key: str, content_type: str, max_bytes: int, proof: Dict[str, Any]) -> Dict[str, Any]:
+        def head():
+            return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        try:
+            head_result = await asyncio.to_thread(head)
+        except Exception as e:
+            raise ValueError(f"Upload not found: {e}")
+        if head_result["ContentLength"] > max_bytes:
+            await self.delete(key)
+            raise ValueError(f"Upload larger than {max_bytes} bytes")
+
+        def read_header():
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key), Range="bytes=0-65535")
+            return response["Body"].read()
+        header = await asyncio.to_thread(read_header)
+        return {"key": key, "url": self.url(key), **image_size(header), "bytes": head_result["ContentLength"]}
+
+
+def create_storage(driver: str, local_root: Optional[Path] = None, local_url_prefix: str = "",
+                   local_upload_url: Optional[str] = None, signing_secret: Optional[str] = None, s3_bucket: Optional[str] = None, s3_prefix: str = "", s3_endpoint_url: Optional[str] = None,
+                   s3_region: Optional[str] = None, s3_public_url: Optional[str] = None) -> StorageBackend:
+    """Storage driver by name ("cloudinary", "local" or "s3")"""
+    driver = driver.lower()
+    if driver == "cloudinary":
+        return CloudinaryStorage()
+    if driver == "local":
+        if local_root is None:
+            raise ValueError("Local storage needs a root directory")
+        return LocalStorage(local_root, local_url_prefix, upload_url=local_upload_url, signing_secret=signing_secret)
+    if driver == "s3":
+        if not s3_bucket:
+            raise ValueError("S3 storage needs S3_BUCKET")
+        return S3Storage(s3_bucket, prefix=s3_prefix, endpoint_url=s3_endpoint_url,
+                         region=s3_region, public_url=s3_public_url)
+    raise ValueError(f"Unknown storage driver '{driver}' (expected one of {', '.join(STORAGE_DRIVERS)})")
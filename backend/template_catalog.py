@@ -0,0 +1,157 @@
+"""
+Template Catalog for Vivento Platform
+In-memory snapshot of the templates collection shared by read endpoints
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateCatalog:
+    """
+    Lazily loaded list of template documents.
+
+    The snapshot is reloaded on the next read after `invalidate()` (admin
+    writes in this worker) or once it is older than `ttl_seconds` (writes
+    made by other workers).
+    """
+
+    def __init__(self, loader: Callable[[], Awaitable[List[Dict[str, Any]]]], ttl_seconds: float = 300):
+        self._loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._templates: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at = 0.0
+        self._stale = True
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def _is_fresh(self) -> bool:
+        return not self._stale and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    async def _ensure_fresh(self) -> None:
+        if self._is_fresh():
+            return
+        async with self._lock:
+            # Another request may have reloaded while we waited
+            if self._is_fresh():
+                return
+            self._stale = False
+            try:
+                templates = await self._loader()
+            except Exception:
+                self._stale = True
+                raise
+            self._templates = templates
+            self._by_id = {template["id"]: template for template in templates if "id" in template}
+            self._loaded_at = time.monotonic()
+            logger.info(f"Template catalog loaded: {len(templates)} templates")
+
+    async def all(self) -> List[Dict[str, Any]]:
+        """All template documents (do not mutate the returned dicts)"""
+        await self._ensure_fresh()
+        return self._templates
+
+    async def get(self, template_id: str) -> Optional[Dict[str, Any]]:
+        await self._ensure_fresh()
+        return self._by_id.get(template_id)
+
+    async def get_many(self, template_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Templates for the given ids in the given order, skipping unknown ids"""
+        await self._ensure_fresh()
+        return [self._by_id[template_id] for template_id in template_ids if template_id in self._by_id]
+
+
+# Faceted browsing over catalog snapshots
+
+TEMPLATE_SORTS = ("newest", "popular", "price_asc", "price_desc", "name")
+
+
+def _created_at_key(template: Dict[str, Any]) -> datetime:
+    created_at = template.get("created_at")
+    if isinstance(created_at, str):
+        try:
+            created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        except ValueError:
+            return datetime.min
+    if not isinstance(created_at, datetime):
+        return datetime.min
+    # Compare as naive UTC; MongoDB returns naive datetimes
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at
+
+
+def _matches(template: Dict[str, Any], filters: Dict[str, Any], skip: Optional[str] = None) -> bool:
+    for name, value in filters.items():
+        if value is None or name == skip:
+            continue
+        if name == "min_price":
+            if template.get("price_per_invitation", 0) < value:
+                return False
+        elif name == "max_price":
+            if template.get("price_per_invitation", 0) > value:
+                return False
+        elif template.get(name) != value:
+            return False
+    return True
+
+
+def _count(templates: List[Dict[str, Any]], field: str) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for template in templates:
+        value = template.get(field)
+        if value is None:
+            continue
+        key = str(value).lower() if isinstance(value, bool) else str(value)
+        counts[key] = counts.get(key, 0) + 1
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def browse_templates(
+    templates: List[Dict[str, Any]],
+    filters: Dict[str, Any],
+    sort: str = "newest",
+    limit: int = 24,
+    offset: int = 0,
+    popularity: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Filter, sort and page templates and compute facet counts.
+
+    Each facet is counted with every filter applied except its own, so the
+    UI can show how many results switching that facet would give.
+    """
+    matching = [template for template in templates if _matches(template, filters)]
+
+    facets = {}
+    for field in ("parent_category", "sub_category", "is_premium"):
+        facet_base = [template for template in templates if _matches(template, filters, skip=field)]
+        facets[field] = _count(facet_base, field)
+
+    prices = [template.get("price_per_invitation", 0) for template in matching]
+    facets["price"] = {"min": min(prices), "max": max(prices)} if prices else {"min": None, "max": None}
+
+    popularity = popularity or {}
+    if sort == "popular":
+        matching.sort(key=lambda t: (popularity.get(t.get("id"), 0), _created_at_key(t)), reverse=True)
+    elif sort == "price_asc":
+        matching.sort(key=lambda t: (t.get("price_per_invitation", 0), t.get("name", "")))
+    elif sort == "price_desc":
+        matching.sort(key=lambda t: (-t.get("price_per_invitation", 0), t.get("name", "")))
+    elif sort == "name":
+        matching.sort(key=lambda t: t.get("name", "").lower())
+    else:
+        matching.sort(key=_created_at_key, reverse=True)
+
+    return {
+        "total": len(matching),
+        "items": matching[offset:offset + limit],
+        "facets": facets,
+    }
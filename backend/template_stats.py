@@ -0,0 +1,86 @@
+"""
+Template Popularity Stats for Vivento Platform
+Incremental per-template usage counters and a periodically refreshed ranking
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Contribution of one unit of each counter to the popularity score
+POPULARITY_WEIGHTS = {
+    "events_created": 5.0,
+    "favorites": 3.0,
+    "invitations_charged": 0.2,
+}
+
+
+async def record_template_activity(collection, template_id: Optional[str], counter: str, amount: int = 1) -> None:
+    """
+    Increment a template counter and its score in one upsert.
+    Never raises: popularity must not break the request that triggered it.
+    """
+    if not template_id or not amount:
+        return
+    try:
+        await collection.update_one(
+            {"template_id": template_id},
+            {
+                "$inc": {counter: amount, "score": POPULARITY_WEIGHTS[counter] * amount},
+                "$set": {"updated_at": datetime.now(timezone.utc)},
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        logger.error(f"Template stats update error ({template_id}, {counter}): {e}")
+
+
+class PopularityRanking:
+    """Cached template scores, refreshed on a schedule instead of per request"""
+
+    def __init__(self, loader: Callable[[], Awaitable[List[Dict[str, Any]]]], refresh_interval: float = 300):
+        self._loader = loader
+        self.refresh_interval = refresh_interval
+        self.scores: Dict[str, float] = {}
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.ranked_ids: List[str] = []
+        self.refreshed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> None:
+        docs = await self._loader()
+        stats = {doc["template_id"]: doc for doc in docs if doc.get("template_id")}
+        self.stats = stats
+        self.scores = {template_id: doc.get("score", 0.0) for template_id, doc in stats.items()}
+        self.ranked_ids = sorted(self.scores, key=lambda template_id: -self.scores[template_id])
+        self.refreshed_at = time.monotonic()
+        logger.debug(f"Template popularity refreshed: {len(stats)} templates")
+
+    async def ensure_loaded(self) -> None:
+        """Load once if the background loop has not run yet"""
+        if self.refreshed_at is None:
+            await self.refresh()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Template popularity refresh error: {e}")
+            await asyncio.sleep(self.refresh_interval)
@@ -0,0 +1,170 @@
+"""
+Asset Index Tests for Vivento Platform
+Tests: perceptual hash bands, near-duplicate rules, image fingerprints, index lookups
+"""
+import asyncio
+import io
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from asset_index import AssetIndex, MAX_PHASH_DISTANCE, hamming_distance, is_near_duplicate, phash_bands, sha256_digest
+from image_service import image_fingerprint
+
+pytest.importorskip("PIL")
+from PIL import Image, ImageDraw
+
+
+def make_design(width=600, height=900, background=(190, 24, 93), image_format="JPEG", quality=90):
+    image = Image.new("RGB", (width, height), background)
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((width // 6, height // 8, width * 5 // 6, height // 2), fill=(250, 240, 230))
+    draw.rectangle((0, height * 2 // 3, width, height), fill=(30, 30, 60))
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, quality=quality)
+    return buffer.getvalue()
+
+
+def fingerprint(phash="f0c0cef0318c0000", mean_color=(100, 100, 100), width=600, height=900):
+    return {"phash": phash, "mean_color": list(mean_color), "width": width, "height": height}
+
+
+class TestPhashBands:
+    """Band lookup must find every hash within MAX_PHASH_DISTANCE"""
+
+    def test_close_hashes_share_a_band(self):
+        rng = random.Random(7)
+        for _ in range(500):
+            bits = other = rng.getrandbits(64)
+            for flipped in rng.sample(range(64), MAX_PHASH_DISTANCE):
+                other ^= 1 << flipped
+            assert set(phash_bands(f"{bits:016x}")) & set(phash_bands(f"{other:016x}"))
+
+    def test_bands_are_positional(self):
+        assert phash_bands("aaaabbbbccccdddd") == ["0:aaaa", "1:bbbb", "2:cccc", "3:dddd"]
+        assert hamming_distance("00000000000000ff", "000000000000000f") == 4
+
+
+class TestNearDuplicate:
+    """is_near_duplicate rules"""
+
+    def test_matching_fingerprints(self):
+        assert is_near_duplicate(fingerprint(), fingerprint(phash="f0c0cef0318c0001"))
+
+    def test_different_colour_is_not_a_duplicate(self):
+        assert not is_near_duplicate(fingerprint(), fingerprint(mean_color=(100, 130, 100)))
+
+    def test_size_does_not_matter(self):
+        assert is_near_duplicate(fingerprint(width=1200, height=1800), fingerprint())
+
+
+class TestImageFingerprint:
+    """image_fingerprint on real encodings"""
+
+    def test_reencoded_copy_is_near_duplicate(self):
+        original = image_fingerprint(make_design(quality=95))
+        reencoded = image_fingerprint(make_design(quality=60, image_format="WEBP"))
+        assert sha256_digest(make_design(quality=95)) != sha256_digest(make_design(quality=60, image_format="WEBP"))
+        assert is_near_duplicate(reencoded, original)
+
+    def test_recoloured_design_is_not(self):
+        original = image_fingerprint(make_design())
+        recoloured = image_fingerprint(make_design(background=(20, 120, 200)))
+        assert not is_near_duplicate(recoloured, original)
+
+    def test_size_is_reported_as_displayed(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        buffer = io.BytesIO()
+        Image.new("RGB", (400, 300), "white").save(buffer, "JPEG", exif=exif.tobytes())
+        result = image_fingerprint(buffer.getvalue())
+        assert (result["width"], result["height"]) == (300, 400)
+
+    def test_unreadable_file(self):
+        assert image_fingerprint(b"<svg xmlns='http://www.w3.org/2000/svg'/>") is None
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for AssetIndex queries"""
+
+    def __init__(self):
+        self.docs = []
+
+    @staticmethod
+    def matches(doc, query):
+        for field, expected in query.items():
+            value = doc.get(field)
+            if isinstance(expected, dict):
+                if not set(value or []) & set(expected["$in"]):
+                    return False
+            elif isinstance(value, list):
+                if expected not in value:
+                    return False
+            elif value != expected:
+                return False
+        return True
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def find_one(self, query, projection=None):
+        return next((doc for doc in self.docs if self.matches(doc, query)), None)
+
+    def find(self, query, projection=None):
+        return FakeCursor([doc for doc in self.docs if self.matches(doc, query)])
+
+    async def update_one(self, query, update):
+        doc = await self.find_one(query)
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        doc.update(update.get("$set", {}))
+
+
+class TestAssetIndex:
+    """Only identical bytes are reused; look-alikes are per-owner and advisory"""
+
+    def run(self, scenario):
+        collection = FakeCollection()
+        return asyncio.run(scenario(AssetIndex(collection=lambda: collection))), collection
+
+    def test_exact_match_is_reused(self):
+        async def scenario(index):
+            await index.add("image", "a" * 64, fingerprint(), {"public_id": "images/a"}, owner="user-1")
+            return await index.find("image", "a" * 64)
+
+        asset, collection = self.run(scenario)
+        assert asset == {"public_id": "images/a"}
+        assert collection.docs[0]["uses"] == 2
+
+    def test_look_alike_is_not_an_exact_match(self):
+        async def scenario(index):
+            await index.add("image", "a" * 64, fingerprint(), {"public_id": "images/a"}, owner="user-1")
+            return await index.find("image", "b" * 64)
+
+        assert self.run(scenario)[0] is None
+
+    def test_look_alike_is_scoped_to_the_owner(self):
+        async def scenario(index):
+            await index.add("image", "a" * 64, fingerprint(), {"public_id": "images/a"}, owner="user-1")
+            close = fingerprint(phash="f0c0cef0318c0001")
+            return (
+                await index.find_similar("image", "user-1", close),
+                await index.find_similar("image", "user-2", close),
+            )
+
+        (own, other), collection = self.run(scenario)
+        assert own == {"public_id": "images/a"}
+        assert other is None
+        assert collection.docs[0]["hashes"] == ["a" * 64]
@@ -0,0 +1,141 @@
+"""
+Asset Service Tests for Vivento Platform
+Tests: byte-range parsing, 206/416 responses, .br/.gz negotiation,
+Cache-Control for hashed names, store_asset writes and permissions
+"""
+import gzip
+import os
+import stat
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from asset_service import (
+    ASSET_FILE_MODE,
+    DEFAULT_CACHE_CONTROL,
+    IMMUTABLE_CACHE_CONTROL,
+    AssetStaticFiles,
+    hashed_filename,
+    parse_byte_range,
+    store_asset,
+)
+
+CSS = b"@font-face { font-family: 'Nergiz'; src: url('/api/fonts/files/x.woff2'); }\n" * 50
+HASHED_CSS = hashed_filename(CSS, ".css", prefix="fonts_")
+
+
+@pytest.fixture
+def client(tmp_path):
+    store_asset(tmp_path, HASHED_CSS, CSS)
+    (tmp_path / "photo.jpg").write_bytes(bytes(range(256)) * 4)
+    app = Starlette(routes=[Mount("/files", AssetStaticFiles(directory=str(tmp_path)))])
+    return TestClient(app)
+
+
+class TestParseByteRange:
+    """Single ranges; multi-range and malformed headers fall back to the whole file"""
+
+    @pytest.mark.parametrize("header,expected", [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=0-0", (0, 0)),
+        ("bytes=0-99,200-299", None),
+        ("items=0-99", None),
+        ("bytes=abc", None),
+    ])
+    def test_ranges(self, header, expected):
+        assert parse_byte_range(header, 1000) == expected
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=500-100", "bytes=-0", "bytes=2000-3000"])
+    def test_unsatisfiable(self, header):
+        with pytest.raises(ValueError):
+            parse_byte_range(header, 1000)
+
+
+class TestRangeResponses:
+    """206 partial content, 416 and multi-range fallback"""
+
+    def test_partial_content(self, client):
+        response = client.get("/files/photo.jpg", headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.headers["content-range"] == "bytes 10-19/1024"
+        assert response.content == bytes(range(10, 20))
+
+    def test_suffix_range(self, client):
+        response = client.get("/files/photo.jpg", headers={"Range": "bytes=-4"})
+        assert response.status_code == 206
+        assert response.content == bytes([252, 253, 254, 255])
+
+    def test_unsatisfiable_range(self, client):
+        response = client.get("/files/photo.jpg", headers={"Range": "bytes=5000-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */1024"
+
+    def test_multi_range_serves_whole_file(self, client):
+        response = client.get("/files/photo.jpg", headers={"Range": "bytes=0-1,5-6"})
+        assert response.status_code == 200
+        assert len(response.content) == 1024
+
+    def test_stale_if_range_serves_whole_file(self, client):
+        response = client.get("/files/photo.jpg", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+        assert response.status_code == 200
+
+
+class TestCachingAndEncoding:
+    """Cache-Control by name, precompressed variants by Accept-Encoding"""
+
+    def test_hashed_name_is_immutable(self, client):
+        response = client.get(f"/files/{HASHED_CSS}", headers={"Accept-Encoding": "identity"})
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    def test_plain_name_gets_default_cache(self, client):
+        assert client.get("/files/photo.jpg").headers["cache-control"] == DEFAULT_CACHE_CONTROL
+
+    def test_brotli_preferred(self, client):
+        pytest.importorskip("brotli")
+        response = client.get(f"/files/{HASHED_CSS}", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == CSS
+
+    def test_gzip_variant(self, client, tmp_path):
+        response = client.get(f"/files/{HASHED_CSS}", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress((tmp_path / f"{HASHED_CSS}.gz").read_bytes()) == CSS
+
+    def test_each_encoding_has_its_own_etag(self, client):
+        identity = client.get(f"/files/{HASHED_CSS}", headers={"Accept-Encoding": "identity"})
+        gzipped = client.get(f"/files/{HASHED_CSS}", headers={"Accept-Encoding": "gzip"})
+        assert identity.headers["etag"] != gzipped.headers["etag"]
+        revalidated = client.get(f"/files/{HASHED_CSS}",
+                                 headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]})
+        assert revalidated.status_code == 304
+
+
+class TestStoreAsset:
+    """Content-addressed writes"""
+
+    def test_existing_file_is_kept(self, tmp_path):
+        path = store_asset(tmp_path, "font_0123456789abcdef.woff2", b"first")
+        store_asset(tmp_path, "font_0123456789abcdef.woff2", b"second")
+        assert path.read_bytes() == b"first"
+
+    def test_only_compressible_files_get_variants(self, tmp_path):
+        store_asset(tmp_path, "font_0123456789abcdef.woff2", b"x" * 4096)
+        store_asset(tmp_path, HASHED_CSS, CSS)
+        assert not (tmp_path / "font_0123456789abcdef.woff2.gz").exists()
+        assert (tmp_path / f"{HASHED_CSS}.gz").exists()
+
+    def test_files_are_world_readable(self, tmp_path):
+        store_asset(tmp_path, HASHED_CSS, CSS)
+        for path in tmp_path.iterdir():
+            assert stat.S_IMODE(path.stat().st_mode) == ASSET_FILE_MODE
@@ -0,0 +1,84 @@
+"""
+Response Compression Tests for Vivento Platform
+Tests: Accept-Encoding negotiation, size threshold, passthrough of encoded responses
+"""
+import asyncio
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from compression import CompressionMiddleware, negotiate_encoding, is_compressible
+
+BODY = b'{"elements": [' + b'{"type": "text", "content": "Toy Merasimi"},' * 100 + b'{}]}'
+
+
+def make_app(body: bytes, headers=None):
+    async def app(scope, receive, send):
+        raw = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        raw += [(k.encode(), v.encode()) for k, v in (headers or {}).items()]
+        await send({"type": "http.response.start", "status": 200, "headers": raw})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+def call(app, accept_encoding: str):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=500, brotli_quality=4)(scope, receive, send))
+    headers = {k.decode(): v.decode() for k, v in messages[0]["headers"]}
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return headers, body
+
+
+class TestNegotiation:
+    """Accept-Encoding parsing"""
+
+    def test_prefers_brotli(self):
+        assert negotiate_encoding("gzip, deflate, br") == "br"
+
+    def test_respects_q_values(self):
+        assert negotiate_encoding("br;q=0.1, gzip;q=0.9") == "gzip"
+
+    def test_q_zero_disables(self):
+        assert negotiate_encoding("br;q=0, gzip;q=0") is None
+
+    def test_identity_only(self):
+        assert negotiate_encoding("identity") is None
+        assert negotiate_encoding("") is None
+
+    def test_compressible_types(self):
+        assert is_compressible("application/json")
+        assert is_compressible("text/css; charset=utf-8")
+        assert not is_compressible("image/png")
+        assert not is_compressible("text/event-stream")
+
+
+class TestMiddleware:
+    """CompressionMiddleware behaviour"""
+
+    def test_gzip_roundtrip(self):
+        headers, body = call(make_app(BODY, {"etag": '"abc"'}), "gzip")
+        assert headers["content-encoding"] == "gzip"
+        assert headers["vary"] == "Accept-Encoding"
+        assert headers["etag"] == 'W/"abc"'
+        assert int(headers["content-length"]) == len(body)
+        assert gzip.decompress(body) == BODY
+
+    def test_small_body_not_compressed(self):
+        headers, body = call(make_app(b'{"ok": true}'), "gzip, br")
+        assert "content-encoding" not in headers
+        assert body == b'{"ok": true}'
+
+    def test_already_encoded_passthrough(self):
+        headers, body = call(make_app(BODY, {"content-encoding": "br"}), "gzip")
+        assert headers["content-encoding"] == "br"
+        assert body == BODY
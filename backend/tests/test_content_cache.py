@@ -0,0 +1,97 @@
+"""
+Content Cache Tests for Vivento Platform
+Tests: TTL cache behaviour, ETag matching, conditional GETs on CMS/static pages
+"""
+import pytest
+import requests
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from cache_service import TTLCache, make_etag, etag_matches
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+class TestTTLCache:
+    """In-process cache behaviour"""
+
+    def test_hit_and_miss_counters(self):
+        cache = TTLCache("test", ttl_seconds=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_entries_expire(self):
+        cache = TTLCache("test", ttl_seconds=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+    def test_lru_eviction(self):
+        cache = TTLCache("test", ttl_seconds=60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+    def test_invalidate_where(self):
+        cache = TTLCache("test", ttl_seconds=60)
+        for lang in ("az", "en", "ru"):
+            cache.set(("page", "privacy", lang), lang)
+        cache.set(("page", "terms", "az"), "az")
+        dropped = cache.invalidate_where(lambda key: key[1] == "privacy")
+        assert dropped == 3
+        assert cache.get(("page", "terms", "az")) == "az"
+
+    def test_byte_budget(self):
+        cache = TTLCache("test", ttl_seconds=60, max_bytes=10)
+        cache.set("a", b"x" * 4)
+        cache.set("b", b"x" * 4)
+        cache.set("a", b"x" * 5)
+        cache.set("c", b"x" * 3)
+        assert cache.get("b") is None
+        assert cache.stats()["bytes"] == 8
+        cache.set("huge", b"x" * 11)
+        assert cache.get("huge") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+
+
+class TestETag:
+    """ETag helpers"""
+
+    def test_etag_is_stable(self):
+        assert make_etag(b"body") == make_etag(b"body")
+        assert make_etag(b"body") != make_etag(b"other")
+
+    def test_etag_matching(self):
+        etag = make_etag(b"body")
+        assert etag_matches(etag, etag)
+        assert etag_matches(f"W/{etag}", etag)
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches('"other"', etag)
+
+
+@pytest.mark.skipif(not BASE_URL, reason="REACT_APP_BACKEND_URL not set")
+class TestConditionalPages:
+    """Conditional GETs against the running API"""
+
+    @pytest.mark.parametrize("path", ["/api/cms/about", "/api/pages/privacy?lang=en"])
+    def test_not_modified_on_matching_etag(self, path):
+        response = requests.get(f"{BASE_URL}{path}")
+        assert response.status_code == 200
+        etag = response.headers.get("ETag")
+        assert etag, "ETag header missing"
+
+        response = requests.get(f"{BASE_URL}{path}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        print(f"✅ {path} revalidated with 304")
@@ -0,0 +1,105 @@
+"""
+Remote Fetch Service Tests for Vivento Platform
+Tests: host allowlist, redirect hops re-checked, streamed byte cap
+"""
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fetch_service import FetchRefused, fetch_bytes, host_allowed, url_host
+
+HOSTS = {"res.cloudinary.com", "api.myvivento.com"}
+
+
+def handler(request):
+    if request.url.path == "/photo.jpg":
+        return httpx.Response(200, content=b"jpeg-bytes")
+    if request.url.path == "/moved":
+        return httpx.Response(302, headers={"Location": "https://res.cloudinary.com/photo.jpg"})
+    if request.url.path == "/escape":
+        return httpx.Response(302, headers={"Location": "http://169.254.169.254/latest/meta-data/"})
+    if request.url.path == "/loop":
+        return httpx.Response(302, headers={"Location": "/loop"})
+    if request.url.path == "/big":
+        return httpx.Response(200, content=b"x" * 5000)
+    if request.url.path == "/big-chunked":
+        return httpx.Response(200, stream=ChunkedBody(b"x" * 1000, 5))
+    return httpx.Response(404)
+
+
+class ChunkedBody(httpx.AsyncByteStream):
+    """Body without Content-Length"""
+
+    def __init__(self, chunk, count):
+        self.chunk = chunk
+        self.count = count
+
+    async def __aiter__(self):
+        for _ in range(self.count):
+            yield self.chunk
+
+
+def fetch(url, max_bytes=1024):
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch_bytes(client, url, HOSTS, max_bytes)
+
+    return asyncio.run(scenario())
+
+
+class TestHosts:
+    """Only http(s) URLs on listed hosts"""
+
+    @pytest.mark.parametrize("url,allowed", [
+        ("https://res.cloudinary.com/demo/image/upload/a.jpg", True),
+        ("https://RES.cloudinary.com/a.jpg", True),
+        ("https://res.cloudinary.com.evil.com/a.jpg", False),
+        ("http://127.0.0.1:27017/", False),
+        ("file:///etc/passwd", False),
+        ("not a url", False),
+    ])
+    def test_host_allowed(self, url, allowed):
+        assert host_allowed(url, HOSTS) is allowed
+
+    def test_url_host(self):
+        assert url_host("https://api.myvivento.com:8443/x") == "api.myvivento.com"
+        assert url_host(None) is None
+
+
+class TestFetchBytes:
+    """Redirects and size limits"""
+
+    def test_allowed_host(self):
+        assert fetch("https://res.cloudinary.com/photo.jpg") == b"jpeg-bytes"
+
+    def test_refused_host_is_not_requested(self):
+        with pytest.raises(FetchRefused):
+            fetch("http://localhost:8001/api/metrics")
+
+    def test_redirect_to_allowed_host(self):
+        assert fetch("https://api.myvivento.com/moved") == b"jpeg-bytes"
+
+    def test_redirect_to_other_host_is_refused(self):
+        with pytest.raises(FetchRefused, match="169.254.169.254"):
+            fetch("https://api.myvivento.com/escape")
+
+    def test_redirect_loop(self):
+        with pytest.raises(FetchRefused, match="redirects"):
+            fetch("https://api.myvivento.com/loop")
+
+    def test_declared_length_over_cap(self):
+        with pytest.raises(FetchRefused, match="Too large"):
+            fetch("https://res.cloudinary.com/big")
+
+    def test_streamed_body_stops_at_cap(self):
+        with pytest.raises(FetchRefused, match="Too large"):
+            fetch("https://res.cloudinary.com/big-chunked", max_bytes=2500)
+
+    def test_http_error(self):
+        with pytest.raises(FetchRefused, match="404"):
+            fetch("https://res.cloudinary.com/missing.jpg")
@@ -0,0 +1,144 @@
+"""
+Font Service Tests for Vivento Platform
+Tests: unicode-range parsing, remainder ranges, per-script subset output,
+@font-face CSS (subsets, full-font fallback, legacy fonts, escaping)
+"""
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from font_service import (
+    FONT_SUBSETS,
+    build_font_face_css,
+    parse_unicode_range,
+    process_font,
+    remainder_unicode_range,
+)
+
+
+def make_font(codepoints):
+    """Minimal TrueType font with one square glyph per code point"""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    def square():
+        pen = TTGlyphPen(None)
+        pen.moveTo((0, 0))
+        pen.lineTo((0, 500))
+        pen.lineTo((500, 500))
+        pen.lineTo((500, 0))
+        pen.closePath()
+        return pen.glyph()
+
+    names = [".notdef"] + [f"uni{codepoint:04X}" for codepoint in codepoints]
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({codepoint: f"uni{codepoint:04X}" for codepoint in codepoints})
+    builder.setupGlyf({name: square() for name in names})
+    builder.setupHorizontalMetrics({name: (600, 0) for name in names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Test", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    output = io.BytesIO()
+    builder.save(output)
+    return output.getvalue()
+
+
+class TestUnicodeRanges:
+    """CSS unicode-range syntax"""
+
+    @pytest.mark.parametrize("unicode_range,expected", [
+        ("U+0041", [0x41]),
+        ("U+0041-0043", [0x41, 0x42, 0x43]),
+        ("u+0259, U+018F", [0x259, 0x18F]),
+        ("U+0041, ", [0x41]),
+    ])
+    def test_parse(self, unicode_range, expected):
+        assert parse_unicode_range(unicode_range) == expected
+
+    def test_remainder_is_disjoint_and_complete(self):
+        ranges = list(FONT_SUBSETS.values())
+        remainder = remainder_unicode_range(ranges)
+        covered = set().union(*(parse_unicode_range(r) for r in ranges))
+        rest = set(parse_unicode_range(remainder))
+        assert not covered & rest
+        assert len(covered) + len(rest) == 0x110000
+
+    def test_remainder_of_everything_is_none(self):
+        assert remainder_unicode_range(["U+0-10FFFF"]) is None
+
+
+class TestProcessFont:
+    """Subsets only contain the glyphs of their script"""
+
+    def test_subsets(self):
+        pytest.importorskip("fontTools")
+        pytest.importorskip("brotli")
+        from fontTools.ttLib import TTFont
+
+        # Latin letters, ə and a Cyrillic letter, plus Greek alpha outside every subset
+        font = make_font([0x41, 0x259, 0x416, 0x3B1])
+        result = process_font(font, ".ttf")
+        files = {file["subset"]: file for file in result["files"]}
+
+        assert result["font_format"] == "woff2"
+        assert list(files) == ["full", "latin-az", "cyrillic"]
+        assert files["full"]["unicode_range"] is None
+        cmaps = {name: set(TTFont(io.BytesIO(file["data"])).getBestCmap()) for name, file in files.items()}
+        assert cmaps["full"] == {0x41, 0x259, 0x416, 0x3B1}
+        assert cmaps["latin-az"] == {0x41, 0x259}
+        assert cmaps["cyrillic"] == {0x416}
+
+    def test_script_without_glyphs_is_skipped(self):
+        pytest.importorskip("fontTools")
+        pytest.importorskip("brotli")
+        result = process_font(make_font([0x41, 0x42]), ".ttf")
+        assert [file["subset"] for file in result["files"]] == ["full", "latin-az"]
+
+
+class TestFontFaceCss:
+    """@font-face rules"""
+
+    def subset_font(self, **overrides):
+        font = {
+            "font_family": "Nərgiz",
+            "file_url": "/api/fonts/files/font_abc.woff2",
+            "font_format": "woff2",
+            "files": [
+                {"subset": "full", "url": "/api/fonts/files/font_abc.woff2", "format": "woff2", "unicode_range": None},
+                {"subset": "latin-az", "url": "/api/fonts/files/font_abc_latin-az.woff2", "format": "woff2",
+                 "unicode_range": FONT_SUBSETS["latin-az"]},
+                {"subset": "cyrillic", "url": "/api/fonts/files/font_abc_cyrillic.woff2", "format": "woff2",
+                 "unicode_range": FONT_SUBSETS["cyrillic"]},
+            ],
+        }
+        font.update(overrides)
+        return font
+
+    def test_subsets_and_full_font_remainder(self):
+        css = build_font_face_css([self.subset_font()])
+        rules = css.strip().split("\n\n")
+        assert len(rules) == 3
+        assert "font_abc_latin-az.woff2" in rules[0] and f"unicode-range: {FONT_SUBSETS['latin-az']};" in rules[0]
+        assert "font_abc_cyrillic.woff2" in rules[1]
+        assert "url('/api/fonts/files/font_abc.woff2')" in rules[2]
+        assert f"unicode-range: {remainder_unicode_range(list(FONT_SUBSETS.values()))};" in rules[2]
+        assert all("font-family: 'Nərgiz';" in rule for rule in rules)
+
+    def test_legacy_font_single_rule(self):
+        css = build_font_face_css([{"name": "Old", "file_url": "/api/uploads/font_1.ttf", "font_format": "truetype"}])
+        assert css.count("@font-face") == 1
+        assert "format('truetype')" in css
+        assert "unicode-range" not in css
+
+    def test_family_is_escaped(self):
+        css = build_font_face_css([self.subset_font(font_family="x'; } body { color: red; } \\")])
+        assert "font-family: 'x\\'; } body { color: red; } \\\\';" in css
+
+    def test_fonts_without_family_or_url_are_skipped(self):
+        assert build_font_face_css([{"file_url": "/x.ttf"}, {"name": "NoUrl"}]) == ""
@@ -0,0 +1,158 @@
+"""
+Image Service Tests for Vivento Platform
+Tests: thumbnail width buckets, formats, placeholders, srcset strings,
+upload photo pre-processing, source fetch restrictions, worker pool recovery
+"""
+import asyncio
+import base64
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fetch_service import FetchRefused
+from concurrent.futures.process import BrokenProcessPool
+
+from image_service import ImageProcessor, build_thumbnails, build_srcset, fetch_image, preprocess_photo, thumbnail_filename
+
+pytest.importorskip("PIL")
+from PIL import Image
+
+
+def make_image(width, height, mode="RGB", color="#be185d"):
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class TestBuildThumbnails:
+    """build_thumbnails output"""
+
+    def test_widths_are_never_upscaled(self):
+        built = build_thumbnails(make_image(500, 750), [160, 320, 480, 640], ["webp"])
+        assert [file["width"] for file in built["files"]] == [160, 320, 480]
+        assert built["files"][0]["height"] == 240
+
+    def test_small_source_keeps_its_own_width(self):
+        built = build_thumbnails(make_image(100, 100), [160, 320], ["webp"])
+        assert [file["width"] for file in built["files"]] == [100]
+
+    def test_each_format_is_encoded(self):
+        built = build_thumbnails(make_image(400, 600), [160], ["webp", "jpg"])
+        formats = {Image.open(io.BytesIO(file["data"])).format for file in built["files"]}
+        assert formats == {"WEBP", "JPEG"}
+
+    def test_lqip_is_tiny_data_uri(self):
+        built = build_thumbnails(make_image(400, 600, "RGBA", (0, 0, 0, 0)), [160], ["webp"])
+        assert built["lqip"].startswith("data:image/webp;base64,")
+        lqip = Image.open(io.BytesIO(base64.b64decode(built["lqip"].split(",", 1)[1])))
+        assert lqip.size == (24, 36)
+        assert len(built["lqip"]) < 1000
+        # Transparent sources are flattened onto white
+        assert lqip.convert("RGB").getpixel((12, 18))[0] > 240
+
+
+def make_phone_photo(width, height, orientation=6):
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = "PhoneMaker"
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "#be185d").save(buffer, "JPEG", quality=95, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class TestPreprocessPhoto:
+    """preprocess_photo output"""
+
+    def test_orientation_applied_and_metadata_stripped(self):
+        processed = preprocess_photo(make_phone_photo(400, 300), max_dimension=1000)
+        image = Image.open(io.BytesIO(processed["data"]))
+        assert image.size == (300, 400)
+        assert not dict(image.getexif())
+
+    def test_longest_side_is_capped(self):
+        processed = preprocess_photo(make_phone_photo(3000, 1500, orientation=1), max_dimension=1200)
+        assert (processed["width"], processed["height"]) == (1200, 600)
+        assert processed["bytes"] < processed["original_bytes"]
+
+    def test_jpeg_target(self):
+        processed = preprocess_photo(make_phone_photo(400, 300), image_format="jpeg")
+        assert processed["content_type"] == "image/jpeg"
+        assert Image.open(io.BytesIO(processed["data"])).format == "JPEG"
+
+    def test_transparent_images_stay_webp(self):
+        processed = preprocess_photo(make_image(50, 50, "RGBA", (0, 0, 0, 0)), image_format="jpeg")
+        assert processed["format"] == "webp"
+        assert Image.open(io.BytesIO(processed["data"])).mode == "RGBA"
+
+    def test_unreadable_and_animated_files_are_left_alone(self):
+        assert preprocess_photo(b"<svg xmlns='http://www.w3.org/2000/svg'/>") is None
+        frames = [Image.new("RGB", (10, 10), color) for color in ("red", "blue")]
+        buffer = io.BytesIO()
+        frames[0].save(buffer, "GIF", save_all=True, append_images=frames[1:])
+        assert preprocess_photo(buffer.getvalue()) is None
+
+
+class TestSrcset:
+    """srcset helpers"""
+
+    def test_srcset_string(self):
+        assert build_srcset([{"url": "/a.webp", "width": 160}, {"url": "/b.webp", "width": 320}]) == "/a.webp 160w, /b.webp 320w"
+
+    def test_filenames_are_content_addressed(self):
+        assert thumbnail_filename("0123456789abcdef", 320, "avif") == "thumb_0123456789abcdef_320.avif"
+
+
+class TestFetchImage:
+    """Thumbnail sources: local files from disk, remote ones from allowed hosts only"""
+
+    def test_local_file(self, tmp_path):
+        (tmp_path / "a.png").write_bytes(b"png")
+        assert asyncio.run(fetch_image("/api/uploads/a.png", lambda url: tmp_path / "a.png")) == b"png"
+
+    @pytest.mark.parametrize("url", ["http://127.0.0.1:8001/api/metrics", "http://169.254.169.254/latest/", "ftp://x/a.png"])
+    def test_other_hosts_are_refused(self, url):
+        with pytest.raises(FetchRefused):
+            asyncio.run(fetch_image(url, lambda url: None, allowed_hosts={"res.cloudinary.com"}))
+
+
+def exit_once(marker):
+    """Worker job that kills its process the first time (like an OOM kill)"""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return "done"
+
+
+def always_exit():
+    os._exit(1)
+
+
+class TestImageProcessor:
+    """A dead worker process does not break the pool for good"""
+
+    def test_job_is_retried_in_a_new_pool(self, tmp_path):
+        async def scenario():
+            processor = ImageProcessor(max_workers=1)
+            try:
+                return await processor.run(exit_once, str(tmp_path / "died"))
+            finally:
+                processor.shutdown()
+
+        assert asyncio.run(scenario()) == "done"
+
+    def test_only_the_failing_job_fails(self, tmp_path):
+        async def scenario():
+            processor = ImageProcessor(max_workers=1)
+            try:
+                with pytest.raises(BrokenProcessPool):
+                    await processor.run(always_exit)
+                return await processor.run(exit_once, str(tmp_path / "died-before"))
+            finally:
+                processor.shutdown()
+
+        (tmp_path / "died-before").touch()
+        assert asyncio.run(scenario()) == "done"
@@ -0,0 +1,199 @@
+"""
+Invalidation Bus Tests for Vivento Platform
+Tests: local + broadcast eviction, polling fallback, change stream delivery,
+keyed cache_service evictions, staleness flush
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from cache_service import get_cache
+from invalidation_bus import InvalidationBus
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs = sorted(self.docs, key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    async def to_list(self, length):
+        return list(self.docs)
+
+
+class FakeCollection:
+    """Standalone server: inserts and _id range queries, no change streams"""
+
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(dict(doc))
+
+    def find(self, query):
+        since = query["_id"]["$gte"]
+        return FakeCursor([doc for doc in self.docs if doc["_id"] >= since])
+
+    def watch(self, pipeline, **kwargs):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+
+class FakeChangeStream:
+    def __init__(self):
+        self.changes = []
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def try_next(self):
+        if self.changes:
+            document = self.changes.pop(0)
+            self.resume_token = {"_data": str(document["_id"])}
+            return {"operationType": "insert", "fullDocument": document}
+        await asyncio.sleep(0.01)
+        return None
+
+
+class FakeReplicaSetCollection(FakeCollection):
+    """Replica set: inserts are pushed to every open change stream"""
+
+    def __init__(self):
+        super().__init__()
+        self.streams = []
+
+    async def insert_one(self, doc):
+        await super().insert_one(doc)
+        for stream in self.streams:
+            stream.changes.append(dict(doc))
+
+    def watch(self, pipeline, **kwargs):
+        stream = FakeChangeStream()
+        self.streams.append(stream)
+        return stream
+
+
+class BrokenCollection(FakeCollection):
+    def find(self, query):
+        raise ConnectionError("no primary")
+
+
+async def settle(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition() and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+class TestPublishing:
+    """Local eviction and the broadcast message"""
+
+    def test_publish_evicts_locally_and_inserts(self):
+        async def scenario():
+            collection = FakeCollection()
+            bus = InvalidationBus(poll_interval=0.01)
+            seen = []
+            bus.subscribe("pages", seen.append)
+            bus.start(collection)
+            bus.publish("pages", "privacy")
+            await bus.stop()
+            return seen, collection.docs, bus.worker_id
+
+        seen, docs, worker_id = asyncio.run(scenario())
+        assert seen == ["privacy"]
+        assert len(docs) == 1
+        assert docs[0]["topic"] == "pages" and docs[0]["key"] == "privacy" and docs[0]["origin"] == worker_id
+
+    def test_publish_before_start_is_local_only(self):
+        bus = InvalidationBus()
+        seen = []
+        bus.subscribe("blog", seen.append)
+        bus.publish("blog")
+        assert seen == [None]
+
+
+class TestDelivery:
+    """Other workers apply the message once; the publisher does not re-apply it"""
+
+    def run_two_workers(self, collection):
+        async def scenario():
+            first, second = InvalidationBus(poll_interval=0.01), InvalidationBus(poll_interval=0.01)
+            first_seen, second_seen = [], []
+            first.subscribe("templates", first_seen.append)
+            second.subscribe("templates", second_seen.append)
+            first.start(collection)
+            second.start(collection)
+            await asyncio.sleep(0.05)
+
+            first.publish("templates")
+            await settle(lambda: second_seen)
+            await asyncio.sleep(0.05)
+            modes = (first.mode, second.mode)
+            await first.stop()
+            await second.stop()
+            return first_seen, second_seen, modes
+
+        return asyncio.run(scenario())
+
+    def test_polling_fallback_on_standalone(self):
+        first_seen, second_seen, modes = self.run_two_workers(FakeCollection())
+        assert modes == ("polling", "polling")
+        assert first_seen == [None]
+        assert second_seen == [None]
+
+    def test_change_stream_on_replica_set(self):
+        first_seen, second_seen, modes = self.run_two_workers(FakeReplicaSetCollection())
+        assert modes == ("change_stream", "change_stream")
+        assert first_seen == [None]
+        assert second_seen == [None]
+
+    def test_keyed_cache_eviction_survives_bson_round_trip(self):
+        cache = get_cache("test-bus-previews", ttl_seconds=60)
+        cache.set(("event", "e1"), "preview-1")
+        cache.set(("event", "e2"), "preview-2")
+        bus = InvalidationBus()
+        # As stored by MongoDB: tuples come back as arrays
+        bus._deliver({"topic": "cache", "key": {"cache": "test-bus-previews", "key": ["event", "e1"]}, "origin": "other"})
+        assert cache.get(("event", "e1")) is None
+        assert cache.get(("event", "e2")) == "preview-2"
+
+
+class TestStaleness:
+    """A worker that cannot read the bus flushes instead of serving stale entries"""
+
+    def test_flush_when_bus_unreachable(self):
+        async def scenario():
+            bus = InvalidationBus(poll_interval=0.02, max_staleness=0.1)
+            seen = []
+            bus.subscribe("pages", seen.append)
+            bus.start(BrokenCollection())
+            await settle(lambda: seen)
+            await bus.stop()
+            return seen
+
+        assert asyncio.run(scenario())[:1] == [None]
+
+    def test_no_flush_while_caught_up(self):
+        async def scenario():
+            bus = InvalidationBus(poll_interval=0.02, max_staleness=0.1)
+            seen = []
+            bus.subscribe("pages", seen.append)
+            bus.start(FakeCollection())
+            await asyncio.sleep(0.3)
+            staleness = bus.staleness()
+            await bus.stop()
+            return seen, staleness
+
+        seen, staleness = asyncio.run(scenario())
+        assert seen == []
+        assert staleness < 0.1
@@ -0,0 +1,118 @@
+"""
+Lazy Router Tests for Vivento Platform
+Tests: prefix matching, every feature route is reachable through its
+declared prefixes, loading on first request and for /openapi.json,
+HTTP/SDK clients kept out of module imports
+"""
+import asyncio
+import importlib
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "vivento_test")
+
+from fastapi import FastAPI
+
+import server
+from lazy_routers import LazyRouterMiddleware, LazyRouters, compile_prefix
+
+
+def serve(middleware, path):
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+    asyncio.run(middleware(scope, receive, send))
+
+
+class TestPrefixes:
+    """Prefix patterns match whole segments"""
+
+    def test_prefix_covers_subpaths(self):
+        pattern = compile_prefix("/api/blog")
+        assert pattern.match("/api/blog")
+        assert pattern.match("/api/blog/summaries")
+        assert not pattern.match("/api/blogger")
+
+    def test_parameter_matches_one_segment(self):
+        pattern = compile_prefix("/api/events/{event_id}/gallery")
+        assert pattern.match("/api/events/e1/gallery/p1")
+        assert not pattern.match("/api/events/e1/render")
+        assert not pattern.match("/api/events/e1/x/gallery")
+
+
+class TestFeatureRouters:
+    """The registrations in server.py cover every route a router defines"""
+
+    def test_every_route_matches_its_router_prefixes(self):
+        routers = server.feature_routers
+        for name in routers.names():
+            module = importlib.import_module(f"routers.{name}")
+            for route in module.router.routes:
+                path = routers.prefix + route.path
+                assert name in routers.pending(path) or name in routers.loaded, f"{path} not under {name} prefixes"
+
+    def test_core_routes_load_nothing(self):
+        routers = LazyRouters(FastAPI())
+        for name in server.feature_routers.names():
+            routers.register(name, *server.feature_routers.prefixes(name))
+        assert routers.pending("/api/templates/browse") == []
+        assert routers.pending("/api/upload/image") == []
+
+
+class TestLoading:
+    """Routers are mounted on demand, once"""
+
+    def test_first_request_mounts_router(self):
+        app = FastAPI()
+        routers = LazyRouters(app)
+        routers.register("gallery", "/events/{event_id}/gallery", "/cleanup/expired-gallery")
+        routers.register("auth", "/auth")
+        seen = []
+
+        async def inner(scope, receive, send):
+            seen.append(scope["path"])
+
+        middleware = LazyRouterMiddleware(inner, routers)
+        serve(middleware, "/api/events/e1/gallery")
+        serve(middleware, "/api/events/e2/gallery")
+
+        assert list(routers.loaded) == ["gallery"]
+        paths = [route.path for route in app.routes]
+        assert "/api/events/{event_id}/gallery" in paths
+        assert paths.count("/api/cleanup/expired-gallery") == 1
+        assert seen == ["/api/events/e1/gallery", "/api/events/e2/gallery"]
+
+    def test_openapi_loads_everything(self):
+        app = FastAPI()
+        routers = LazyRouters(app)
+        routers.register("gallery", "/events/{event_id}/gallery")
+        routers.register("admin", "/admin/templates")
+
+        async def inner(scope, receive, send):
+            pass
+
+        serve(LazyRouterMiddleware(inner, routers), app.openapi_url)
+        assert set(routers.loaded) == {"gallery", "admin"}
+        assert "/api/admin/templates" in app.openapi()["paths"]
+
+
+class TestBootImports:
+    """Image and render modules import httpx only when they fetch"""
+
+    def test_image_modules_do_not_import_httpx(self):
+        probe = (
+            "import sys, render_service, image_service, fetch_service; "
+            "print(sorted(name for name in ('httpx', 'PIL', 'fontTools') if name in sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", probe], cwd=os.path.join(os.path.dirname(__file__), ".."),
+            capture_output=True, text=True, check=True
+        ).stdout
+        assert output.strip() == "[]"
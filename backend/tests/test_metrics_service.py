@@ -0,0 +1,136 @@
+"""
+Metrics Service Tests for Vivento Platform
+Tests: Prometheus text rendering, histogram buckets, route template labels,
+MongoDB command listener, scrape authorization
+"""
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi import FastAPI
+
+from metrics_service import (
+    MetricsMiddleware,
+    MetricsRegistry,
+    MongoCommandMetrics,
+    http_requests,
+    mongo_duration,
+    mongo_failures,
+    scrape_authorized,
+    track_external,
+    external_duration,
+)
+
+
+class TestRendering:
+    """Prometheus text format"""
+
+    def test_counter_and_gauge_lines(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs run", ("queue",))
+        counter.inc("emails")
+        counter.inc("emails", amount=2)
+        registry.gauge("workers", "Busy workers").set(3)
+
+        text = registry.render()
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{queue="emails"} 3' in text
+        assert "workers 3" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value, "/a")
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1"} 3' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+        assert 'latency_seconds_count{route="/a"} 4' in text
+        assert 'latency_seconds_sum{route="/a"} 4.05' in text
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("odd_total", "Odd labels", ("value",)).inc('say "hi"\n')
+        assert 'odd_total{value="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+class TestMiddleware:
+    """Per-route template labels"""
+
+    def test_route_template_and_unmatched(self):
+        app = FastAPI()
+
+        @app.get("/api/items/{item_id}")
+        async def get_item(item_id: str):
+            return {"id": item_id}
+
+        wrapped = MetricsMiddleware(app)
+
+        async def call(path):
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                messages.append(message)
+
+            scope = {"type": "http", "method": "GET", "path": path, "raw_path": path.encode(),
+                     "query_string": b"", "headers": [], "root_path": "", "scheme": "http",
+                     "server": ("test", 80), "http_version": "1.1"}
+            await wrapped(scope, receive, send)
+
+        before = http_requests.value("GET", "/api/items/{item_id}", "200")
+        unmatched = http_requests.value("GET", "<unmatched>", "404")
+        asyncio.run(call("/api/items/1"))
+        asyncio.run(call("/api/items/2"))
+        asyncio.run(call("/nope"))
+        assert http_requests.value("GET", "/api/items/{item_id}", "200") == before + 2
+        assert http_requests.value("GET", "<unmatched>", "404") == unmatched + 1
+
+
+class TestExternalAndMongo:
+    """External call timing and the pymongo command listener"""
+
+    def test_track_external_records_errors(self):
+        before = external_duration.count("resend", "test_send", "error")
+        try:
+            with track_external("resend", "test_send"):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+        assert external_duration.count("resend", "test_send", "error") == before + 1
+
+    def test_listener_records_collection_and_command(self):
+        listener = MongoCommandMetrics()
+        started = SimpleNamespace(request_id=1, connection_id=("db", 27017), command_name="find",
+                                  command={"find": "test_templates", "filter": {}})
+        before = mongo_duration.count("<background>", "test_templates", "find")
+        listener.started(started)
+        listener.succeeded(SimpleNamespace(request_id=1, connection_id=("db", 27017), duration_micros=1500))
+        listener.started(SimpleNamespace(**{**vars(started), "request_id": 2}))
+        listener.failed(SimpleNamespace(request_id=2, connection_id=("db", 27017), duration_micros=900))
+
+        assert mongo_duration.count("<background>", "test_templates", "find") == before + 2
+        assert mongo_failures.value("<background>", "test_templates", "find") >= 1
+        assert not listener._pending
+
+
+class TestScrapeAuthorization:
+    """The scrape endpoint fails closed"""
+
+    def test_no_token_configured_refuses_everyone(self):
+        assert not scrape_authorized(None, None)
+        assert not scrape_authorized("Bearer ", "")
+        assert not scrape_authorized("Bearer anything", None)
+
+    def test_bearer_token(self):
+        assert scrape_authorized("Bearer s3cret", "s3cret")
+        assert not scrape_authorized("Bearer wrong", "s3cret")
+        assert not scrape_authorized("s3cret", "s3cret")
+        assert not scrape_authorized(None, "s3cret")
@@ -0,0 +1,150 @@
+"""
+Render Service Tests for Vivento Platform
+Tests: design rendering sizes/formats, width buckets, content addressing,
+remote image hosts, pruning of old renders, limits on hostile designs
+"""
+import asyncio
+import io
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from render_service import (
+    MAX_ASPECT_RATIO,
+    RenderService,
+    bucket_width,
+    canvas_settings,
+    canvas_size,
+    design_hash,
+    image_sources,
+    render_design,
+)
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image
+
+DESIGN = {
+    "canvasSize": {"width": 400, "height": 600, "background": "#fdf2f8"},
+    "elements": [
+        {"id": "title", "type": "text", "content": "Toy Mərasimi", "x": 50, "y": 80, "width": 300,
+         "height": 60, "fontSize": 32, "fontFamily": "Inter", "color": "#be185d", "fontWeight": "bold"},
+        {"id": "photo", "type": "image", "src": "https://example.com/missing.jpg",
+         "x": 50, "y": 300, "width": 300, "height": 200},
+    ],
+}
+
+
+class TestRenderDesign:
+    """render_design output"""
+
+    def test_renders_each_width_with_canvas_aspect(self):
+        outputs = render_design(DESIGN, [400, 800], "png", images={}, font_paths={})
+        for width, data in outputs.items():
+            image = Image.open(io.BytesIO(data))
+            assert image.format == "PNG"
+            assert image.size == (width, width * 3 // 2)
+
+    def test_webp_output(self):
+        outputs = render_design(DESIGN, [400], "webp", images={}, font_paths={})
+        assert Image.open(io.BytesIO(outputs[400])).format == "WEBP"
+
+    def test_background_and_text_are_drawn(self):
+        image = Image.open(io.BytesIO(render_design(DESIGN, [400], "png", images={}, font_paths={})[400])).convert("RGB")
+        assert image.getpixel((5, 5)) == (253, 242, 248)
+        title_area = image.crop((50, 80, 350, 140))
+        assert (190, 24, 93) in {color for _, color in title_area.getcolors(maxcolors=100000)}
+
+    def test_embedded_image_is_placed(self):
+        red = io.BytesIO()
+        Image.new("RGB", (30, 20), "#ff0000").save(red, "PNG")
+        outputs = render_design(DESIGN, [400], "png", images={"https://example.com/missing.jpg": red.getvalue()}, font_paths={})
+        image = Image.open(io.BytesIO(outputs[400])).convert("RGB")
+        assert image.getpixel((200, 400)) == (255, 0, 0)
+
+
+class TestDesignLimits:
+    """Out-of-range design values are clamped instead of exhausting the worker"""
+
+    @pytest.mark.parametrize("canvas,expected", [
+        ({"width": 1, "height": 100000}, (1, 3)),
+        ({"width": 100000, "height": 10}, (4000, 1334)),
+        ({"width": "inf", "height": "nan"}, (400, 600)),
+        ({"width": -5, "height": 0}, (1, 1)),
+    ])
+    def test_canvas_size(self, canvas, expected):
+        assert canvas_size({"canvasSize": canvas}) == expected
+
+    def test_tall_canvas_renders_at_max_aspect(self):
+        outputs = render_design({"canvasSize": {"width": 1, "height": 100000}}, [1200], "png", images={}, font_paths={})
+        assert Image.open(io.BytesIO(outputs[1200])).size == (1200, 1200 * MAX_ASPECT_RATIO)
+
+    def test_huge_text_and_image_values(self):
+        red = io.BytesIO()
+        Image.new("RGB", (30, 20), "#ff0000").save(red, "PNG")
+        design = {
+            "canvasSize": {"width": 400, "height": 600},
+            "elements": [
+                {"type": "text", "content": "Toy", "fontSize": 1e9, "width": 1e12, "x": 1e300, "lineHeight": 1e6},
+                {"type": "image", "src": "red", "width": 1e9, "height": 1e9, "borderRadius": 1e9, "x": "-inf"},
+            ],
+        }
+        outputs = render_design(design, [800], "png", images={"red": red.getvalue()}, font_paths={})
+        assert Image.open(io.BytesIO(outputs[800])).size == (800, 1200)
+
+
+class TestRenderHelpers:
+    """Cache keys and inputs"""
+
+    def test_width_buckets(self):
+        assert bucket_width(120) == 400
+        assert bucket_width(401) == 800
+        assert bucket_width(5000) == 1200
+        assert bucket_width(None) == 800
+
+    def test_hash_depends_on_design_and_fonts(self):
+        assert design_hash(DESIGN, {}) == design_hash(dict(DESIGN), {})
+        assert design_hash(DESIGN, {}) != design_hash(DESIGN, {"Inter": "/fonts/font_abc.woff2"})
+
+    def test_seeded_template_canvas_key(self):
+        assert canvas_settings({"canvas": {"width": 500}})["width"] == 500
+        assert image_sources(DESIGN) == ["https://example.com/missing.jpg"]
+
+
+async def no_fonts(families):
+    return {}
+
+
+def make_service(tmp_path, **options):
+    return RenderService(tmp_path / "renders", "/api/uploads/renders", no_fonts, lambda url: None, **options)
+
+
+class TestRenderService:
+    """Remote images and the render directory"""
+
+    def test_images_from_other_hosts_are_not_fetched(self, tmp_path):
+        service = make_service(tmp_path, allowed_hosts={"res.cloudinary.com"})
+        sources = ["http://127.0.0.1:8001/api/metrics", "file:///etc/passwd"]
+        assert asyncio.run(service._load_images(sources)) == {}
+
+    def test_prune_keeps_most_recently_used(self, tmp_path):
+        service = make_service(tmp_path, max_output_bytes=250)
+        now = time.time()
+        for age, name in enumerate(["render_a_400.png", "render_b_400.png", "render_c_400.png"]):
+            path = service.output_dir / name
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (now - age * 3600, now - age * 3600))
+        assert service.prune() == 100
+        assert sorted(path.name for path in service.output_dir.iterdir()) == ["render_a_400.png", "render_b_400.png"]
+
+    def test_reuse_refreshes_old_renders(self, tmp_path):
+        service = make_service(tmp_path)
+        path = service.output_dir / "render_a_400.png"
+        path.write_bytes(b"x")
+        os.utime(path, (0, 0))
+        assert service._reuse(path)
+        assert path.stat().st_mtime > time.time() - 60
+        assert not service._reuse(service.output_dir / "render_missing_400.png")
@@ -0,0 +1,90 @@
+"""
+Search Service Tests for Vivento Platform
+Tests: Azerbaijani normalization, ranking, prefix matching, /api/search endpoint
+"""
+import pytest
+import requests
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from search_service import normalize_text, tokenize, build_index
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+TEMPLATES = [
+    {"id": "t1", "name": "Qızıl Nişan", "category": "wedding", "parent_category": "toy", "sub_category": "nisan"},
+    {"id": "t2", "name": "Şirin Ad Günü", "category": "birthday", "parent_category": "dogum-gunu", "sub_category": "ad-gunu-devetname"},
+    {"id": "t3", "name": "Klassik Toy", "category": "wedding", "parent_category": "toy", "sub_category": "toy-devetname"},
+]
+
+POSTS = [
+    {"id": "b1", "slug": "toy-meslehetleri", "title": "Toy dəvətnaməsi necə seçilir",
+     "excerpt": "Məsləhətlər", "content": "<p>Gözəl <b>dəvətnamə</b> seçimi</p>", "tags": ["toy"]},
+]
+
+
+class TestNormalization:
+    """Azerbaijani-aware folding"""
+
+    def test_azerbaijani_letters_are_folded(self):
+        assert normalize_text("Əli Şəki Çörək Ğ Ö Ü ı") == "eli seki corek g o u i"
+
+    def test_dotted_capital_i(self):
+        assert normalize_text("İSMAYIL") == "ismayil"
+
+    def test_tokenize_splits_slugs(self):
+        assert tokenize("toy-devetname") == ["toy", "devetname"]
+
+
+class TestSearchIndex:
+    """Ranking and matching"""
+
+    def setup_method(self):
+        self.index = build_index(TEMPLATES, POSTS)
+
+    def test_ascii_query_matches_accented_name(self):
+        results = self.index.search("nisan")
+        assert results[0]["id"] == "t1"
+
+    def test_all_terms_must_match(self):
+        results = self.index.search("sirin gunu")
+        assert [result["id"] for result in results] == ["t2"]
+
+    def test_prefix_matching(self):
+        results = self.index.search("klas")
+        assert results[0]["id"] == "t3"
+
+    def test_kind_filter(self):
+        results = self.index.search("toy", kinds=["blog"])
+        assert [result["id"] for result in results] == ["b1"]
+
+    def test_kind_filter_applies_before_fallback(self):
+        # Only the blog post has both terms; templates still match "devetname"
+        assert [result["id"] for result in self.index.search("devetname nece")] == ["b1"]
+        results = self.index.search("devetname nece", kinds=["template"])
+        assert {result["id"] for result in results} == {"t2", "t3"}
+
+    def test_html_is_not_indexed(self):
+        assert self.index.search("b", kinds=["blog"]) == []
+
+    def test_empty_query(self):
+        assert self.index.search("  ") == []
+
+
+@pytest.mark.skipif(not BASE_URL, reason="REACT_APP_BACKEND_URL not set")
+class TestSearchEndpoint:
+    """/api/search against the running API"""
+
+    def test_search_returns_results_shape(self):
+        response = requests.get(f"{BASE_URL}/api/search", params={"q": "toy"})
+        assert response.status_code == 200
+        data = response.json()
+        assert "results" in data
+        assert data["count"] == len(data["results"])
+        print(f"✅ Search returned {data['count']} results")
+
+    def test_invalid_type_rejected(self):
+        response = requests.get(f"{BASE_URL}/api/search", params={"q": "toy", "type": "users"})
+        assert response.status_code == 400
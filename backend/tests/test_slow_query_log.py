@@ -0,0 +1,113 @@
+"""
+Slow Query Log Tests for Vivento Platform
+Tests: filter shapes, COLLSCAN detection, threshold logging with route tags,
+sampled explain()
+"""
+import logging
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from metrics_service import current_scope
+from slow_query_log import SlowQueryLog, command_shape, find_collscans, query_shape, slow_commands
+
+
+class FakeExplainClient:
+    """Answers explain commands with a canned plan"""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.commands = []
+
+    def __getitem__(self, database):
+        return self
+
+    def command(self, command):
+        self.commands.append(command)
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+
+def run_command(listener, command_name, command, duration_ms, request_id=1):
+    started = SimpleNamespace(request_id=request_id, connection_id=("db", 27017), command_name=command_name,
+                              database_name="vivento", command=command)
+    listener.started(started)
+    listener.succeeded(SimpleNamespace(request_id=request_id, connection_id=("db", 27017), duration_micros=duration_ms * 1000))
+
+
+class TestShapes:
+    """Values are dropped, structure is kept"""
+
+    def test_filter_values_become_placeholders(self):
+        shape = query_shape({"event_id": "evt-1", "status": {"$in": ["attending", "pending"]}, "email": "a@b.az"})
+        assert shape == {"event_id": "?", "status": {"$in": ["?"]}, "email": "?"}
+
+    def test_find_keeps_sort_and_projection(self):
+        shape = command_shape("find", {"find": "guests", "filter": {"event_id": "x"}, "sort": {"created_at": -1},
+                                       "projection": {"_id": 0}, "lsid": {"id": "session"}})
+        assert shape == {"filter": {"event_id": "?"}, "sort": {"created_at": -1}, "projection": {"_id": 0}}
+
+    def test_pipeline_keeps_field_references(self):
+        pipeline = [{"$match": {"user_id": "u1"}}, {"$group": {"_id": "$event_id", "total": {"$sum": 1}}},
+                    {"$lookup": {"from": "events", "localField": "_id", "foreignField": "id", "as": "event"}}]
+        shape = command_shape("aggregate", {"aggregate": "guests", "pipeline": pipeline})
+        assert shape["pipeline"][0] == {"$match": {"user_id": "?"}}
+        assert shape["pipeline"][1] == {"$group": {"_id": "$event_id", "total": {"$sum": "?"}}}
+        assert shape["pipeline"][2]["$lookup"]["from"] == "events"
+
+    def test_update_statements(self):
+        shape = command_shape("update", {"update": "events", "updates": [{"q": {"id": "e1"}, "u": {"$set": {"name": "x"}}}]})
+        assert shape == {"updates": [{"q": {"id": "?"}}]}
+
+    def test_collscan_detection(self):
+        assert find_collscans({"stage": "LIMIT", "inputStage": {"stage": "COLLSCAN"}})
+        assert find_collscans({"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]})
+        assert not find_collscans({"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}})
+
+
+class TestSlowQueryLog:
+    """Threshold logging and sampled explain()"""
+
+    def test_logs_only_slow_commands_with_route(self, caplog):
+        listener = SlowQueryLog(threshold_ms=100)
+        route = SimpleNamespace(path="/api/events/{event_id}/guests")
+        token = current_scope.set({"route": route})
+        try:
+            before = slow_commands.value("/api/events/{event_id}/guests", "guests", "find")
+            with caplog.at_level(logging.WARNING, logger="slow_query_log"):
+                run_command(listener, "find", {"find": "guests", "filter": {"event_id": "e1"}}, 20, request_id=1)
+                run_command(listener, "find", {"find": "guests", "filter": {"event_id": "e1"}}, 350, request_id=2)
+        finally:
+            current_scope.reset(token)
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert len(messages) == 1
+        assert "350.0 ms" in messages[0] and "/api/events/{event_id}/guests" in messages[0]
+        assert '{"filter":{"event_id":"?"}}' in messages[0] and "e1" not in messages[0]
+        assert slow_commands.value("/api/events/{event_id}/guests", "guests", "find") == before + 1
+        assert not listener._pending
+
+    def test_explain_runs_once_per_shape(self):
+        client = FakeExplainClient({"stage": "COLLSCAN"})
+        listener = SlowQueryLog(threshold_ms=10, explain_rate=1.0, explain_client=lambda: client)
+        run_command(listener, "find", {"find": "guests", "filter": {"name": "A"}, "lsid": {"id": 1}}, 50, request_id=1)
+        run_command(listener, "find", {"find": "guests", "filter": {"name": "B"}}, 50, request_id=2)
+        assert len(listener.explained_shapes()) == 1
+
+        deadline = time.monotonic() + 5
+        while not client.commands and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(client.commands) == 1
+        assert "lsid" not in client.commands[0]["explain"]
+        assert client.commands[0]["verbosity"] == "queryPlanner"
+
+    def test_explain_result(self, caplog):
+        listener = SlowQueryLog(explain_rate=1.0, explain_client=lambda: FakeExplainClient({"stage": "COLLSCAN"}))
+        with caplog.at_level(logging.WARNING, logger="slow_query_log"):
+            assert listener.explain("/api/x", "guests", "find", "vivento", {"find": "guests"}, {}) is True
+        assert "COLLSCAN" in caplog.text
+
+        indexed = SlowQueryLog(explain_rate=1.0, explain_client=lambda: FakeExplainClient({"stage": "IXSCAN"}))
+        assert indexed.explain("/api/x", "guests", "find", "vivento", {"find": "guests"}, {}) is False
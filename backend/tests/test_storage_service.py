@@ -0,0 +1,289 @@
+"""
+Storage Service Tests for Vivento Platform
+Tests: driver selection, key handling, local driver round trip, S3 requests,
+signed direct uploads
+"""
+import asyncio
+import io
+import os
+import stat
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from asset_service import ASSET_FILE_MODE, IMMUTABLE_CACHE_CONTROL
+from storage_service import (
+    DIRECT_UPLOAD_TYPES,
+    CloudinaryStorage,
+    LocalStorage,
+    S3Storage,
+    StorageBackend,
+    cloudinary_sdk,
+    create_storage,
+)
+
+pytest.importorskip("PIL")
+from PIL import Image
+
+
+def make_png(width=40, height=30):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "#be185d").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+async def chunks(data, size=1000):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+class RecordingS3Client:
+    """Keeps put_object calls in memory instead of talking to S3"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, **kwargs):
+        self.objects[kwargs["Key"]] = kwargs
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+class TestCreateStorage:
+    """Driver selection"""
+
+    def test_known_drivers(self, tmp_path):
+        assert isinstance(create_storage("cloudinary"), CloudinaryStorage)
+        assert isinstance(create_storage("LOCAL", local_root=tmp_path), LocalStorage)
+        assert isinstance(create_storage("s3", s3_bucket="media"), S3Storage)
+
+    def test_misconfigured_drivers(self):
+        with pytest.raises(ValueError):
+            create_storage("s3")
+        with pytest.raises(ValueError):
+            create_storage("ftp")
+
+    def test_drivers_must_implement_the_interface(self):
+        class Incomplete(StorageBackend):
+            async def put(self, key, data, content_type=None, **options):
+                return {}
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+class TestStorageKeys:
+    """Keys as each driver stores them"""
+
+    def test_local_adds_extension(self, tmp_path):
+        storage = LocalStorage(tmp_path, "/media")
+        assert storage.storage_key("images/image_1", "image/jpeg") == "images/image_1.jpg"
+        assert storage.storage_key("font_0123456789abcdef.woff2") == "font_0123456789abcdef.woff2"
+
+    def test_cloudinary_images_have_no_extension(self):
+        storage = CloudinaryStorage()
+        assert storage.storage_key("images/image_1_original.heic", "image/heic") == "images/image_1_original"
+        assert storage.storage_key("font_0123456789abcdef.woff2", "font/woff2") == "font_0123456789abcdef.woff2"
+
+    def test_local_rejects_traversal(self, tmp_path):
+        with pytest.raises(ValueError):
+            LocalStorage(tmp_path / "media", "/media").local_path("../secret.txt")
+
+
+class TestLocalStorage:
+    """Local driver round trip"""
+
+    def test_put_get_delete(self, tmp_path):
+        storage = LocalStorage(tmp_path, "http://localhost:8001/api/uploads/media/")
+
+        async def scenario():
+            stored = await storage.put("images/image_1", make_png(), "image/png")
+            data = await storage.get(stored["key"])
+            await storage.delete(stored["key"])
+            return stored, data
+
+        stored, data = asyncio.run(scenario())
+        assert stored["key"] == "images/image_1.png"
+        assert stored["url"] == "http://localhost:8001/api/uploads/media/images/image_1.png"
+        assert (stored["width"], stored["height"]) == (40, 30)
+        assert data == make_png()
+        assert not (tmp_path / "images" / "image_1.png").exists()
+
+
+class TestS3Storage:
+    """S3 requests and URLs"""
+
+    def test_put_sets_type_and_cache_headers(self):
+        storage = S3Storage("vivento-media", prefix="fonts", public_url="https://cdn.example.com/")
+        storage._client = RecordingS3Client()
+
+        stored = asyncio.run(storage.put("font_0123456789abcdef.woff2", b"wOF2"))
+        request = storage._client.objects["fonts/font_0123456789abcdef.woff2"]
+        assert request["ContentType"] == "font/woff2"
+        assert request["CacheControl"] == IMMUTABLE_CACHE_CONTROL
+        assert stored["url"] == "https://cdn.example.com/fonts/font_0123456789abcdef.woff2"
+        assert stored["width"] is None
+
+    def test_endpoint_url_without_public_url(self):
+        storage = S3Storage("media", endpoint_url="http://minio:9000")
+        assert storage.url("images/a.webp") == "http://minio:9000/media/images/a.webp"
+
+
+class TestDirectUploads:
+    """Signed direct uploads"""
+
+    def test_capability_flag(self, tmp_path):
+        assert CloudinaryStorage().supports_direct_upload
+        assert S3Storage("media").supports_direct_upload
+        assert not LocalStorage(tmp_path, "/media").supports_direct_upload
+        assert LocalStorage(tmp_path, "/media", upload_url="http://api/upload/direct", signing_secret="s").supports_direct_upload
+
+    def test_local_signed_put_round_trip(self, tmp_path):
+        storage = LocalStorage(tmp_path, "/media", upload_url="http://api/upload/direct", signing_secret="secret")
+        upload = storage.direct_upload("images/image_1", "image/png", 10_000, 900)
+        assert upload["method"] == "PUT" and upload["key"] == "images/image_1.png"
+        query = dict(part.split("=") for part in upload["url"].split("?", 1)[1].split("&"))
+
+        async def scenario():
+            await storage.receive_direct_upload(
+                upload["key"], "image/png", int(query["max_bytes"]), int(query["expires"]), query["signature"], chunks(make_png())
+            )
+            return await storage.confirm_direct_upload(upload["key"], "image/png", 10_000, {})
+
+        stored = asyncio.run(scenario())
+        assert stored["url"] == "/media/images/image_1.png"
+        assert (stored["width"], stored["height"], stored["bytes"]) == (40, 30, len(make_png()))
+        assert stat.S_IMODE((tmp_path / "images" / "image_1.png").stat().st_mode) == ASSET_FILE_MODE
+
+    def test_local_rejects_tampering_and_oversize(self, tmp_path):
+        storage = LocalStorage(tmp_path, "/media", upload_url="http://api/upload/direct", signing_secret="secret")
+        upload = storage.direct_upload("images/image_1", "image/png", 100, 900)
+        query = dict(part.split("=") for part in upload["url"].split("?", 1)[1].split("&"))
+        expires, signature = int(query["expires"]), query["signature"]
+
+        with pytest.raises(PermissionError):
+            asyncio.run(storage.receive_direct_upload(upload["key"], "image/png", 10_000, expires, signature, chunks(b"x")))
+        with pytest.raises(PermissionError):
+            asyncio.run(storage.receive_direct_upload(upload["key"], "text/html", 100, expires, signature, chunks(b"x")))
+        with pytest.raises(ValueError):
+            asyncio.run(storage.receive_direct_upload(upload["key"], "image/png", 100, expires, signature, chunks(b"x" * 500)))
+        assert not any(tmp_path.rglob("*.png")) and not any(tmp_path.rglob(".tmp-*"))
+
+    def test_local_refuses_replayed_put(self, tmp_path):
+        storage = LocalStorage(tmp_path, "/media", upload_url="http://api/upload/direct", signing_secret="secret")
+        upload = storage.direct_upload("images/image_1", "image/png", 10_000, 900)
+        query = dict(part.split("=") for part in upload["url"].split("?", 1)[1].split("&"))
+
+        def put(body):
+            return storage.receive_direct_upload(
+                upload["key"], "image/png", 10_000, int(query["expires"]), query["signature"], chunks(body)
+            )
+
+        asyncio.run(put(make_png()))
+        with pytest.raises(FileExistsError):
+            asyncio.run(put(b"<script>alert(1)</script>"))
+        assert (tmp_path / "images" / "image_1.png").read_bytes() == make_png()
+        assert not any(tmp_path.rglob(".tmp-*"))
+
+    @pytest.mark.parametrize("body", [b"<html><script>alert(1)</script></html>", make_png()[:60]])
+    def test_local_confirm_requires_a_decodable_image(self, tmp_path, body):
+        storage = LocalStorage(tmp_path, "/media", upload_url="http://api/upload/direct", signing_secret="secret")
+        upload = storage.direct_upload("images/image_1", "image/png", 10_000, 900)
+        query = dict(part.split("=") for part in upload["url"].split("?", 1)[1].split("&"))
+
+        async def scenario():
+            await storage.receive_direct_upload(
+                upload["key"], "image/png", 10_000, int(query["expires"]), query["signature"], chunks(body)
+            )
+            return await storage.confirm_direct_upload(upload["key"], "image/png", 10_000, {})
+
+        with pytest.raises(ValueError):
+            asyncio.run(scenario())
+        assert not any((tmp_path / "images").iterdir())
+
+    @pytest.mark.parametrize("content_type", ["image/svg+xml", "text/html", "image/gif"])
+    def test_local_refuses_non_raster_types(self, tmp_path, content_type):
+        assert content_type not in DIRECT_UPLOAD_TYPES
+        storage = LocalStorage(tmp_path, "/media", upload_url="http://api/upload/direct", signing_secret="secret")
+        with pytest.raises(ValueError):
+            storage.direct_upload("images/image_1", content_type, 10_000, 900)
+
+    def test_s3_presigned_post_limits_size_and_type(self):
+        pytest.importorskip("boto3")
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+        storage = S3Storage("vivento-media", prefix="media", region="eu-central-1")
+
+        upload = storage.direct_upload("images/image_1", "image/webp", 5000, 900)
+        assert upload["method"] == "POST"
+        assert upload["key"] == "images/image_1.webp"
+        assert upload["fields"]["key"] == "media/images/image_1.webp"
+        assert upload["fields"]["Content-Type"] == "image/webp"
+        assert "policy" in upload["fields"]
+
+
+class TestCloudinaryDirectUploads:
+    """Signed params and confirmation against the stored asset"""
+
+    @pytest.fixture
+    def cloudinary(self, monkeypatch):
+        cloudinary = cloudinary_sdk()
+        monkeypatch.setattr(cloudinary, "_config", cloudinary.Config())
+        cloudinary.config(cloud_name="demo", api_key="key", api_secret="secret")
+        return cloudinary
+
+    def proof(self, cloudinary, key, version=1700000000, **fields):
+        signature = cloudinary.utils.api_sign_request(
+            {"public_id": key, "version": version}, "secret", signature_version=1
+        )
+        return {"public_id": key, "version": version, "signature": signature, **fields}
+
+    def test_signed_params_forbid_overwrite_and_other_formats(self, cloudinary):
+        upload = CloudinaryStorage().direct_upload("images/image_1", "image/png", 10_000, 900, tags=["user"])
+        fields = dict(upload["fields"])
+        assert fields["overwrite"] == "false"
+        assert fields["allowed_formats"] == "jpg,png,webp,avif"
+        signature = fields.pop("signature")
+        fields.pop("api_key")
+        assert signature == cloudinary.utils.api_sign_request(fields, "secret")
+
+    def test_size_comes_from_the_stored_asset(self, cloudinary, monkeypatch):
+        stored = {
+            "public_id": "images/image_1", "version": 1700000000, "format": "png",
+            "bytes": 50_000, "width": 4000, "height": 3000,
+        }
+        deleted = []
+        monkeypatch.setattr(cloudinary.api, "resource", lambda key, **options: stored)
+        monkeypatch.setattr(cloudinary.uploader, "destroy", lambda key, **options: deleted.append(key))
+        # The client claims a small file
+        proof = self.proof(cloudinary, "images/image_1", bytes=100)
+
+        with pytest.raises(ValueError):
+            asyncio.run(CloudinaryStorage().confirm_direct_upload("images/image_1", "image/png", 10_000, proof))
+        assert deleted == ["images/image_1"]
+
+        stored["bytes"] = 5_000
+        result = asyncio.run(CloudinaryStorage().confirm_direct_upload("images/image_1", "image/png", 10_000, proof))
+        assert (result["bytes"], result["width"], result["height"]) == (5_000, 4000, 3000)
+        assert "/v1700000000/images/image_1" in result["url"]
+
+    def test_forged_proof_is_rejected(self, cloudinary):
+        proof = self.proof(cloudinary, "images/image_1")
+        proof["signature"] = "0" * 40
+        with pytest.raises(ValueError):
+            asyncio.run(CloudinaryStorage().confirm_direct_upload("images/image_1", "image/png", 10_000, proof))
+
+    @pytest.mark.parametrize("stored_format", ["svg", "pdf", "gif", None])
+    def test_non_raster_asset_is_rejected(self, cloudinary, monkeypatch, stored_format):
+        stored = {"public_id": "images/image_1", "version": 1700000000, "format": stored_format, "bytes": 500}
+        deleted = []
+        monkeypatch.setattr(cloudinary.api, "resource", lambda key, **options: stored)
+        monkeypatch.setattr(cloudinary.uploader, "destroy", lambda key, **options: deleted.append(key))
+
+        proof = self.proof(cloudinary, "images/image_1")
+        with pytest.raises(ValueError):
+            asyncio.run(CloudinaryStorage().confirm_direct_upload("images/image_1", "image/png", 10_000, proof))
+        assert deleted == ["images/image_1"]
@@ -0,0 +1,95 @@
+"""
+Template Catalog Tests for Vivento Platform
+Tests: browse filters, facet counts, sort orders (including string
+created_at), paging
+"""
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from template_catalog import browse_templates
+
+TEMPLATES = [
+    {"id": "t1", "name": "Bahar", "parent_category": "wedding", "sub_category": "classic",
+     "is_premium": False, "price_per_invitation": 0.1, "created_at": datetime(2026, 1, 10)},
+    {"id": "t2", "name": "ay işığı", "parent_category": "wedding", "sub_category": "modern",
+     "is_premium": True, "price_per_invitation": 0.3, "created_at": "2026-03-01T12:00:00Z"},
+    {"id": "t3", "name": "Cəmilə", "parent_category": "birthday", "sub_category": "kids",
+     "is_premium": False, "price_per_invitation": 0.2, "created_at": datetime(2026, 2, 5, tzinfo=timezone.utc)},
+    {"id": "t4", "name": "Dağ", "parent_category": "birthday", "sub_category": "adult",
+     "is_premium": True, "price_per_invitation": 0.5, "created_at": "not a date"},
+]
+
+
+def ids(result):
+    return [template["id"] for template in result["items"]]
+
+
+class TestFilters:
+    """Filters combine with AND; price bounds are inclusive"""
+
+    @pytest.mark.parametrize("filters,expected", [
+        ({}, {"t1", "t2", "t3", "t4"}),
+        ({"parent_category": "wedding"}, {"t1", "t2"}),
+        ({"parent_category": "wedding", "is_premium": True}, {"t2"}),
+        ({"sub_category": "kids"}, {"t3"}),
+        ({"min_price": 0.2}, {"t2", "t3", "t4"}),
+        ({"max_price": 0.2}, {"t1", "t3"}),
+        ({"min_price": 0.2, "max_price": 0.3}, {"t2", "t3"}),
+        ({"parent_category": None}, {"t1", "t2", "t3", "t4"}),
+        ({"parent_category": "graduation"}, set()),
+    ])
+    def test_filter(self, filters, expected):
+        result = browse_templates(TEMPLATES, filters)
+        assert set(ids(result)) == expected
+        assert result["total"] == len(expected)
+
+
+class TestFacets:
+    """Each facet ignores its own filter but applies the others"""
+
+    def test_facets_without_filters(self):
+        facets = browse_templates(TEMPLATES, {})["facets"]
+        assert facets["parent_category"] == {"birthday": 2, "wedding": 2}
+        assert facets["is_premium"] == {"false": 2, "true": 2}
+        assert facets["price"] == {"min": 0.1, "max": 0.5}
+
+    def test_own_filter_is_skipped(self):
+        facets = browse_templates(TEMPLATES, {"parent_category": "wedding", "is_premium": True})["facets"]
+        # Switching category keeps the premium filter
+        assert facets["parent_category"] == {"birthday": 1, "wedding": 1}
+        # Switching premium keeps the category filter
+        assert facets["is_premium"] == {"false": 1, "true": 1}
+        assert facets["sub_category"] == {"modern": 1}
+        assert facets["price"] == {"min": 0.3, "max": 0.3}
+
+    def test_empty_result_price_facet(self):
+        facets = browse_templates(TEMPLATES, {"parent_category": "graduation"})["facets"]
+        assert facets["price"] == {"min": None, "max": None}
+
+
+class TestSorting:
+    """Sort keys, including ISO-string and unparseable created_at"""
+
+    @pytest.mark.parametrize("sort,expected", [
+        ("newest", ["t2", "t3", "t1", "t4"]),
+        ("unknown", ["t2", "t3", "t1", "t4"]),
+        ("price_asc", ["t1", "t3", "t2", "t4"]),
+        ("price_desc", ["t4", "t2", "t3", "t1"]),
+        ("name", ["t2", "t1", "t3", "t4"]),
+    ])
+    def test_sort(self, sort, expected):
+        assert ids(browse_templates(TEMPLATES, {}, sort=sort)) == expected
+
+    def test_popular_breaks_ties_by_newest(self):
+        popularity = {"t1": 5.0, "t4": 5.0, "t3": 1.0}
+        assert ids(browse_templates(TEMPLATES, {}, sort="popular", popularity=popularity)) == ["t1", "t4", "t3", "t2"]
+
+    def test_paging(self):
+        result = browse_templates(TEMPLATES, {}, sort="price_asc", limit=2, offset=1)
+        assert ids(result) == ["t3", "t2"]
+        assert result["total"] == 4
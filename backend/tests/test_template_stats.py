@@ -0,0 +1,118 @@
+"""
+Template Popularity Stats Tests for Vivento Platform
+Tests: counter/score upserts, failure isolation, ranking refresh
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from template_stats import POPULARITY_WEIGHTS, PopularityRanking, record_template_activity
+
+
+class StatsCollection:
+    """Applies update_one $inc upserts to in-memory documents"""
+
+    def __init__(self, fail: bool = False):
+        self.docs = {}
+        self.calls = 0
+        self.fail = fail
+
+    async def update_one(self, query, update, upsert=False):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("write failed")
+        doc = self.docs.setdefault(query["template_id"], {"template_id": query["template_id"]})
+        for field, amount in update["$inc"].items():
+            doc[field] = doc.get(field, 0) + amount
+        doc.update(update["$set"])
+
+
+class TestRecordTemplateActivity:
+    """Counters and score move together"""
+
+    def test_counters_and_score(self):
+        async def scenario():
+            collection = StatsCollection()
+            await record_template_activity(collection, "t1", "events_created")
+            await record_template_activity(collection, "t1", "favorites")
+            await record_template_activity(collection, "t1", "invitations_charged", 10)
+            await record_template_activity(collection, "t1", "favorites", -1)
+            return collection.docs["t1"]
+
+        doc = asyncio.run(scenario())
+        assert doc["events_created"] == 1
+        assert doc["favorites"] == 0
+        assert doc["invitations_charged"] == 10
+        expected = POPULARITY_WEIGHTS["events_created"] + 10 * POPULARITY_WEIGHTS["invitations_charged"]
+        assert abs(doc["score"] - expected) < 1e-9
+
+    def test_no_template_or_zero_amount_is_skipped(self):
+        async def scenario():
+            collection = StatsCollection()
+            await record_template_activity(collection, None, "events_created")
+            await record_template_activity(collection, "t1", "invitations_charged", 0)
+            return collection.calls
+
+        assert asyncio.run(scenario()) == 0
+
+    def test_write_errors_are_swallowed(self):
+        async def scenario():
+            collection = StatsCollection(fail=True)
+            await record_template_activity(collection, "t1", "events_created")
+            return collection.calls
+
+        assert asyncio.run(scenario()) == 1
+
+
+class TestPopularityRanking:
+    """Scores are served from the last refresh"""
+
+    def test_refresh_ranks_by_score(self):
+        async def loader():
+            return [{"template_id": "t1", "score": 3.0}, {"template_id": "t2", "score": 8.0},
+                    {"template_id": "t3"}, {"score": 99.0}]
+
+        ranking = PopularityRanking(loader)
+        asyncio.run(ranking.refresh())
+        assert ranking.ranked_ids == ["t2", "t1", "t3"]
+        assert ranking.scores["t3"] == 0.0
+        assert ranking.refreshed_at is not None
+
+    def test_ensure_loaded_only_once(self):
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return [{"template_id": f"t{len(calls)}", "score": 1.0}]
+
+        async def scenario():
+            ranking = PopularityRanking(loader)
+            await ranking.ensure_loaded()
+            await ranking.ensure_loaded()
+            return ranking
+
+        ranking = asyncio.run(scenario())
+        assert len(calls) == 1
+        assert ranking.ranked_ids == ["t1"]
+
+    def test_background_loop_survives_loader_errors(self):
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("db down")
+            return [{"template_id": "t1", "score": 2.0}]
+
+        async def scenario():
+            ranking = PopularityRanking(loader, refresh_interval=0.01)
+            ranking.start()
+            await asyncio.sleep(0.1)
+            await ranking.stop()
+            return ranking
+
+        ranking = asyncio.run(scenario())
+        assert len(calls) >= 2
+        assert ranking.ranked_ids == ["t1"]
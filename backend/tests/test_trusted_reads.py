@@ -0,0 +1,62 @@
+"""
+Trusted Read Tests for Vivento Platform
+Tests: projection/defaults produce the same JSON as Pydantic response_model serialization
+"""
+import asyncio
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel, Field
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from trusted_reads import TrustedReader, model_defaults
+
+
+class Item(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    name: str
+    tags: List[str] = []
+    note: Optional[str] = None
+    price: float = 0.1
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+DOCUMENTS = [
+    {"id": "a", "name": "Qızıl", "tags": ["toy"], "note": "x", "price": 0.5,
+     "created_at": datetime(2025, 3, 1, 12, 30, 15, 123000)},
+    # Older document missing optional fields
+    {"id": "b", "name": "Klassik", "created_at": datetime(2025, 3, 2, tzinfo=timezone.utc)},
+]
+
+
+def validated_json(documents):
+    field = create_response_field(name="response", type_=List[Item])
+    content = asyncio.run(serialize_response(field=field, response_content=[Item(**d) for d in documents]))
+    return json.loads(json.dumps(content))
+
+
+class TestTrustedReader:
+    """TrustedReader output shape"""
+
+    def test_defaults_exclude_factories(self):
+        assert model_defaults(Item) == {"tags": [], "note": None, "price": 0.1}
+
+    def test_projection_lists_model_fields(self):
+        reader = TrustedReader(Item)
+        assert reader.projection == {"_id": 0, "id": 1, "name": 1, "tags": 1, "note": 1, "price": 1, "created_at": 1}
+
+    def test_matches_validated_serialization(self):
+        response = TrustedReader(Item).response(DOCUMENTS)
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == validated_json(DOCUMENTS)
+
+    def test_missing_factory_field_is_filled(self):
+        prepared = TrustedReader(Item).prepare({"name": "Yeni"})
+        assert prepared["id"] and isinstance(prepared["created_at"], datetime)
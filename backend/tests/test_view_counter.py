@@ -0,0 +1,97 @@
+"""
+Write-behind View Counter Tests for Vivento Platform
+Tests: buffering, batched flush, retry after a failed flush, single early flush
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from view_counter import ViewCounterBuffer
+
+
+class RecordingCollection:
+    """Collects bulk_write batches instead of talking to MongoDB"""
+
+    def __init__(self, fail_times: int = 0):
+        self.batches = []
+        self.fail_times = fail_times
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("write failed")
+        self.batches.append({op._filter["id"]: op._doc["$inc"]["views"] for op in operations})
+
+
+class TestViewCounterBuffer:
+    """Buffered blog view counting"""
+
+    def test_views_are_aggregated_per_document(self):
+        async def scenario():
+            collection = RecordingCollection()
+            counter = ViewCounterBuffer(flush_interval=3600)
+            counter._collection = collection
+            for _ in range(3):
+                counter.increment("post-1")
+            counter.increment("post-2")
+            updated = await counter.flush()
+            return collection, updated
+
+        collection, updated = asyncio.run(scenario())
+        assert updated == 2
+        assert collection.batches == [{"post-1": 3, "post-2": 1}]
+
+    def test_local_total_survives_flush(self):
+        async def scenario():
+            counter = ViewCounterBuffer(flush_interval=3600)
+            counter._collection = RecordingCollection()
+            counter.increment("post-1")
+            await counter.flush()
+            counter.increment("post-1")
+            return counter.local_total("post-1")
+
+        assert asyncio.run(scenario()) == 2
+
+    def test_failed_flush_is_retried(self):
+        async def scenario():
+            collection = RecordingCollection(fail_times=1)
+            counter = ViewCounterBuffer(flush_interval=3600)
+            counter._collection = collection
+            counter.increment("post-1", 4)
+            first = await counter.flush()
+            counter.increment("post-1")
+            second = await counter.flush()
+            return collection, first, second
+
+        collection, first, second = asyncio.run(scenario())
+        assert first == 0
+        assert second == 1
+        assert collection.batches == [{"post-1": 5}]
+
+    def test_stop_flushes_pending_views(self):
+        async def scenario():
+            collection = RecordingCollection()
+            counter = ViewCounterBuffer(flush_interval=3600)
+            counter.start(collection)
+            counter.increment("post-1")
+            await counter.stop()
+            return collection
+
+        assert asyncio.run(scenario()).batches == [{"post-1": 1}]
+
+    def test_full_buffer_schedules_one_flush(self):
+        async def scenario():
+            collection = RecordingCollection()
+            counter = ViewCounterBuffer(flush_interval=3600, max_pending=2)
+            counter._collection = collection
+            for _ in range(10):
+                counter.increment("post-1")
+            first_task = counter._flush_task
+            await first_task
+            return collection, first_task
+
+        collection, first_task = asyncio.run(scenario())
+        assert first_task is not None
+        assert collection.batches == [{"post-1": 10}]
@@ -0,0 +1,71 @@
+"""
+Trusted Reads for Vivento Platform
+Serialize documents we wrote ourselves straight to JSON, without building
+Pydantic models and validating them a second time through response_model
+"""
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Type
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def model_defaults(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Static defaults for optional fields (older documents may be missing them)"""
+    return {
+        name: field.default
+        for name, field in model.model_fields.items()
+        if not field.is_required() and field.default_factory is None
+    }
+
+
+def render_json(content: Any) -> bytes:
+    """JSON bytes for plain documents (datetimes included)"""
+    if orjson is not None:
+        # OPT_UTC_Z matches Pydantic's "...Z" rendering of aware UTC datetimes
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class TrustedReader:
+    """
+    Read path for one response model.
+
+    `projection` makes MongoDB return exactly the model's fields (no `_id`,
+    no stray keys the model would drop), `prepare` fills defaults the way
+    the model would, so the documents already have the response shape.
+    Only use it for collections written through the same model.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.projection = {"_id": 0, **{name: 1 for name in model.model_fields}}
+        self.defaults = model_defaults(model)
+        self._factories = {
+            name: field.default_factory
+            for name, field in model.model_fields.items()
+            if field.default_factory is not None
+        }
+
+    def prepare(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        prepared = {**self.defaults, **document}
+        for name, factory in self._factories.items():
+            if name not in prepared:
+                prepared[name] = factory()
+        return prepared
+
+    def prepare_many(self, documents: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.prepare(document) for document in documents]
+
+    def response(self, documents: Iterable[Dict[str, Any]]) -> Response:
+        """JSON response returned directly from a route, so FastAPI skips response_model validation"""
+        return Response(content=render_json(self.prepare_many(documents)), media_type="application/json")
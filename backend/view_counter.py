@@ -0,0 +1,112 @@
+"""
+Write-behind View Counter for Vivento Platform
+Aggregates blog post views in memory and flushes them with bulk_write
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounterBuffer:
+    """
+    Buffers `$inc` deltas per document id and flushes them periodically.
+
+    Durability: at most `flush_interval` seconds or `max_pending` views are
+    lost if the worker dies without a graceful shutdown.
+    Multi-worker safety: each worker only ever flushes its own deltas with
+    `$inc`, which commutes, so concurrent workers never overwrite each other.
+    """
+
+    def __init__(self, field: str = "views", flush_interval: float = 10.0, max_pending: int = 1000):
+        self.field = field
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._collection = None
+        self._pending: Dict[str, int] = defaultdict(int)
+        self._pending_total = 0
+        # Views counted by this worker since start (flushed + pending)
+        self._local_totals: Dict[str, int] = defaultdict(int)
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Early flush started by a full buffer; at most one in flight
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def increment(self, doc_id: str, amount: int = 1) -> None:
+        """Count a view; triggers an early flush when the buffer is full"""
+        self._pending[doc_id] += amount
+        self._local_totals[doc_id] += amount
+        self._pending_total += amount
+
+        if (
+            self._pending_total >= self.max_pending
+            and self._collection is not None
+            and (self._flush_task is None or self._flush_task.done())
+        ):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def local_total(self, doc_id: str) -> int:
+        """Views counted by this worker for doc_id since startup"""
+        return self._local_totals.get(doc_id, 0)
+
+    async def flush(self) -> int:
+        """Write buffered deltas to MongoDB, returns number of documents updated"""
+        if self._collection is None:
+            return 0
+
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            # Swap before awaiting so views counted during the write go to the next batch
+            batch, self._pending = self._pending, defaultdict(int)
+            self._pending_total = 0
+
+            operations = [
+                UpdateOne({"id": doc_id}, {"$inc": {self.field: amount}})
+                for doc_id, amount in batch.items()
+            ]
+            try:
+                await self._collection.bulk_write(operations, ordered=False)
+            except Exception as e:
+                # Merge the batch back so the next flush retries it
+                for doc_id, amount in batch.items():
+                    self._pending[doc_id] += amount
+                    self._pending_total += amount
+                logger.error(f"View counter flush failed ({len(batch)} documents): {e}")
+                return 0
+
+            logger.debug(f"Flushed views for {len(batch)} documents")
+            return len(batch)
+
+    def start(self, collection) -> None:
+        """Start the periodic flush loop for a collection"""
+        self._collection = collection
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"View counter loop error: {e}")
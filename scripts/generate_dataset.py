@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Performans ölçmələri üçün böyük sintetik verilənlər bazası yaradan script.
+İstehsal miqyasında istifadəçilər, tədbirlər, qonaqlar (RSVP paylanması ilə),
+balans əməliyyatları, ödənişlər və qalereya şəkilləri yaradır.
+
+Eyni --seed və --anchor-date ilə hər dəfə eyni məlumat yaranır: hər partiya
+öz təsadüfi generatorunu (seed, kolleksiya, partiya nömrəsi) ilə qurur, ona
+görə partiyaların paralel yazılması nəticəni dəyişmir.
+
+İstifadə:
+    python scripts/generate_dataset.py --scale 0.01          # sürətli yoxlama
+    python scripts/generate_dataset.py --drop                # tam ölçü (5M qonaq)
+    DATASET_DB_NAME=vivento_perf python scripts/generate_dataset.py --seed 7
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from benchmarks import payloads
+
+# MongoDB connection; never the application's DB_NAME, the script can drop collections
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DATASET_DB_NAME', 'vivento_benchmark')
+
+# Full-scale counts, multiplied by --scale
+DEFAULT_COUNTS = {
+    "templates": 500,
+    "users": 100_000,
+    "events": 500_000,
+    "guests": 5_000_000,
+    "balance_transactions": 1_000_000,
+    "payments": 250_000,
+    "gallery_photos": 500_000,
+}
+# Order matters only for readability of the progress output
+COLLECTIONS = list(DEFAULT_COUNTS)
+
+# Answered share grows with how close (or past) the event is
+RSVP_ANSWERS = ["gəlirəm", "gəlmirəm"]
+ATTENDING_SHARE = 0.75
+EVENT_NAMES = ["Toy Mərasimi", "Nişan Mərasimi", "Ad Günü Şənliyi", "Xına Gecəsi", "Korporativ Tədbir", "Baby Shower"]
+LOCATIONS = ["Bakı, Şüvəlan Park Hotel", "Bakı, Fairmont Flame Towers", "Gəncə, Şadlıq Sarayı", "Sumqayıt, Royal Hall", "Quba, Rixos"]
+FIRST_NAMES = ["Aysel", "Murad", "Leyla", "Elvin", "Nigar", "Rəşad", "Günay", "Orxan", "Səbinə", "Tural", "Aynur", "Kamran"]
+LAST_NAMES = ["Məmmədov", "Əliyev", "Həsənov", "Quliyev", "İsmayılov", "Hüseynov", "Rzayev", "Babayev"]
+
+
+def entity_id(seed: int, kind: str, index: int) -> str:
+    """Stable id of the index-th entity, so batches can reference each other without lookups"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"vivento:{seed}:{kind}:{index}"))
+
+
+def batch_rng(seed: int, collection: str, batch: int) -> random.Random:
+    return random.Random(f"{seed}:{collection}:{batch}")
+
+
+def skewed_index(rng: random.Random, count: int, skew: float = 2.0) -> int:
+    """Power-law pick: a few users own many events, a few events have huge guest lists"""
+    return min(count - 1, int(count * rng.random() ** skew))
+
+
+def person_name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+class DatasetGenerator:
+    """Builds documents batch by batch; every method is pure given (seed, batch)"""
+
+    def __init__(self, seed: int, counts: dict, anchor: datetime):
+        self.seed = seed
+        self.counts = counts
+        self.anchor = anchor
+
+    def event_date(self, event_index: int) -> datetime:
+        # Events spread from a year ago to a year ahead of the anchor date
+        rng = random.Random(f"{self.seed}:event-date:{event_index}")
+        return self.anchor + timedelta(days=rng.uniform(-365, 365), hours=rng.choice([12, 17, 18, 19]))
+
+    def event_owner(self, event_index: int) -> str:
+        # Also needed by gallery photos, which are uploaded by the event owner
+        rng = random.Random(f"{self.seed}:event-owner:{event_index}")
+        return entity_id(self.seed, "user", skewed_index(rng, self.counts["users"]))
+
+    def templates(self, rng, start, end):
+        docs = payloads.templates(end - start, seed=rng.randint(0, 2**31), element_count=12)
+        for offset, doc in enumerate(docs):
+            doc["id"] = entity_id(self.seed, "template", start + offset)
+            doc["created_at"] = self.anchor - timedelta(days=(start + offset) % 900)
+        return docs
+
+    def users(self, rng, start, end):
+        docs = []
+        for index in range(start, end):
+            created = self.anchor - timedelta(days=rng.uniform(0, 900))
+            free_used = min(30, int(rng.expovariate(1 / 20)))
+            docs.append({
+                "id": entity_id(self.seed, "user", index),
+                "email": f"user{index}@example.invalid",
+                "name": person_name(rng),
+                "facebook_id": None,
+                "google_id": str(rng.getrandbits(64)) if rng.random() < 0.4 else None,
+                "profile_picture": None,
+                "is_active": rng.random() > 0.02,
+                "subscription_type": rng.choices(["free", "premium", "vip"], weights=[90, 8, 2])[0],
+                "balance": round(rng.choice([0, 0, 0, 5, 10, 20, 50]) + rng.random() * 5, 2),
+                "free_invitations_used": free_used,
+                "favorites": [entity_id(self.seed, "template", rng.randrange(self.counts["templates"]))
+                              for _ in range(rng.choice([0, 0, 1, 2, 5]))],
+                "created_at": created,
+                "updated_at": created + timedelta(days=rng.uniform(0, 30)),
+            })
+        return docs
+
+    def events(self, rng, start, end):
+        docs = []
+        for index in range(start, end):
+            date = self.event_date(index)
+            created = min(date, self.anchor) - timedelta(days=rng.uniform(7, 120))
+            docs.append({
+                "id": entity_id(self.seed, "event", index),
+                "user_id": self.event_owner(index),
+                "name": f"{rng.choice(EVENT_NAMES)} - {person_name(rng)}",
+                "date": date,
+                "location": rng.choice(LOCATIONS),
+                "map_link": None,
+                "additional_notes": None,
+                "template_id": entity_id(self.seed, "template", skewed_index(rng, self.counts["templates"], 1.5)),
+                # Most hosts keep the template; a few customise it heavily
+                "custom_design": payloads.design_data(rng, rng.choice([8, 12, 40])) if rng.random() < 0.3 else None,
+                "show_envelope_animation": rng.random() < 0.5,
+                "created_at": created,
+                "updated_at": created,
+            })
+        return docs
+
+    def guests(self, rng, start, end):
+        docs = []
+        for index in range(start, end):
+            event_index = skewed_index(rng, self.counts["events"], 1.5)
+            event_date = self.event_date(event_index)
+            # Guest lists are typed in before the event, and before the anchor date
+            created = min(event_date - timedelta(days=3), self.anchor) - timedelta(days=rng.uniform(0, 57))
+            # Past events: ~90% answered; far-away events: ~30%
+            days_left = (event_date - self.anchor).days
+            answered = 0.9 if days_left < 0 else max(0.3, 0.9 - days_left / 200)
+            status = None
+            responded_at = None
+            if rng.random() < answered:
+                status = RSVP_ANSWERS[0] if rng.random() < ATTENDING_SHARE else RSVP_ANSWERS[1]
+                responded_at = min(created + timedelta(hours=rng.expovariate(1 / 48)), self.anchor)
+            docs.append({
+                "id": entity_id(self.seed, "guest", index),
+                "event_id": entity_id(self.seed, "event", event_index),
+                "name": person_name(rng),
+                "phone": f"+99450{rng.randint(1000000, 9999999)}" if rng.random() < 0.8 else None,
+                "email": f"guest{index}@example.invalid" if rng.random() < 0.3 else None,
+                "unique_token": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                "rsvp_status": status,
+                "created_at": created,
+                "responded_at": responded_at,
+            })
+        return docs
+
+    def balance_transactions(self, rng, start, end):
+        docs = []
+        for index in range(start, end):
+            kind = rng.choices(["invitation_charge", "payment", "refund"], weights=[80, 18, 2])[0]
+            amount = -0.1 if kind == "invitation_charge" else float(rng.choice([5, 10, 20, 50]))
+            docs.append({
+                "id": entity_id(self.seed, "transaction", index),
+                "user_id": entity_id(self.seed, "user", skewed_index(rng, self.counts["users"])),
+                "amount": amount,
+                "transaction_type": kind,
+                "description": "Qonaq əlavə edilməsi" if kind == "invitation_charge" else f"Balans artırma: {amount} AZN",
+                "payment_method": "epoint" if kind == "payment" else None,
+                "payment_id": f"TX{rng.getrandbits(40):012d}" if kind == "payment" else None,
+                "status": "completed",
+                "created_at": self.anchor - timedelta(days=rng.uniform(0, 720)),
+            })
+        return docs
+
+    def payments(self, rng, start, end):
+        docs = []
+        for index in range(start, end):
+            status = rng.choices(["completed", "failed", "pending"], weights=[85, 10, 5])[0]
+            created = self.anchor - timedelta(days=rng.uniform(0, 720))
+            user_id = entity_id(self.seed, "user", skewed_index(rng, self.counts["users"]))
+            docs.append({
+                "id": entity_id(self.seed, "payment", index),
+                "user_id": user_id,
+                "amount": float(rng.choice([5, 10, 20, 50, 100])),
+                "payment_method": "epoint",
+                "status": status,
+                "order_id": f"BAL-{user_id[:8]}-{index:08X}",
+                "payment_url": None,
+                "created_at": created,
+                "completed_at": created + timedelta(minutes=rng.uniform(1, 15)) if status != "pending" else None,
+            })
+        return docs
+
+    def gallery_photos(self, rng, start, end):
+        docs = []
+        for index in range(start, end):
+            # Photos only exist for events that already happened
+            for _ in range(8):
+                event_index = skewed_index(rng, self.counts["events"], 1.5)
+                if self.event_date(event_index) < self.anchor:
+                    break
+            # Taken on the event day, expiring five days later
+            created = min(self.event_date(event_index), self.anchor) + timedelta(hours=rng.uniform(0, 6))
+            key = f"gallery/{entity_id(self.seed, 'photo', index)}"
+            docs.append({
+                "id": entity_id(self.seed, "photo", index),
+                "event_id": entity_id(self.seed, "event", event_index),
+                "user_id": self.event_owner(event_index),
+                "url": f"https://res.cloudinary.com/vivento/image/upload/v1/{key}",
+                "cloudinary_public_id": key,
+                "original_public_id": None,
+                "caption": None,
+                "created_at": created,
+                "expires_at": created + timedelta(days=5),
+            })
+        return docs
+
+
+async def insert_collection(db, generator: DatasetGenerator, collection: str, count: int, batch_size: int, workers: int):
+    """Generate and insert `count` documents in parallel unordered batches"""
+    semaphore = asyncio.Semaphore(workers)
+    build = getattr(generator, collection)
+    started = time.perf_counter()
+    inserted = 0
+
+    async def batch(number: int):
+        nonlocal inserted
+        async with semaphore:
+            start = number * batch_size
+            docs = build(batch_rng(generator.seed, collection, number), start, min(count, start + batch_size))
+            await db[collection].insert_many(docs, ordered=False)
+            inserted += len(docs)
+
+    await asyncio.gather(*(batch(number) for number in range((count + batch_size - 1) // batch_size)))
+    elapsed = time.perf_counter() - started
+    print(f"  • {collection}: {inserted:,} sənəd, {elapsed:.1f} san ({inserted / max(elapsed, 1e-9):,.0f} sənəd/san)")
+
+
+async def create_indexes(name: str):
+    """The application's own indexes, built once after the bulk load"""
+    os.environ["DB_NAME"] = name
+    os.environ.setdefault("MONGO_URL", mongo_url)
+    import server
+    await server.ensure_indexes()
+    server.client.close()
+
+
+async def generate_dataset(args):
+    counts = {collection: max(1, int(count * args.scale)) for collection, count in DEFAULT_COUNTS.items()}
+    for collection in COLLECTIONS:
+        override = getattr(args, collection)
+        if override is not None:
+            counts[collection] = override
+    anchor = datetime.combine(args.anchor_date, datetime.min.time(), tzinfo=timezone.utc)
+    generator = DatasetGenerator(args.seed, counts, anchor)
+
+    client = AsyncIOMotorClient(mongo_url, maxPoolSize=max(10, args.workers * 2))
+    db = client[db_name]
+    try:
+        existing = set(await db.list_collection_names()) & set(COLLECTIONS)
+        if existing and not args.drop:
+            print(f"❌ {db_name} bazasında artıq məlumat var ({', '.join(sorted(existing))}). --drop ilə silin.")
+            sys.exit(1)
+        for collection in existing:
+            await db.drop_collection(collection)
+
+        print(f"📝 {db_name} bazasına yazılır (seed={args.seed}, tarix={args.anchor_date}):")
+        started = time.perf_counter()
+        for collection in COLLECTIONS:
+            await insert_collection(db, generator, collection, counts[collection], args.batch_size, args.workers)
+        print(f"✅ Cəmi {sum(counts.values()):,} sənəd {time.perf_counter() - started:.1f} saniyəyə yazıldı")
+    finally:
+        client.close()
+
+    if not args.no_indexes:
+        print("🔧 İndekslər yaradılır...")
+        await create_indexes(db_name)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Performans ölçmələri üçün sintetik verilənlər bazası")
+    parser.add_argument("--seed", type=int, default=1, help="eyni seed eyni məlumatı yaradır")
+    parser.add_argument("--scale", type=float, default=1.0, help="bütün saylar üçün vurucu (0.01 = sürətli yoxlama)")
+    parser.add_argument("--anchor-date", type=lambda value: datetime.strptime(value, "%Y-%m-%d").date(),
+                        default=datetime.now(timezone.utc).date(), help="tədbir tarixlərinin mərkəzi (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="bir insert_many çağırışında sənəd sayı")
+    parser.add_argument("--workers", type=int, default=8, help="paralel yazılan partiyalar")
+    parser.add_argument("--drop", action="store_true", help="mövcud kolleksiyaları silib yenidən yarat")
+    parser.add_argument("--no-indexes", action="store_true", help="tətbiqin indekslərini yaratma")
+    for collection in COLLECTIONS:
+        parser.add_argument(f"--{collection.replace('_', '-')}", dest=collection, type=int, default=None,
+                            help=f"{collection} sayı (standart {DEFAULT_COUNTS[collection]:,} × scale)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    print("🚀 Sintetik verilənlər bazası yaradılır...")
+    asyncio.run(generate_dataset(parse_args()))
+    print("🎉 Hazırdır!")
@@ -109,6 +109,15 @@ server {
     listen 80;
     server_name yourdomain.com www.yourdomain.com;
     
+    # Link preview crawlers get server-rendered Open Graph HTML for invitations
+    location ~ ^/invite/([^/]+)/?\$ {
+        root /var/www/vivento;
+        if (\$http_user_agent ~* "(facebookexternalhit|Facebot|WhatsApp|Twitterbot|TelegramBot|Slackbot|LinkedInBot|Discordbot|vkShare|SkypeUriPreview|Pinterest)") {
+            rewrite ^/invite/([^/]+)/?\$ /api/invite/\$1/og last;
+        }
+        try_files \$uri /index.html;
+    }
+    
     # Frontend
     location / {
         root /var/www/vivento;